@@ -0,0 +1,140 @@
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from app.utils import load_data, source_path
+from src.dataset import INDEX_FILE
+
+
+# ------------------------------
+# Pre-aggregated country data
+# ------------------------------
+DEFAULT_MEMORY_BUDGET = 512 * 1024 ** 2  # bytes
+BOX_METRICS = ["GHI", "DNI", "DHI"]
+
+
+def box_stats(series, label=None):
+    """Box-plot statistics in the format expected by ``Axes.bxp``"""
+    values = series.dropna().to_numpy()
+    if len(values) == 0:
+        return None
+    q1, med, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    return {
+        "label": label or series.name,
+        "med": med, "q1": q1, "q3": q3,
+        "whislo": inside.min(), "whishi": inside.max(),
+        "fliers": [],
+    }
+
+
+class CountryData:
+    """A country's cleaned frame with the aggregates the dashboard shows"""
+
+    def __init__(self, df, source_key=None):
+        self.df = df
+        self.source_key = source_key
+        self.error = df["Error"].iloc[0] if "Error" in df.columns else None
+        self.summary = None
+        self.box_stats = {}
+        self.monthly_means = None
+        if self.error is None:
+            self._aggregate()
+        self.nbytes = int(df.memory_usage(deep=True).sum())
+
+    def _aggregate(self):
+        df = self.df
+        self.summary = df["GHI"].describe()
+        self.box_stats = {metric: box_stats(df[metric], metric)
+                          for metric in BOX_METRICS if metric in df.columns}
+
+        if "Timestamp" in df.columns:
+            timestamps = pd.to_datetime(df["Timestamp"], errors="coerce")
+            if not timestamps.isna().all():
+                numeric = df[[col for col in BOX_METRICS if col in df.columns]]
+                self.monthly_means = numeric.groupby(timestamps.dt.month.rename("month")).mean()
+
+
+class DashboardCache:
+    """Process-wide LRU cache of ``CountryData`` bounded by a memory budget
+
+    Entries are keyed by the source file's mtime and size, so a re-exported
+    dataset is reloaded on the next request. Concurrent sessions asking for
+    the same country wait for a single load instead of each reading the file;
+    the per-load lock is dropped once the load finishes, so only loads in
+    flight hold one.
+    """
+
+    def __init__(self, memory_budget=DEFAULT_MEMORY_BUDGET):
+        self.memory_budget = memory_budget
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, country, start=None, end=None):
+        """Data for ``country``, optionally limited to start <= Timestamp < end"""
+        name = (country, start, end)
+        key = self._source_key(country)
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry.source_key == key:
+                self._entries.move_to_end(name)
+                self.hits += 1
+                return entry
+            load_lock = self._loading.setdefault(name, threading.Lock())
+
+        try:
+            with load_lock:
+                # Another session may have loaded it while we waited
+                with self._lock:
+                    entry = self._entries.get(name)
+                    if entry is not None and entry.source_key == key:
+                        self.hits += 1
+                        return entry
+                entry = CountryData(load_data(country, start=start, end=end), key)
+                with self._lock:
+                    self.misses += 1
+                    self._entries[name] = entry
+                    self._entries.move_to_end(name)
+                    self._evict()
+        finally:
+            # Sessions already waiting keep their reference; later ones find the entry
+            with self._lock:
+                if self._loading.get(name) is load_lock:
+                    del self._loading[name]
+        return entry
+
+    def _evict(self):
+        """Drop least recently used entries until the budget fits (keeps the newest)"""
+        while len(self._entries) > 1 and self.memory_usage() > self.memory_budget:
+            self._entries.popitem(last=False)
+
+    def memory_usage(self):
+        return sum(entry.nbytes for entry in self._entries.values())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @staticmethod
+    def _source_key(country):
+        path = source_path(country)
+        if os.path.isdir(path):
+            # A dataset store directory changes whenever its index is rewritten
+            path = os.path.join(path, INDEX_FILE)
+        if not os.path.exists(path):
+            return None
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+
+_cache = DashboardCache(int(os.environ.get("DASHBOARD_MEMORY_BUDGET", DEFAULT_MEMORY_BUDGET)))
+
+
+def get_country_data(country, start=None, end=None):
+    """Cached, pre-aggregated data for ``country``, optionally for a date range"""
+    return _cache.get(country, start, end)
@@ -1,6 +1,16 @@
-import streamlit as st
+import os
+import sys
+
 import pandas as pd
-from utils import load_data, get_summary_stats, create_boxplot, top_regions_table
+import streamlit as st
+
+# `streamlit run app/main.py` only puts app/ on the path
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from app.data_layer import get_country_data
+from app.utils import create_boxplot, time_range
+from src.instrumentation import enable_from_env
+
+enable_from_env()
 
 st.title("Solar Resource Dashboard")
 st.write("Visualize solar irradiance data interactively.")
@@ -11,12 +21,23 @@ country = st.selectbox(
     ["Benin", "Sierra", "Togo"]
 )
 
-# Load dataset
-df = load_data(country)
+# --- Date range (only when the country is in the partitioned dataset store) ---
+start = end = None
+bounds = time_range(country)
+if bounds is not None:
+    first, last = bounds[0].date(), bounds[1].date()
+    picked = st.date_input("Date range", value=(first, last), min_value=first, max_value=last)
+    if isinstance(picked, (tuple, list)) and len(picked) == 2 and tuple(picked) != (first, last):
+        # Only the partitions of the chosen months are read
+        start, end = pd.Timestamp(picked[0]), pd.Timestamp(picked[1]) + pd.Timedelta(days=1)
+
+# Load dataset (served from the process-wide cache after the first request)
+data = get_country_data(country, start, end)
+df = data.df
 
 # Handle errors
-if "Error" in df.columns:
-    st.error(df["Error"].iloc[0])
+if data.error is not None:
+    st.error(data.error)
     st.stop()
 
 # --- Metric selector (only GHI available) ---
@@ -28,35 +49,28 @@ st.write(df.head())
 
 # Summary stats
 st.subheader("Summary Statistics")
-st.write(get_summary_stats(df))
+st.write(data.summary)
 
 # Boxplot
 st.subheader("Boxplot of GHI")
-fig = create_boxplot(df, metric)
+fig = create_boxplot(df, metric, stats=data.box_stats.get(metric))
 st.pyplot(fig)
 
 # Top regions (if files contain region column)
 st.subheader("Top GHI Rankings")
 
-# Convert timestamp to datetime
-if "Timestamp" in df.columns:
-    df['Timestamp'] = pd.to_datetime(df['Timestamp'], errors='coerce')
-
 if "region" not in df.columns:
     st.info(
         "Region-level analysis is unavailable because the dataset does not contain "
         "a 'region' or 'location' field. Showing alternative ranking: Top Months by Average GHI."
     )
 
-    # Ensure Timestamp is valid
-    if df['Timestamp'].isna().all():
+    # Monthly means are precomputed when the Timestamp column parses
+    if data.monthly_means is None:
         st.error("Timestamp column could not be parsed as datetime. Cannot compute monthly averages.")
     else:
-        df['month'] = df['Timestamp'].dt.month
-        ghi_by_month = df.groupby('month')['GHI'].mean()
-        st.bar_chart(ghi_by_month)
+        st.bar_chart(data.monthly_means['GHI'])
 
 else:
     top_regions = df.groupby('region')['GHI'].mean().sort_values(ascending=False)
     st.bar_chart(top_regions)
-
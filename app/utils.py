@@ -1,28 +1,69 @@
 import pandas as pd
 import os
+import sys
 import matplotlib.pyplot as plt
 
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from src.dataset import DatasetStore, read_country, source_files
+from src.instrumentation import instrumented
+from src.validation import validate_frame
+
 
 # ------------------------------
 # Load solar dataset
 # ------------------------------
-def load_data(country):
-    file_map = {
-        "Benin": "benin_clean.csv",
-        "Sierra": "sierraleone_clean.csv",
-        "Togo": "togo_clean.csv"
-    }
+FILE_MAP = {
+    "Benin": "benin_clean.csv",
+    "Sierra": "sierraleone_clean.csv",
+    "Togo": "togo_clean.csv"
+}
+
 
+def data_path(country):
     base_path = os.path.join(os.path.dirname(__file__), "..", "data")
-    filename = os.path.join(base_path, file_map.get(country, ""))
+    return os.path.join(base_path, FILE_MAP.get(country, ""))
+
+
+# Partitioned store written by export_cleaned_data(fmt="dataset", output_dir="data/dataset")
+DATASET_ROOT = os.path.join(os.path.dirname(__file__), "..", "data", "dataset")
+
+
+def dataset_country_path(country):
+    """Country directory in the dataset store (e.g. data/dataset/country=benin), if present"""
+    name = FILE_MAP.get(country, "").replace("_clean.csv", "")
+    path = os.path.join(DATASET_ROOT, f"country={name}")
+    return path if name and DatasetStore.locate(path) is not None else None
+
+
+def source_path(country):
+    """The dataset store directory when the country is stored there, else its CSV"""
+    return dataset_country_path(country) or data_path(country)
+
+
+def time_range(country):
+    """(first, last) Timestamp of a country in the dataset store, or None for CSV sources"""
+    path = dataset_country_path(country)
+    if path is None:
+        return None
+    store, name = DatasetStore.locate(path)
+    return store.time_range(name)
+
+
+@instrumented('app.load_data', rows=lambda _, result: len(result),
+              reads=lambda _, call: source_files(source_path(call['country']), call['start'], call['end']))
+def load_data(country, columns=None, start=None, end=None):
+    """Country rows with start <= Timestamp < end, reading only matching partitions of the store"""
+    filename = source_path(country)
 
     if not os.path.exists(filename):
         return pd.DataFrame({"Error": [f"File not found: {filename}"]})
 
-    df = pd.read_csv(filename)
+    df = read_country(filename, columns=columns, start=start, end=end)
 
-    if "GHI" not in df.columns:
-        return pd.DataFrame({"Error": ["GHI column not found"]})
+    # Schema check: GHI present, numeric readings, parseable timestamps
+    report = validate_frame(df, source=filename, required=["GHI"])
+    if not report.ok:
+        return pd.DataFrame({"Error": ["Invalid data: " + "; ".join(report.errors)]})
 
     return df.dropna(subset=["GHI"])
 
@@ -37,9 +78,13 @@ def get_summary_stats(df):
 # ------------------------------
 # Boxplot 
 # ------------------------------
-def create_boxplot(df, metric):
+def create_boxplot(df, metric, stats=None):
     fig, ax = plt.subplots()
-    ax.boxplot(df[metric], vert=True)
+    if stats is not None:
+        # Precomputed quantiles from the data layer, no pass over the rows
+        ax.bxp([stats], showfliers=False)
+    else:
+        ax.boxplot(df[metric], vert=True)
     ax.set_title(f"{metric} Distribution")
     ax.set_ylabel(metric)
     return fig
@@ -0,0 +1,272 @@
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from app import utils as app_utils
+from benchmarks.synthetic import write_station_csv
+from src.cache import cache_path
+from src.comparison import CountryComparator
+from src.eda import SolarDataEDA
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCHMARK_DIR)
+DEFAULT_HISTORY = os.path.join(BENCHMARK_DIR, 'history.json')
+DEFAULT_WORKDIR = os.path.join(BENCHMARK_DIR, '.data')
+COUNTRIES = ['benin', 'sierraleone', 'togo']
+SIZE_SUFFIXES = {'k': 1_000, 'm': 1_000_000}
+
+
+def parse_size(text):
+    """Row count from '10000', '10k' or '50M'"""
+    text = text.strip().lower().replace('_', '')
+    if text[-1] in SIZE_SUFFIXES:
+        return int(float(text[:-1]) * SIZE_SUFFIXES[text[-1]])
+    return int(text)
+
+
+def git_commit():
+    """Current commit hash and whether the work tree has local changes"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_ROOT,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, bool(status.strip())
+
+
+class Workspace:
+    """Synthetic raw and cleaned station files for one size, reused between runs"""
+
+    def __init__(self, root, rows, seed):
+        self.rows = rows
+        self.dir = os.path.join(root, f"{rows}_{seed}")
+        self.raw = {country: os.path.join(self.dir, f"{country}.csv") for country in COUNTRIES}
+        self.clean = {country: os.path.join(self.dir, 'data', f"{country}_clean.csv")
+                      for country in COUNTRIES}
+        os.makedirs(self.dir, exist_ok=True)
+
+        for i, country in enumerate(COUNTRIES):
+            if not os.path.exists(self.raw[country]):
+                print(f"🛠️ Generating {rows} rows for {country}")
+                write_station_csv(self.raw[country], rows, seed=seed + i, site=country)
+            if not os.path.exists(self.clean[country]):
+                eda = quiet(prepared_eda, self.raw[country], clean=True)
+                quiet(self.export, eda, country)
+
+    def export(self, eda, country):
+        return eda.export_cleaned_data(country, output_dir=os.path.join(self.dir, 'data'))
+
+
+def quiet(func, *args, **kwargs):
+    """Call ``func`` with its progress prints silenced"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def prepared_eda(path, clean=False):
+    eda = SolarDataEDA(path)
+    eda.load_data()
+    if clean:
+        eda.clean_data()
+    return eda
+
+
+def drop_caches(paths):
+    for path in paths:
+        if os.path.exists(cache_path(path)):
+            os.remove(cache_path(path))
+
+
+# Each benchmark takes a Workspace, does its untimed setup and returns the call to time
+
+def bench_load_data(ws):
+    return SolarDataEDA(ws.raw['benin']).load_data
+
+
+def bench_clean_data(ws):
+    return prepared_eda(ws.raw['benin']).clean_data
+
+
+def bench_export_cleaned_data(ws):
+    eda = prepared_eda(ws.raw['benin'], clean=True)
+    return lambda: ws.export(eda, 'benin')
+
+
+def bench_load_and_combine(ws):
+    return lambda: CountryComparator().load_and_combine(ws.clean)
+
+
+def bench_load_and_combine_cold(ws):
+    drop_caches(ws.clean.values())
+    return lambda: CountryComparator().load_and_combine(ws.clean)
+
+
+def bench_statistical_test(ws):
+    combined = quiet(CountryComparator().load_and_combine, ws.clean)
+    return lambda: CountryComparator().set_combined(combined).statistical_test('GHI')
+
+
+def bench_app_load_data(ws):
+    def run():
+        # source_path prefers a dataset store over the CSV, so patch it to pin the prepared file
+        with mock.patch.object(app_utils, 'source_path', lambda country: ws.clean['benin']):
+            return app_utils.load_data('Benin')
+    return run
+
+
+def bench_app_load_data_cold(ws):
+    drop_caches([ws.clean['benin']])
+    return bench_app_load_data(ws)
+
+
+BENCHMARKS = {
+    'load_data': bench_load_data,
+    'clean_data': bench_clean_data,
+    'export_cleaned_data': bench_export_cleaned_data,
+    'load_and_combine': bench_load_and_combine,
+    'load_and_combine_cold': bench_load_and_combine_cold,
+    'statistical_test': bench_statistical_test,
+    'app_load_data': bench_app_load_data,
+    'app_load_data_cold': bench_app_load_data_cold,
+}
+
+
+def measure(setup, ws, repeat=3, memory=True):
+    """Best wall time over ``repeat`` runs, plus peak traced memory of one extra run
+
+    Timing runs are not traced, since tracemalloc slows allocations down.
+    Setup happens before every run and is never measured.
+    """
+    times = []
+    for _ in range(repeat):
+        call = quiet(setup, ws)
+        gc.collect()
+        start = time.perf_counter()
+        quiet(call)
+        times.append(time.perf_counter() - start)
+        del call
+
+    peak = None
+    if memory:
+        call = quiet(setup, ws)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            quiet(call)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {'seconds': min(times), 'mean_seconds': float(np.mean(times)),
+            'peak_mb': None if peak is None else peak / 1024 ** 2}
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def previous_results(history):
+    """Latest recorded result for each (benchmark, rows)"""
+    latest = {}
+    for run in history:
+        for result in run['results']:
+            latest[(result['benchmark'], result['rows'])] = dict(result, commit=run.get('commit'))
+    return latest
+
+
+def compare(result, previous, threshold):
+    """Relative change against the previous result, and whether it is a regression"""
+    if previous is None or not previous.get('seconds'):
+        return None, False
+    change = result['seconds'] / previous['seconds'] - 1
+    return change, change > threshold
+
+
+def run_benchmarks(sizes, names, seed=0, repeat=3, memory=True, workdir=DEFAULT_WORKDIR,
+                   history_path=DEFAULT_HISTORY, threshold=0.1, save=True):
+    """Run the selected benchmarks at every size and append them to the JSON history"""
+    history = load_history(history_path)
+    latest = previous_results(history)
+    commit, dirty = git_commit()
+    results, regressions = [], []
+
+    for rows in sizes:
+        ws = Workspace(workdir, rows, seed)
+        for name in names:
+            result = dict(benchmark=name, rows=rows, repeat=repeat, **measure(BENCHMARKS[name], ws, repeat, memory))
+            previous = latest.get((name, rows))
+            change, regressed = compare(result, previous, threshold)
+            results.append(result)
+
+            peak = '' if result['peak_mb'] is None else f"{result['peak_mb']:10.1f} MB"
+            delta = '' if change is None else f"{change:+8.1%} vs {(previous['commit'] or '?')[:8]}"
+            print(f"{'🔺' if regressed else '⏱️'} {name:24} {rows:>11,} rows {result['seconds']:9.3f} s {peak} {delta}")
+            if regressed:
+                regressions.append(result)
+
+    if save:
+        history.append({
+            'commit': commit,
+            'dirty': dirty,
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+            'seed': seed,
+            'results': results,
+        })
+        with open(history_path, 'w', encoding='utf-8') as f:
+            json.dump(history, f, indent=1)
+        print(f"✅ Results appended to {history_path}")
+    return results, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time and memory-profile the EDA and comparison pipelines")
+    parser.add_argument('--sizes', nargs='+', default=['10k', '100k'],
+                        help="rows per station file, e.g. 10k 1M 50M")
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), default=list(BENCHMARKS),
+                        help="benchmarks to run (default: all)")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per benchmark (best is kept)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc run")
+    parser.add_argument('--workdir', default=DEFAULT_WORKDIR, help="where synthetic files are kept")
+    parser.add_argument('--history', default=DEFAULT_HISTORY, help="JSON history file")
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="slowdown against the previous run reported as a regression")
+    parser.add_argument('--no-save', action='store_true', help="do not append to the history")
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args(argv)
+
+    _, regressions = run_benchmarks([parse_size(size) for size in args.sizes], args.only, args.seed,
+                                    args.repeat, not args.no_memory, args.workdir, args.history,
+                                    args.threshold, not args.no_save)
+    if regressions:
+        print(f"❌ {len(regressions)} benchmark(s) slower than the previous run by more than {args.threshold:.0%}")
+        if args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from src.solar_geometry import SITES, clear_sky
+
+# Column order of the raw station exports
+STATION_COLUMNS = ['Timestamp', 'GHI', 'DNI', 'DHI', 'ModA', 'ModB', 'Tamb', 'RH', 'WS',
+                   'WSgust', 'WSstdev', 'WD', 'WDstdev', 'BP', 'Cleaning', 'Precipitation',
+                   'TModA', 'TModB', 'Comments']
+
+
+def generate_station_data(n_rows, seed=0, start='2021-08-09 00:01', site='benin',
+                          null_fraction=0.01, offset=0):
+    """Seeded synthetic minute-level station data with the real schema
+
+    Irradiance follows the clear-sky model of ``site`` scaled by a random
+    cloudiness, so daily cycles, night zeros and correlations look like the
+    real stations. ``offset`` shifts the time axis (rows) so that several
+    calls can be stitched into one long series.
+    """
+    rng = np.random.default_rng([seed, offset])
+    times = pd.date_range(start, periods=n_rows + offset, freq='min')[offset:]
+    sky = clear_sky(times, *SITES[site])
+
+    cloud = np.clip(rng.beta(5, 1.5, n_rows), 0.05, 1)
+    dni = sky['dni_clear'].to_numpy() * cloud ** 2
+    dhi = sky['dhi_clear'].to_numpy() * (1 + 2 * (1 - cloud))
+    cos_zenith = np.maximum(np.cos(np.radians(sky['zenith'].to_numpy())), 0)
+    ghi = dni * cos_zenith + dhi + rng.normal(0, 2, n_rows)
+    day = ghi / 1000
+
+    df = pd.DataFrame({
+        'Timestamp': times.strftime('%Y-%m-%d %H:%M'),
+        'GHI': ghi,
+        'DNI': dni + rng.normal(0, 2, n_rows),
+        'DHI': dhi + rng.normal(0, 1, n_rows),
+        'ModA': ghi * rng.uniform(0.9, 1.0, n_rows),
+        'ModB': ghi * rng.uniform(0.88, 1.0, n_rows),
+        'Tamb': 24 + 10 * day + rng.normal(0, 1, n_rows),
+        'RH': np.clip(80 - 40 * day + rng.normal(0, 8, n_rows), 0, 100),
+        'WS': rng.gamma(2, 1, n_rows),
+        'WSgust': rng.gamma(3, 1, n_rows),
+        'WSstdev': rng.uniform(0, 1, n_rows),
+        'WD': rng.uniform(0, 360, n_rows),
+        'WDstdev': rng.uniform(0, 20, n_rows),
+        'BP': 990 + rng.normal(0, 2, n_rows),
+        'Cleaning': (rng.uniform(size=n_rows) < 0.0005).astype(np.int8),
+        'Precipitation': np.where(rng.uniform(size=n_rows) < 0.01, rng.exponential(0.5, n_rows), 0),
+        'TModA': 26 + 25 * day + rng.normal(0, 1, n_rows),
+        'TModB': 26 + 24 * day + rng.normal(0, 1, n_rows),
+        'Comments': np.nan,
+    }, columns=STATION_COLUMNS)
+
+    if null_fraction:
+        for col in ['GHI', 'DNI', 'DHI', 'Tamb', 'WS']:
+            df.loc[rng.uniform(size=n_rows) < null_fraction, col] = np.nan
+    return df
+
+
+def write_station_csv(path, n_rows, seed=0, site='benin', chunksize=1_000_000):
+    """Write ``n_rows`` of synthetic station data to CSV in bounded chunks"""
+    for offset in range(0, n_rows, chunksize):
+        chunk = generate_station_data(min(chunksize, n_rows - offset), seed=seed, site=site,
+                                      offset=offset)
+        chunk.to_csv(path, mode='w' if offset == 0 else 'a', header=offset == 0, index=False)
+    return path
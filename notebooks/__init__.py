@@ -1,32 +1,170 @@
 from flask import Flask, request, jsonify
 import numpy as np
 import joblib
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from notebooks.batching import LatencyStats, MicroBatcher
+from notebooks.caching import PredictionCache, array_key
+from src.instrumentation import enable_from_env, stage
+
+# Single price used to exercise the scaler and model before serving
+WARMUP_INPUT = np.array([[80.0]])
 
 class BrentOilModelAPI:
-    def __init__(self, model_path, scaler_path):
+    def __init__(self, model_path, scaler_path, batching=False, max_batch_size=64, max_wait_ms=5,
+                 cache_size=1024, cache_ttl=300, mmap_mode='r', warmup=True):
+        """Load the model and scaler and register the routes
+
+        With ``batching`` on, concurrent /predict requests are grouped into
+        micro-batches of up to ``max_batch_size`` requests, waiting at most
+        ``max_wait_ms`` for a batch to fill, so the scaler and model run once
+        per batch. Results are cached per input array (LRU of ``cache_size``
+        entries, each valid for ``cache_ttl`` seconds; 0 disables the cache).
+        ``mmap_mode`` memory-maps the arrays of uncompressed joblib files so
+        worker processes share them through the page cache. ``warmup`` runs
+        one prediction before serving (``'background'`` does it in a thread
+        while /health reports 503).
+        """
         self.app = Flask(__name__)
-        self.model = joblib.load(model_path)
-        self.scaler = joblib.load(scaler_path)
+        self.status = 'loading'
+        self.timings = {}
+        start = time.perf_counter()
+        self.model = joblib.load(model_path, mmap_mode=mmap_mode)
+        self.scaler = joblib.load(scaler_path, mmap_mode=mmap_mode)
+        self.timings['load_s'] = time.perf_counter() - start
+        self.mmap_mode = mmap_mode
+        self.stats = LatencyStats()
+        self.cache = PredictionCache(cache_size, cache_ttl) if cache_size else None
+        self.batcher = None
+        if batching:
+            self.batcher = MicroBatcher(self.predict_rows, max_batch_size, max_wait_ms, self.stats)
 
         # Define the routes
         self.app.add_url_rule('/predict', 'predict', self.predict, methods=['POST'])
+        self.app.add_url_rule('/stats', 'stats', self.get_stats, methods=['GET'])
+        self.app.add_url_rule('/health', 'health', self.health, methods=['GET'])
 
-    def predict(self):
-        data = request.json  # Get data from the request
-        input_data = np.array(data['input']).reshape(-1, 1)
-        input_data_scaled = self.scaler.transform(input_data)
+        if warmup == 'background':
+            threading.Thread(target=self.warm_up, name='model-warmup', daemon=True).start()
+        elif warmup:
+            self.warm_up()
+        else:
+            self.status = 'ready'
 
-        # Make prediction
+    def warm_up(self):
+        """Run one prediction so lazy initialisation happens before the first request"""
+        self.status = 'warming'
+        start = time.perf_counter()
+        try:
+            self.predict_rows(WARMUP_INPUT)
+        except Exception as exc:
+            self.status = 'failed'
+            self.timings['warmup_error'] = f"{type(exc).__name__}: {exc}"
+            return False
+        self.timings['warmup_s'] = time.perf_counter() - start
+        self.status = 'ready'
+        return True
+
+    def predict_rows(self, input_data):
+        """Scale, predict and unscale an (n, 1) array of inputs"""
+        input_data_scaled = self.scaler.transform(input_data)
         prediction = self.model.predict(input_data_scaled)
-        prediction = self.scaler.inverse_transform(prediction)  
+        return self.scaler.inverse_transform(prediction)
+
+    def predict(self):
+        start = time.perf_counter()
+        with stage('api.predict', bytes_read=request.content_length) as record:
+            data = request.json  # Get data from the request
+            input_data = np.array(data['input'], dtype=np.float64).reshape(-1, 1)
+            record['rows'] = len(input_data)
 
+            # Repeated windows are answered from the cache
+            key = array_key(input_data) if self.cache is not None else None
+            prediction = self.cache.get(key) if key is not None else None
+            record['cache_hit'] = prediction is not None
+
+            # Make prediction
+            if prediction is None:
+                try:
+                    if self.batcher is not None:
+                        prediction = self.batcher.predict(input_data)
+                    else:
+                        prediction = self.predict_rows(input_data)
+                        self.stats.record_batch(1)
+                except Exception:
+                    self.stats.record_error()
+                    raise
+                if key is not None:
+                    prediction = self.cache.put(key, prediction)
+
+        self.stats.record(time.perf_counter() - start, len(input_data))
         return jsonify({'prediction': prediction.tolist()})
 
+    def get_stats(self):
+        """Latency percentiles and throughput of this worker process"""
+        stats = self.stats.snapshot()
+        stats['mode'] = 'batched' if self.batcher is not None else 'per_request'
+        if self.batcher is not None:
+            stats['max_batch_size'] = self.batcher.max_batch_size
+            stats['max_wait_ms'] = self.batcher.max_wait * 1000
+        stats['cache'] = self.cache.stats() if self.cache is not None else None
+        stats['pid'] = os.getpid()
+        return jsonify(stats)
+
+    def health(self):
+        """Warm-up state and cache hit rate; 503 until the model is ready"""
+        body = {
+            'status': self.status,
+            'mmap_mode': self.mmap_mode,
+            **self.timings,
+            'cache': self.cache.stats() if self.cache is not None else None,
+            'pid': os.getpid(),
+        }
+        return jsonify(body), 200 if self.status == 'ready' else 503
+
     def run(self, debug=True):
         self.app.run(debug=debug)
 
+
+def create_app(model_path=None, scaler_path=None, batching=None, max_batch_size=None, max_wait_ms=None,
+               cache_size=None, cache_ttl=None, mmap_mode=None):
+    """App factory for production servers, one model copy per worker process
+
+    Arguments default to the BRENT_MODEL_PATH, BRENT_SCALER_PATH, BRENT_BATCHING,
+    BRENT_MAX_BATCH_SIZE, BRENT_MAX_WAIT_MS, BRENT_CACHE_SIZE, BRENT_CACHE_TTL
+    and BRENT_MMAP_MODE environment variables (BRENT_MMAP_MODE=none loads
+    without memory mapping), e.g.
+
+        BRENT_MODEL_PATH=model.h5 BRENT_SCALER_PATH=scaler.pkl \\
+            gunicorn -w 4 -k gthread --threads 32 -b 0.0.0.0:8000 'notebooks:create_app()'
+
+    Batching only helps when a worker handles concurrent requests, hence the
+    threaded workers. Without --preload each worker loads the model itself.
+    """
+    enable_from_env()
+    env = os.environ
+    if mmap_mode is None:
+        mmap_mode = env.get('BRENT_MMAP_MODE', 'r')
+    api = BrentOilModelAPI(
+        model_path or env['BRENT_MODEL_PATH'],
+        scaler_path or env['BRENT_SCALER_PATH'],
+        batching=batching if batching is not None else env.get('BRENT_BATCHING', '1') != '0',
+        max_batch_size=max_batch_size or int(env.get('BRENT_MAX_BATCH_SIZE', 64)),
+        max_wait_ms=max_wait_ms if max_wait_ms is not None else float(env.get('BRENT_MAX_WAIT_MS', 5)),
+        cache_size=cache_size if cache_size is not None else int(env.get('BRENT_CACHE_SIZE', 1024)),
+        cache_ttl=cache_ttl if cache_ttl is not None else float(env.get('BRENT_CACHE_TTL', 300)),
+        mmap_mode=None if mmap_mode == 'none' else mmap_mode,
+        warmup='background',
+    )
+    return api.app
+
 if __name__ == '__main__':
-    model_path = '/home/nahomnadew/Desktop/10x/week10/Brent_oil/model.h5'  
-    scaler_path = '/home/nahomnadew/Desktop/10x/week10/Brent_oil/scaler.pkl'  
+    enable_from_env()
+    model_path = os.environ.get('BRENT_MODEL_PATH', '/home/nahomnadew/Desktop/10x/week10/Brent_oil/model.h5')
+    scaler_path = os.environ.get('BRENT_SCALER_PATH', '/home/nahomnadew/Desktop/10x/week10/Brent_oil/scaler.pkl')
     api = BrentOilModelAPI(model_path, scaler_path)
     api.run()
\ No newline at end of file
@@ -0,0 +1,155 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+from src.instrumentation import stage
+
+
+class LatencyStats:
+    """Thread-safe request latency and throughput counters
+
+    Latency percentiles are taken over the last ``window`` requests;
+    throughput is averaged since the stats were created or reset.
+    """
+
+    def __init__(self, window=10_000):
+        self.window = window
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.monotonic()
+            self.requests = 0
+            self.rows = 0
+            self.batches = 0
+            self.batched_requests = 0
+            self.errors = 0
+            self.latencies = deque(maxlen=self.window)
+
+    def record(self, seconds, rows):
+        with self._lock:
+            self.requests += 1
+            self.rows += rows
+            self.latencies.append(seconds)
+
+    def record_batch(self, requests):
+        with self._lock:
+            self.batches += 1
+            self.batched_requests += requests
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self):
+        with self._lock:
+            latencies = np.array(self.latencies) * 1000
+            uptime = time.monotonic() - self.started
+            stats = {
+                'requests': self.requests,
+                'rows': self.rows,
+                'errors': self.errors,
+                'batches': self.batches,
+                'mean_batch_requests': self.batched_requests / self.batches if self.batches else None,
+                'uptime_s': uptime,
+                'requests_per_s': self.requests / uptime if uptime else None,
+                'rows_per_s': self.rows / uptime if uptime else None,
+            }
+        if len(latencies):
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            stats['latency_ms'] = {'mean': float(latencies.mean()), 'p50': float(p50),
+                                   'p95': float(p95), 'p99': float(p99), 'max': float(latencies.max())}
+        else:
+            stats['latency_ms'] = None
+        return stats
+
+
+class MicroBatcher:
+    """Run ``func`` once for many concurrent requests
+
+    Requests submitted from any thread are queued; a background thread takes
+    the first waiting request, keeps collecting until ``max_batch_size``
+    requests are queued or ``max_wait_ms`` has passed, calls ``func`` on the
+    row-wise concatenation of their inputs and hands each request its slice
+    of the result. ``func`` must treat rows independently. The thread is
+    (re)started lazily in each process, so the batcher survives a fork into
+    pre-forking server workers.
+    """
+
+    def __init__(self, func, max_batch_size=64, max_wait_ms=5, stats=None):
+        self.func = func
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.stats = stats
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_worker(self):
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+
+    def submit(self, rows):
+        """Queue an array of input rows; returns a Future of the matching output rows"""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((np.asarray(rows), future))
+        return future
+
+    def predict(self, rows):
+        """Submit and wait for the result"""
+        return self.submit(rows).result()
+
+    def close(self):
+        """Stop the background thread once the queued requests are served"""
+        if self._pid == os.getpid():
+            self._queue.put(None)
+            self._thread.join()
+            self._pid = None
+
+    def _collect(self, first):
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # Serve this batch, then stop
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect(first)
+            inputs = [rows for rows, _ in batch]
+            lengths = [len(rows) for rows in inputs]
+            try:
+                with stage('api.predict_batch', rows=sum(lengths), requests=len(batch)):
+                    output = np.asarray(self.func(np.concatenate(inputs)))
+                parts = np.split(output, np.cumsum(lengths)[:-1])
+            except Exception as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+            if self.stats is not None:
+                self.stats.record_batch(len(batch))
+            for (_, future), part in zip(batch, parts):
+                future.set_result(part)
@@ -0,0 +1,291 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import joblib
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from src.instrumentation import enable_from_env, stage
+
+DEFAULT_MEMORY_CAP_MB = 1024
+logger = logging.getLogger('solar.models')
+
+
+class LoadedModel:
+    """A model with its optional scaler, predicting on (n, 1) arrays"""
+
+    def __init__(self, name, model, scaler=None, size_bytes=0):
+        self.name = name
+        self.model = model
+        self.scaler = scaler
+        self.size_bytes = size_bytes
+        self.loaded_at = time.time()
+        self.calls = 0
+
+    def predict_rows(self, input_data):
+        self.calls += 1
+        if self.scaler is None:
+            return np.asarray(self.model.predict(input_data))
+        prediction = self.model.predict(self.scaler.transform(input_data))
+        return self.scaler.inverse_transform(prediction)
+
+
+class ModelRegistry:
+    """Named models loaded on first use and evicted least-recently-used under a memory cap
+
+    Each entry of the config maps a name to ``{"model": path, "scaler":
+    path (optional), "size_mb": estimate (optional)}``. Without ``size_mb``
+    a model's footprint is estimated from its files on disk. The model just
+    requested is never evicted, even if it alone exceeds the cap.
+    """
+
+    def __init__(self, config=None, memory_cap_mb=DEFAULT_MEMORY_CAP_MB, mmap_mode='r'):
+        self.specs = {}
+        self.memory_cap = memory_cap_mb * 1024 ** 2
+        self.mmap_mode = mmap_mode
+        self._loaded = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self.loads = 0
+        self.evictions = 0
+        for name, spec in (config or {}).items():
+            self.register(name, **spec)
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """Registry from a JSON config file; relative paths are resolved against its folder"""
+        with open(path, encoding='utf-8') as f:
+            config = json.load(f)
+        base = os.path.dirname(os.path.abspath(path))
+        for spec in config.values():
+            for key in ('model', 'scaler'):
+                if spec.get(key):
+                    spec[key] = os.path.join(base, spec[key])
+        return cls(config, **kwargs)
+
+    def register(self, name, model, scaler=None, size_mb=None):
+        with self._lock:
+            self.specs[name] = {'model': model, 'scaler': scaler, 'size_mb': size_mb}
+            self._load_locks.setdefault(name, threading.Lock())
+
+    def config(self):
+        """Registered specs, e.g. to build the same registry in a worker process"""
+        return {name: dict(spec) for name, spec in self.specs.items()}
+
+    def get(self, name):
+        """The loaded model ``name``, loading it (and evicting others) if needed"""
+        if name not in self.specs:
+            raise KeyError(name)
+        with self._lock:
+            entry = self._loaded.get(name)
+            if entry is not None:
+                self._loaded.move_to_end(name)
+                return entry
+
+        # Load outside the registry lock so other models stay available meanwhile
+        with self._load_locks[name]:
+            with self._lock:
+                entry = self._loaded.get(name)
+            if entry is None:
+                entry = self._load(name)
+                with self._lock:
+                    self._loaded[name] = entry
+                    self._evict(keep=name)
+                    self.loads += 1
+        return entry
+
+    def _load(self, name):
+        spec = self.specs[name]
+        with stage('registry.load', model=name):
+            model = joblib.load(spec['model'], mmap_mode=self.mmap_mode)
+            scaler = joblib.load(spec['scaler'], mmap_mode=self.mmap_mode) if spec['scaler'] else None
+        if spec['size_mb'] is not None:
+            size = int(spec['size_mb'] * 1024 ** 2)
+        else:
+            size = sum(os.path.getsize(path) for path in (spec['model'], spec['scaler']) if path)
+        return LoadedModel(name, model, scaler, size)
+
+    def _evict(self, keep):
+        while self.memory_used() > self.memory_cap and len(self._loaded) > 1:
+            oldest = next(iter(self._loaded))
+            if oldest == keep:
+                self._loaded.move_to_end(oldest)
+                continue
+            del self._loaded[oldest]
+            self.evictions += 1
+
+    def memory_used(self):
+        return sum(entry.size_bytes for entry in self._loaded.values())
+
+    def predict(self, name, input_data):
+        """Blocking prediction with model ``name``; run it in an executor from async code"""
+        input_data = np.asarray(input_data, dtype=np.float64).reshape(-1, 1)
+        with stage('registry.predict', rows=len(input_data), model=name):
+            return self.get(name).predict_rows(input_data)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'registered': sorted(self.specs),
+                'loaded': list(self._loaded),
+                'memory_used_mb': self.memory_used() / 1024 ** 2,
+                'memory_cap_mb': self.memory_cap / 1024 ** 2,
+                'loads': self.loads,
+                'evictions': self.evictions,
+            }
+
+
+# Registry of a worker process when predictions run in a process pool
+_worker_registry = None
+
+
+def _init_worker(config, memory_cap_mb, mmap_mode):
+    global _worker_registry
+    enable_from_env()
+    _worker_registry = ModelRegistry(config, memory_cap_mb, mmap_mode)
+
+
+def _predict_in_worker(name, input_data):
+    """Prediction plus the worker's pid and registry stats, so /health can report them"""
+    prediction = _worker_registry.predict(name, input_data)
+    return prediction, os.getpid(), _worker_registry.stats()
+
+
+class InferenceServer:
+    """ASGI app serving every registry model without blocking the event loop
+
+    Routes: ``POST /models/<name>/predict`` with ``{"input": [...]}``,
+    ``GET /models`` and ``GET /health``. Predictions (and the lazy loads they
+    trigger) run in a thread pool sharing the registry, or in a process pool
+    where each worker keeps its own registry, which suits models that hold
+    the GIL. The memory cap applies per registry, so in process mode up to
+    ``workers × cap`` of models can be resident; /health then reports each
+    worker's registry as of its last prediction. Errors inside a prediction
+    are logged and answered with a generic 500. Run with e.g.
+
+        MODEL_REGISTRY_CONFIG=models.json uvicorn notebooks.model_registry:create_app --factory
+    """
+
+    def __init__(self, registry, executor='thread', max_workers=None):
+        self.registry = registry
+        self.executor_kind = executor
+        self.workers = max_workers or os.cpu_count() or 1
+        self.worker_stats = {}
+        if executor == 'process':
+            self.executor = ProcessPoolExecutor(
+                max_workers=max_workers, initializer=_init_worker,
+                initargs=(registry.config(), registry.memory_cap / 1024 ** 2, registry.mmap_mode))
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.requests = 0
+        self.started = time.time()
+
+    async def predict(self, name, input_data):
+        loop = asyncio.get_running_loop()
+        if self.executor_kind == 'process':
+            prediction, pid, stats = await loop.run_in_executor(self.executor, _predict_in_worker,
+                                                                 name, input_data)
+            self.worker_stats[pid] = stats
+            return prediction
+        return await loop.run_in_executor(self.executor, self.registry.predict, name, input_data)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        method, parts = scope['method'], [part for part in scope['path'].split('/') if part]
+        if method == 'GET' and parts == ['health']:
+            await self._respond(send, 200, {'status': 'ok', 'executor': self.executor_kind,
+                                            'requests': self.requests,
+                                            'uptime_s': time.time() - self.started,
+                                            **self.registry_stats()})
+        elif method == 'GET' and parts == ['models']:
+            await self._respond(send, 200, {'models': sorted(self.registry.specs)})
+        elif method == 'POST' and len(parts) == 3 and parts[0] == 'models' and parts[2] == 'predict':
+            await self._handle_predict(parts[1], receive, send)
+        else:
+            await self._respond(send, 404, {'error': 'Not found'})
+
+    async def _handle_predict(self, name, receive, send):
+        if name not in self.registry.specs:
+            await self._respond(send, 404, {'error': f"Unknown model: {name}"})
+            return
+        try:
+            data = json.loads(await self._read_body(receive))
+            input_data = data['input']
+        except (ValueError, KeyError, TypeError):
+            await self._respond(send, 400, {'error': 'Expected a JSON body with an "input" list'})
+            return
+        self.requests += 1
+        try:
+            prediction = await self.predict(name, input_data)
+        except Exception:
+            logger.exception("Prediction with model %s failed", name)
+            await self._respond(send, 500, {'error': 'Internal server error'})
+            return
+        await self._respond(send, 200, {'model': name, 'prediction': np.asarray(prediction).tolist()})
+
+    def registry_stats(self):
+        """Stats of the registry that serves predictions (every worker's in process mode)"""
+        if self.executor_kind != 'process':
+            return self.registry.stats()
+        workers = [{'pid': pid, **stats} for pid, stats in sorted(self.worker_stats.items())]
+        cap_mb = self.registry.memory_cap / 1024 ** 2
+        return {
+            'registered': sorted(self.registry.specs),
+            'memory_cap_mb': cap_mb,  # Per worker
+            'max_memory_mb': cap_mb * self.workers,
+            'memory_used_mb': sum(stats['memory_used_mb'] for stats in workers),
+            'loads': sum(stats['loads'] for stats in workers),
+            'evictions': sum(stats['evictions'] for stats in workers),
+            'workers': workers,
+        }
+
+    @staticmethod
+    async def _read_body(receive):
+        body, more = b'', True
+        while more:
+            message = await receive()
+            body += message.get('body', b'')
+            more = message.get('more_body', False)
+        return body
+
+    @staticmethod
+    async def _respond(send, status, payload):
+        body = json.dumps(payload).encode()
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': [(b'content-type', b'application/json'),
+                                (b'content-length', str(len(body)).encode())]})
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+def create_app(config_path=None, memory_cap_mb=None, executor=None, max_workers=None):
+    """ASGI app factory; arguments default to MODEL_REGISTRY_CONFIG,
+    MODEL_MEMORY_CAP_MB, MODEL_EXECUTOR ('thread' or 'process') and MODEL_WORKERS"""
+    enable_from_env()
+    env = os.environ
+    registry = ModelRegistry.from_file(
+        config_path or env['MODEL_REGISTRY_CONFIG'],
+        memory_cap_mb=memory_cap_mb or float(env.get('MODEL_MEMORY_CAP_MB', DEFAULT_MEMORY_CAP_MB)))
+    workers = max_workers or (int(env['MODEL_WORKERS']) if env.get('MODEL_WORKERS') else None)
+    return InferenceServer(registry, executor or env.get('MODEL_EXECUTOR', 'thread'), workers)
@@ -0,0 +1,154 @@
+"""Load test for the Brent prediction API, per-request vs micro-batched
+
+Against running servers:
+
+    python scripts/load_test.py --url http://localhost:8000 --requests 2000 --concurrency 32
+
+Or start both modes locally on a real model, or on a demo model that
+mimics a fixed per-call cost (``--demo-overhead-ms``), and compare:
+
+    python scripts/load_test.py --model model.h5 --scaler scaler.pkl
+    python scripts/load_test.py --demo-overhead-ms 2
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import joblib
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from notebooks import BrentOilModelAPI
+
+
+class DemoScaler:
+    """Min-max style scaler standing in for the fitted one"""
+
+    def transform(self, x):
+        return (np.asarray(x) - 20) / 100
+
+    def inverse_transform(self, x):
+        return np.asarray(x) * 100 + 20
+
+
+class DemoModel:
+    """Model with a fixed CPU-bound per-call overhead, like a Keras predict"""
+
+    def __init__(self, overhead_ms=2):
+        self.overhead_ms = overhead_ms
+
+    def predict(self, x):
+        deadline = time.perf_counter() + self.overhead_ms / 1000
+        while time.perf_counter() < deadline:
+            pass
+        return np.asarray(x) * 1.01
+
+
+def _request(parsed, method, path, body=None):
+    conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=30)
+    try:
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        return response.status, response.read()
+    finally:
+        conn.close()
+
+
+def run_load(url, requests=1000, concurrency=16, rows=1, seed=0):
+    """Fire ``requests`` POSTs from ``concurrency`` threads; client-side latency and throughput"""
+    parsed = urlparse(url)
+    rng = np.random.default_rng(seed)
+    bodies = [json.dumps({'input': rng.uniform(40, 120, rows).round(2).tolist()}) for _ in range(requests)]
+    latencies = np.zeros(requests)
+    failures = []
+
+    def send(i):
+        start = time.perf_counter()
+        status, _ = _request(parsed, 'POST', '/predict', bodies[i])
+        latencies[i] = time.perf_counter() - start
+        if status != 200:
+            failures.append(status)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(send, range(requests)))
+    elapsed = time.perf_counter() - start
+
+    status, body = _request(parsed, 'GET', '/stats')
+    server = json.loads(body) if status == 200 else {}
+    p50, p95, p99 = np.percentile(latencies * 1000, [50, 95, 99])
+    return {'requests': requests, 'failures': len(failures), 'seconds': elapsed,
+            'requests_per_s': requests / elapsed, 'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99,
+            'server_mode': server.get('mode'), 'mean_batch_requests': server.get('mean_batch_requests')}
+
+
+def serve_locally(api):
+    """Serve an API on a free local port in a background thread; returns (url, server)"""
+    from werkzeug.serving import make_server
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, api.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server
+
+
+def print_result(label, result):
+    batch = result['mean_batch_requests']
+    print(f"{label:12} {result['requests_per_s']:9.1f} req/s  p50 {result['p50_ms']:7.2f} ms  "
+          f"p95 {result['p95_ms']:7.2f} ms  p99 {result['p99_ms']:7.2f} ms  "
+          f"batch {batch or 0:5.1f}  failures {result['failures']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the Brent prediction API")
+    parser.add_argument('--url', help="test an already running server instead of starting one")
+    parser.add_argument('--model', help="model file for the local servers")
+    parser.add_argument('--scaler', help="scaler file for the local servers")
+    parser.add_argument('--demo-overhead-ms', type=float, default=2,
+                        help="per-call cost of the demo model used without --model")
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--rows', type=int, default=1, help="input values per request")
+    parser.add_argument('--max-batch-size', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=5)
+    args = parser.parse_args(argv)
+
+    if args.url:
+        print_result('server', run_load(args.url, args.requests, args.concurrency, args.rows))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path, scaler_path = args.model, args.scaler
+        if not model_path:
+            model_path, scaler_path = os.path.join(tmp, 'model.pkl'), os.path.join(tmp, 'scaler.pkl')
+            joblib.dump(DemoModel(args.demo_overhead_ms), model_path)
+            joblib.dump(DemoScaler(), scaler_path)
+
+        results = {}
+        for label, batching in [('per-request', False), ('batched', True)]:
+            api = BrentOilModelAPI(model_path, scaler_path, batching=batching,
+                                   max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+            url, server = serve_locally(api)
+            try:
+                results[label] = run_load(url, args.requests, args.concurrency, args.rows)
+            finally:
+                server.shutdown()
+                if api.batcher is not None:
+                    api.batcher.close()
+            print_result(label, results[label])
+
+    gain = results['batched']['requests_per_s'] / results['per-request']['requests_per_s']
+    print(f"✅ Micro-batching throughput: {gain:.2f}x the per-request path")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,13 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from src.validation import canonicalize_columns
+
+
 def clean_column_names(df):
-    df.columns = [c.strip().lower() for c in df.columns]
-    return df
+    """Strip headers and map them to the schema spelling ('ghi', 'mod_a' -> 'GHI', 'ModA')
+
+    Lower-casing them instead would break every lookup of 'GHI', 'ModA', ...
+    """
+    return canonicalize_columns(df)
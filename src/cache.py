@@ -0,0 +1,133 @@
+import json
+import os
+import threading
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:  # The cache is an optional speed-up
+    pa = None
+
+# Uncompressed Feather (Arrow IPC) files can be memory-mapped without a copy
+CACHE_SUFFIX = '.feather'
+SOURCE_METADATA_KEY = b'solar_source'
+# Caches keep every column, Timestamp included, as a plain column with the dtypes a
+# default CSV parse gives (datetime Timestamp, float64, int64); readers set their own index
+CACHE_LAYOUT = 'columns-v2'
+TIME_COLUMN = 'Timestamp'
+
+
+def cache_path(csv_path):
+    """Path of the columnar cache that sits next to a CSV file"""
+    root, _ = os.path.splitext(csv_path)
+    return root + CACHE_SUFFIX
+
+
+def source_key(csv_path):
+    """Fingerprint of the source CSV used to invalidate its cache"""
+    stat = os.stat(csv_path)
+    return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'layout': CACHE_LAYOUT}
+
+
+def _cached_schema(csv_path):
+    """Schema of a cache that is still fresh for ``csv_path``, else None"""
+    path = cache_path(csv_path)
+    if pa is None or not os.path.exists(path) or not os.path.exists(csv_path):
+        return None
+    try:
+        with pa.memory_map(path) as source:
+            schema = pa.ipc.open_file(source).schema
+    except (OSError, pa.ArrowInvalid):
+        return None
+    stored = (schema.metadata or {}).get(SOURCE_METADATA_KEY)
+    if stored is None or json.loads(stored) != source_key(csv_path):
+        return None
+    return schema
+
+
+def is_cache_valid(csv_path):
+    """True when the cache exists, matches the CSV's mtime and size and has the current layout"""
+    return _cached_schema(csv_path) is not None
+
+
+def read_path(csv_path):
+    """File ``read_csv_cached`` would read: the cache when fresh, else the CSV"""
+    return cache_path(csv_path) if is_cache_valid(csv_path) else csv_path
+
+
+def _csv_dtypes(df):
+    """``df`` with the dtypes ``pd.read_csv`` infers: Timestamp parsed, float64 and int64 numbers"""
+    widened = {}
+    for col, dtype in df.dtypes.items():
+        if col == TIME_COLUMN and not pd.api.types.is_datetime64_any_dtype(dtype):
+            widened[col] = pd.to_datetime(df[col])
+        elif pd.api.types.is_float_dtype(dtype) and dtype != 'float64':
+            widened[col] = df[col].astype('float64')
+        elif pd.api.types.is_integer_dtype(dtype) and dtype != 'int64':
+            widened[col] = df[col].astype('int64')
+    return df.assign(**widened) if widened else df
+
+
+def write_cache(df, csv_path):
+    """Write ``df`` as the columnar cache of ``csv_path``, with a named index stored as a column
+
+    Narrow dtypes (float32, uint8) are widened to what a CSV parse gives,
+    so a cache written from a typed frame reads back like one built by
+    ``read_csv_cached``.
+    """
+    if pa is None:
+        return None
+
+    if df.index.name is not None:
+        df = df.reset_index()
+    df = _csv_dtypes(df)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[SOURCE_METADATA_KEY] = json.dumps(source_key(csv_path)).encode()
+    table = table.replace_schema_metadata(metadata)
+
+    # Write to a temporary file first so concurrent readers never see half a cache
+    path = cache_path(csv_path)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    feather.write_feather(table, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, path)
+    return path
+
+
+def _apply_layout(df, parse_dates=None, index_col=None):
+    """Give a cached frame the dtypes and index a ``pd.read_csv`` call with these arguments would"""
+    for col in parse_dates if isinstance(parse_dates, (list, tuple)) else []:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col].dtype):
+            df[col] = pd.to_datetime(df[col])
+    if index_col is not None:
+        df = df.set_index(index_col)
+    return df
+
+
+def read_csv_cached(csv_path, columns=None, **read_csv_kwargs):
+    """Read a CSV through its columnar cache, building the cache on a miss
+
+    ``columns`` limits the read to a subset of columns; the ``index_col``
+    column is always kept. Hits and misses return the same frame whichever
+    call built the cache: Timestamp parsed to datetime and the dtypes of
+    a default CSV parse (float64, int64), with ``parse_dates`` and
+    ``index_col`` applied afterwards. Other keyword arguments go to
+    ``pd.read_csv`` on a miss.
+    """
+    index_col = read_csv_kwargs.pop('index_col', None)
+    parse_dates = read_csv_kwargs.pop('parse_dates', None)
+    if columns is not None:
+        keep = [index_col] if isinstance(index_col, str) else []
+        columns = keep + [col for col in columns if col not in keep]
+    schema = _cached_schema(csv_path)
+    if schema is not None:
+        if columns is not None:
+            columns = [col for col in columns if col in schema.names]
+        df = feather.read_table(cache_path(csv_path), columns=columns, memory_map=True).to_pandas()
+    else:
+        df = _csv_dtypes(pd.read_csv(csv_path, **read_csv_kwargs))
+        write_cache(df, csv_path)
+        if columns is not None:
+            df = df[[col for col in columns if col in df.columns]]
+    return _apply_layout(df, parse_dates, index_col)
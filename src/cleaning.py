@@ -0,0 +1,211 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.resample import measured_rows
+from src.sketches import QuantileSketch
+
+
+class StreamingCleaner:
+    """Chunked version of ``SolarDataEDA.clean_data`` with O(columns) state
+
+    ``fit`` makes one pass over the chunks and accumulates per-column null
+    counts (over the rows not inserted by ``regularize``), means and variances (Chan's parallel update) and a median sketch.
+    ``transform`` then drops the highly null columns, fills the rest with the
+    medians and flags rows with any key column beyond ``z_threshold``.
+
+    Tolerance against the in-memory ``clean_data``: sketched medians are
+    within roughly ``1 / compression`` of the exact median in rank (about 0.1%
+    of rows by default). With ``exact_median=True`` a second pass resolves the
+    exact pandas median. Means and variances are accumulated in float64, so
+    z-scores agree with ``scipy.stats.zscore`` to about 1e-9 relative and
+    only rows sitting on the threshold can be flagged differently.
+    """
+
+    def __init__(self, key_columns, null_threshold=5, z_threshold=3,
+                 exact_median=False, compression=1000):
+        self.key_columns = list(key_columns)
+        self.null_threshold = null_threshold
+        self.z_threshold = z_threshold
+        self.exact_median = exact_median
+        self.compression = compression
+        self.reset()
+
+    def reset(self):
+        """Forget everything seen so far"""
+        self.total_rows = 0
+        self.measured_rows = 0
+        self.missing_data = None
+        self.numeric_cols = []
+        self.counts = None
+        self.means = None
+        self.m2 = None
+        self.sketches = {}
+
+    def partial_fit(self, chunk):
+        """Accumulate statistics from one chunk"""
+        if self.missing_data is None:
+            self.missing_data = pd.Series(0, index=chunk.columns, dtype=np.int64)
+            self.numeric_cols = chunk.select_dtypes(include=[np.number]).columns.tolist()
+            self.counts = np.zeros(len(self.numeric_cols))
+            self.means = np.zeros(len(self.numeric_cols))
+            self.m2 = np.zeros(len(self.numeric_cols))
+            self.sketches = {col: QuantileSketch(self.compression) for col in self.numeric_cols}
+
+        measured = measured_rows(chunk)
+        self.total_rows += len(chunk)
+        self.measured_rows += int(measured.sum())
+        self.missing_data = self.missing_data.add(chunk[measured].isna().sum(), fill_value=0).astype(np.int64)
+
+        values = chunk[self.numeric_cols].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values)
+        n_b = valid.sum(axis=0)
+        sums = np.where(valid, values, 0).sum(axis=0)
+        mean_b = np.divide(sums, n_b, out=np.zeros_like(sums), where=n_b > 0)
+        m2_b = np.where(valid, (values - mean_b) ** 2, 0).sum(axis=0)
+
+        n = self.counts + n_b
+        delta = mean_b - self.means
+        ratio = np.divide(n_b, n, out=np.zeros_like(n), where=n > 0)
+        self.means = self.means + delta * ratio
+        self.m2 = self.m2 + m2_b + delta ** 2 * self.counts * ratio
+        self.counts = n
+
+        for idx, col in enumerate(self.numeric_cols):
+            self.sketches[col].update(values[valid[:, idx], idx])
+        return self
+
+    def fit(self, chunks):
+        """Fit on an iterable of chunks, or a callable returning one
+
+        The exact median mode needs a second pass and therefore a callable.
+        """
+        self.reset()
+        for chunk in (chunks() if callable(chunks) else chunks):
+            self.partial_fit(chunk)
+        if self.exact_median:
+            if not callable(chunks):
+                raise ValueError("exact_median=True needs a callable that re-creates the chunks")
+            return self.finalize(self._exact_medians(chunks))
+        return self.finalize()
+
+    def _exact_medians(self, chunks, eps=0.01):
+        """Resolve exact medians with a pass that keeps only values near the sketch median"""
+        medians = {}
+        pending = list(self.numeric_cols)
+        while pending:
+            bounds = {col: self.sketches[col].quantile([max(0.5 - eps, 0), min(0.5 + eps, 1)])
+                      for col in pending}
+            if eps >= 0.5:
+                bounds = {col: (-np.inf, np.inf) for col in pending}
+            below = dict.fromkeys(pending, 0)
+            kept = {col: [] for col in pending}
+            for chunk in chunks():
+                for col in pending:
+                    values = chunk[col].to_numpy(dtype=np.float64)
+                    lo, hi = bounds[col]
+                    below[col] += int((values < lo).sum())
+                    kept[col].append(values[(values >= lo) & (values <= hi)])
+
+            for col in list(pending):
+                n = int(self.counts[self.numeric_cols.index(col)])
+                if n == 0:
+                    medians[col] = np.nan
+                    pending.remove(col)
+                    continue
+                window = np.sort(np.concatenate(kept[col]))
+                lo_rank, hi_rank = (n - 1) // 2 - below[col], n // 2 - below[col]
+                if 0 <= lo_rank and hi_rank < len(window):
+                    medians[col] = (window[lo_rank] + window[hi_rank]) / 2
+                    pending.remove(col)
+            eps *= 4
+        return pd.Series(medians, dtype=np.float64).reindex(self.numeric_cols)
+
+    def finalize(self, medians=None):
+        """Derive fill values, drop list and post-fill z-score parameters
+
+        ``medians`` defaults to the sketch medians.
+        """
+        if medians is None:
+            medians = pd.Series({col: self.sketches[col].median() for col in self.numeric_cols},
+                                dtype=np.float64)
+        self.medians = medians
+        self.missing_percentage = (self.missing_data / max(self.measured_rows, 1)) * 100
+        self.columns_to_drop = self.missing_percentage[self.missing_percentage > self.null_threshold].index
+
+        kept = [col for col in self.numeric_cols if col not in self.columns_to_drop]
+        self.fill_values = self.medians[kept]
+        self.z_columns = [col for col in self.key_columns if col in kept]
+
+        # Mean and variance after the median fill, without another pass
+        idx = [self.numeric_cols.index(col) for col in self.z_columns]
+        n, mean, m2 = self.counts[idx], self.means[idx], self.m2[idx]
+        nulls = self.total_rows - n
+        fill = self.medians[self.z_columns].to_numpy()
+        filled_mean = (n * mean + nulls * fill) / max(self.total_rows, 1)
+        filled_m2 = m2 + n * (mean - filled_mean) ** 2 + nulls * (fill - filled_mean) ** 2
+        self.z_means = filled_mean
+        self.z_stds = np.sqrt(filled_m2 / max(self.total_rows, 1))
+        return self
+
+    def transform(self, chunk):
+        """Clean one chunk with the fitted statistics"""
+        chunk = chunk.drop(columns=[col for col in self.columns_to_drop if col in chunk.columns])
+        chunk = chunk.fillna(self.fill_values)
+        if self.z_columns:
+            values = chunk[self.z_columns].to_numpy(dtype=np.float64)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                z = np.abs((values - self.z_means) / self.z_stds)
+            chunk['Outliers'] = (z > self.z_threshold).any(axis=1)
+        return chunk
+
+    def to_dict(self):
+        """JSON-serialisable running state"""
+        return {
+            'key_columns': self.key_columns,
+            'null_threshold': self.null_threshold,
+            'z_threshold': self.z_threshold,
+            'compression': self.compression,
+            'total_rows': self.total_rows,
+            'measured_rows': self.measured_rows,
+            'missing_data': {} if self.missing_data is None else
+                            {col: int(count) for col, count in self.missing_data.items()},
+            'numeric_cols': self.numeric_cols,
+            'counts': [] if self.counts is None else self.counts.tolist(),
+            'means': [] if self.means is None else self.means.tolist(),
+            'm2': [] if self.m2 is None else self.m2.tolist(),
+            'sketches': {col: sketch.to_dict() for col, sketch in self.sketches.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        """Rebuild a cleaner saved with ``to_dict``"""
+        cleaner = cls(state['key_columns'], null_threshold=state['null_threshold'],
+                      z_threshold=state['z_threshold'], compression=state['compression'])
+        if state['numeric_cols'] or state['missing_data']:
+            cleaner.total_rows = state['total_rows']
+            cleaner.measured_rows = state.get('measured_rows', state['total_rows'])
+            cleaner.missing_data = pd.Series(state['missing_data'], dtype=np.int64)
+            cleaner.numeric_cols = state['numeric_cols']
+            cleaner.counts = np.asarray(state['counts'], dtype=np.float64)
+            cleaner.means = np.asarray(state['means'], dtype=np.float64)
+            cleaner.m2 = np.asarray(state['m2'], dtype=np.float64)
+            cleaner.sketches = {col: QuantileSketch.from_dict(sketch)
+                                for col, sketch in state['sketches'].items()}
+            cleaner.finalize()
+        return cleaner
+
+    def save(self, path):
+        """Persist the running state as JSON"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load running state written by ``save``"""
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
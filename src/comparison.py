@@ -1,28 +1,147 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
-from scipy.stats import kruskal
+
+from src.dataset import read_country, source_files
+from src.country_stats import GroupedStats
+from src.downsample import binned_scatter
+from src.instrumentation import instrumented
+from src.soiling import soiling_summary
+from src.solar_geometry import SITES, clear_sky, clear_sky_index, daytime_mask, resolve_location
+from src.streaming_stats import collect_stats, frame_stats
+from src.wind_rose import WindRose
+
+# Columns summarised for the histogram and correlation figures
+STATS_COLUMNS = ['GHI', 'DNI', 'DHI', 'Tamb', 'RH', 'WS', 'BP']
+
+
+def _combined_rows(comparator, result):
+    return None if comparator.combined_df is None else len(comparator.combined_df)
+
 
 class CountryComparator:
     def __init__(self):
         self.combined_df = None
         self.results = {}
         self.country_data = {}
+        self.data_version = 0
+        self._stats_engines = {}
+        self.sources = {}
     
-    def load_and_combine(self, country_data_dict):
-        """Load and combine all country data with country labels"""
-        country_dfs = []
-        self.country_data = {}
-        
-        for country_name, filepath in country_data_dict.items():
-            df = pd.read_csv(filepath)
-            df['country'] = country_name
-            country_dfs.append(df)
-            self.country_data[country_name] = df
-        
-        self.combined_df = pd.concat(country_dfs, ignore_index=True)
-        print(f"✅ Combined {len(country_dfs)} countries with {len(self.combined_df)} total rows")
+    @instrumented('comparison.load_and_combine', rows=_combined_rows,
+                  reads=lambda self, call: [file for path in call['country_data_dict'].values()
+                                            for file in source_files(path, call['start'], call['end'])])
+    def load_and_combine(self, country_data_dict, columns=None, max_workers=None, executor='thread',
+                         start=None, end=None):
+        """Load and combine all country data with country labels
+
+        Files are read through their columnar cache, concurrently in a
+        ``'thread'`` or ``'process'`` pool of ``max_workers`` (``max_workers=1``
+        reads them one after another). Paths may also be country directories
+        of a ``DatasetStore``. ``columns`` limits the load to a subset of
+        columns and ``start``/``end`` to rows with start <= Timestamp < end,
+        reading only the matching partitions of a store. ``country`` is
+        stored as a categorical and the per-country frames in
+        ``self.country_data`` are slices of ``self.combined_df`` rather than
+        separate copies.
+        """
+        names = list(country_data_dict)
+        paths = [country_data_dict[name] for name in names]
+        self.sources = {} if start is not None or end is not None else dict(country_data_dict)
+        n = len(paths)
+
+        if max_workers == 1 or n <= 1:
+            country_dfs = [read_country(path, columns, start, end) for path in paths]
+        else:
+            pool_class = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+            with pool_class(max_workers=max_workers) as pool:
+                country_dfs = list(pool.map(read_country, paths, [columns] * n, [start] * n, [end] * n))
+
+        lengths = [len(df) for df in country_dfs]
+        combined_df = pd.concat(country_dfs, ignore_index=True)
+        del country_dfs
+        codes = np.repeat(np.arange(len(names)), lengths)
+        combined_df['country'] = pd.Categorical.from_codes(codes, categories=names)
+
+        self.set_combined(combined_df)
+        print(f"✅ Combined {len(names)} countries with {len(self.combined_df)} total rows")
+        return self.combined_df
+
+    def use_sources(self, country_data_dict):
+        """Record country files (CSVs or store directories) for the streamed figures without loading them"""
+        self.sources = dict(country_data_dict)
+        self.data_version += 1
+        return self
+
+    def streaming_stats(self, columns=STATS_COLUMNS, workers=None):
+        """Per-country ``StreamingStats`` of ``columns`` for the histogram and heatmap figures
+
+        Loaded countries are summarised from their rows in memory. Without
+        loaded data (after ``use_sources``), each country's files are
+        streamed with ``collect_stats``, which summarises them in worker
+        processes and merges the results, so these figures also work on
+        data larger than memory.
+        """
+        def compute():
+            if self.country_data:
+                return {country: frame_stats(df, columns) for country, df in self.country_data.items()}
+            return {country: collect_stats([path], columns, workers=workers)
+                    for country, path in self.sources.items()}
+        return self._memoized('streaming_stats', (tuple(columns),), compute)
+
+    def set_combined(self, combined_df, results=None):
+        """Use an already combined frame whose categorical ``country`` rows are contiguous
+
+        ``results`` are memoized results of the same frame from ``precompute``.
+        """
+        self.combined_df = combined_df
+        codes = combined_df['country'].cat.codes.to_numpy()
+        names = list(combined_df['country'].cat.categories)
+        offsets = np.searchsorted(codes, np.arange(len(names) + 1))
+        self.country_data = {name: combined_df.iloc[offsets[i]:offsets[i + 1]]
+                             for i, name in enumerate(names)}
+        self.data_version += 1
+        self._stats_engines = {}
+        for (name, key), value in (results or {}).items():
+            self.results[(name, key, self.data_version)] = value
+        return self
+
+    def precompute(self):
+        """Compute the results the report figures share and return them for ``set_combined``"""
+        self.streaming_stats()
+        return {(name, key): value for (name, key, version), value in self.results.items()
+                if version == self.data_version}
+
+    def add_solar_features(self, locations=None):
+        """Add Daytime and ClearSkyIndex columns per country
+
+        ``locations`` maps country names to a site name or (lat, lon[, utc_offset]);
+        countries missing from it are looked up in ``solar_geometry.SITES`` by
+        name. Countries without a Timestamp column or known location are left
+        as all-daytime so that daytime-only statistics still include them.
+        """
+        locations = locations or {}
+        daytime = np.ones(len(self.combined_df), dtype=bool)
+        csi = np.full(len(self.combined_df), np.nan, dtype=np.float32)
+        offset = 0
+        for country, df in self.country_data.items():
+            location = locations.get(country)
+            if location is None:
+                key = str(country).lower().replace(' ', '')
+                location = next((site for site in SITES if site.startswith(key)), None)
+            if location is not None and 'Timestamp' in df.columns:
+                sky = clear_sky(pd.DatetimeIndex(pd.to_datetime(df['Timestamp'])), *resolve_location(location))
+                daytime[offset:offset + len(df)] = daytime_mask(sky['zenith'].to_numpy())
+                if 'GHI' in df.columns:
+                    csi[offset:offset + len(df)] = clear_sky_index(df['GHI'].to_numpy(),
+                                                                   sky['ghi_clear'].to_numpy())
+            offset += len(df)
+
+        combined_df = self.combined_df.assign(Daytime=daytime, ClearSkyIndex=csi)
+        self.set_combined(combined_df)
+        print(f"☀️ Solar features added: {daytime.mean() * 100:.1f}% of rows are daytime")
         return self.combined_df
     
     def generate_boxplots(self, metrics=['GHI', 'DNI', 'DHI']):
@@ -35,19 +154,42 @@ class CountryComparator:
                 plt.suptitle('')
                 plt.show()
     
-    def calculate_summary_stats(self, metrics=['GHI', 'DNI', 'DHI']):
+    def stats_engine(self, daytime_only=False):
+        """Shared per-country partition of the combined data, rebuilt when it changes"""
+        engine = self._stats_engines.get(daytime_only)
+        if engine is not None and engine.df is not self.combined_df:
+            # combined_df was replaced directly, so memoized results are stale too
+            self.data_version += 1
+            self._stats_engines = {}
+            engine = None
+        if engine is None:
+            mask = None
+            if daytime_only:
+                if 'Daytime' not in self.combined_df.columns:
+                    raise ValueError("Call add_solar_features() before requesting daytime-only statistics")
+                mask = self.combined_df['Daytime'].to_numpy()
+            engine = GroupedStats(self.combined_df, 'country', mask)
+            self._stats_engines[daytime_only] = engine
+        return engine
+
+    def _memoized(self, name, key, compute):
+        """Cache a result per (name, key, dataset version) in self.results"""
+        cache_key = (name, key, self.data_version)
+        if cache_key not in self.results:
+            self.results[cache_key] = compute()
+        return self.results[cache_key]
+
+    @instrumented('comparison.calculate_summary_stats', rows=_combined_rows)
+    def calculate_summary_stats(self, metrics=['GHI', 'DNI', 'DHI'], daytime_only=False):
         """Calculate summary statistics"""
-        summary = (self.combined_df.groupby("country")[metrics]
-                  .agg(["mean", "median", "std"]))
-        return summary
+        return self._memoized('summary', (tuple(metrics), daytime_only),
+                              lambda: self.stats_engine(daytime_only).summary(metrics))
     
-    def statistical_test(self, metric='GHI'):
+    @instrumented('comparison.statistical_test', rows=_combined_rows)
+    def statistical_test(self, metric='GHI', daytime_only=False):
         """Run Kruskal-Wallis test"""
-        countries = self.combined_df['country'].unique()
-        metric_data = [self.combined_df[self.combined_df['country'] == country][metric] 
-                      for country in countries]
-        
-        kw_stat, kw_p = kruskal(*metric_data)
+        kw_stat, kw_p = self._memoized('kruskal', (metric, daytime_only),
+                                       lambda: self.stats_engine(daytime_only).kruskal(metric))
         
         print("Kruskal-Wallis Results:")
         print(f"H-statistic: {kw_stat:.4f}")
@@ -59,10 +201,43 @@ class CountryComparator:
             print("❌ No significant differences between countries")
         
         return kw_stat, kw_p
+
+    @instrumented('comparison.statistical_tests', rows=_combined_rows)
+    def statistical_tests(self, metrics=['GHI', 'DNI', 'DHI'], daytime_only=False):
+        """Kruskal-Wallis results for several metrics in one table"""
+        rows = {metric: self._memoized('kruskal', (metric, daytime_only),
+                                       lambda metric=metric: self.stats_engine(daytime_only).kruskal(metric))
+                for metric in metrics}
+        return pd.DataFrame.from_dict(rows, orient='index', columns=['H', 'p_value'])
+
+    @instrumented('comparison.posthoc_test', rows=_combined_rows)
+    def posthoc_test(self, metric='GHI', method='dunn', p_adjust='holm', daytime_only=False):
+        """Pairwise post-hoc tests between countries ('dunn' or 'mannwhitney')"""
+        engine = self.stats_engine(daytime_only)
+        if method == 'dunn':
+            compute = lambda: engine.dunn(metric, p_adjust)
+        elif method == 'mannwhitney':
+            compute = lambda: engine.mannwhitney(metric, p_adjust)
+        else:
+            raise ValueError(f"Unknown post-hoc method: {method}")
+        return self._memoized(method, (metric, p_adjust, daytime_only), compute)
     
+    def soiling_rates(self, modules=('ModA', 'ModB'), window='1D'):
+        """Median recovery after cleaning and median soiling rate per country and module"""
+        rows = []
+        for country, df in self.country_data.items():
+            if 'Cleaning' not in df.columns or 'GHI' not in df.columns:
+                continue
+            summary = soiling_summary(df, [m for m in modules if m in df.columns], window)
+            for module, values in summary.iterrows():
+                rows.append({'country': country, 'module': module, **values})
+        table = pd.DataFrame(rows)
+        self.results['soiling'] = table
+        return table
+
     def plot_ranking(self, metric='GHI'):
         """Plot country ranking by metric"""
-        metric_means = self.combined_df.groupby("country")[metric].mean().sort_values(ascending=False)
+        metric_means = self.combined_df.groupby("country", observed=True)[metric].mean().sort_values(ascending=False)
         
         plt.figure(figsize=(6, 4))
         metric_means.plot(kind='bar', color=['gold', 'green', 'blue'])
@@ -80,9 +255,9 @@ class CountryComparator:
         
         for country, df in self.country_data.items():
             if all(col in df.columns for col in ['GHI', 'Tamb', 'RH']):
-                plt.scatter(df['Tamb'], df['GHI'], 
-                           s=df['RH']/2,  # Bubble size based on RH
-                           alpha=0.6, label=country)
+                binned_scatter(plt.gca(), df['Tamb'], df['GHI'],
+                               sizes=df['RH'], size_scale=0.5,  # Bubble size based on RH
+                               alpha=0.6, label=country)
         
         plt.xlabel('Temperature (°C)')
         plt.ylabel('GHI (W/m²)')
@@ -93,12 +268,15 @@ class CountryComparator:
     
     def generate_histograms(self):
         """Generate Histograms for GHI and Wind Speed"""
+        stats = self.streaming_stats()
         fig, axes = plt.subplots(1, 2, figsize=(15, 5))
         
         # GHI Histogram
-        for country, df in self.country_data.items():
-            if 'GHI' in df.columns:
-                axes[0].hist(df['GHI'].dropna(), alpha=0.7, label=country, bins=30)
+        for country, country_stats in stats.items():
+            if country_stats.present(['GHI']):
+                counts, edges = country_stats.histogram('GHI')
+                axes[0].hist(edges[:-1], bins=edges, weights=counts, alpha=0.7,
+                             label=f"{country}{country_stats.outside_note('GHI')}")
         axes[0].set_xlabel('GHI (W/m²)')
         axes[0].set_ylabel('Frequency')
         axes[0].set_title('GHI Distribution Histogram')
@@ -106,9 +284,11 @@ class CountryComparator:
         axes[0].grid(True, alpha=0.3)
         
         # Wind Speed Histogram
-        for country, df in self.country_data.items():
-            if 'WS' in df.columns:
-                axes[1].hist(df['WS'].dropna(), alpha=0.7, label=country, bins=30)
+        for country, country_stats in stats.items():
+            if country_stats.present(['WS']):
+                counts, edges = country_stats.histogram('WS')
+                axes[1].hist(edges[:-1], bins=edges, weights=counts, alpha=0.7,
+                             label=f"{country}{country_stats.outside_note('WS')}")
         axes[1].set_xlabel('Wind Speed (m/s)')
         axes[1].set_ylabel('Frequency')
         axes[1].set_title('Wind Speed Distribution Histogram')
@@ -120,13 +300,12 @@ class CountryComparator:
     
     def generate_correlation_heatmaps(self):
         """Generate Correlation Heatmaps for each country"""
-        for country, df in self.country_data.items():
-            numeric_cols = df.select_dtypes(include=[np.number]).columns
-            key_cols = [col for col in ['GHI', 'DNI', 'DHI', 'Tamb', 'RH', 'WS', 'BP'] if col in numeric_cols]
+        for country, country_stats in self.streaming_stats().items():
+            key_cols = country_stats.present(STATS_COLUMNS)
             
             if len(key_cols) > 1:
                 plt.figure(figsize=(8, 6))
-                correlation_matrix = df[key_cols].corr()
+                correlation_matrix = country_stats.corr(key_cols)
                 sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0,
                            square=True, linewidths=0.5)
                 plt.title(f'Correlation Heatmap - {country}')
@@ -140,7 +319,7 @@ class CountryComparator:
         # WS vs GHI
         for country, df in self.country_data.items():
             if all(col in df.columns for col in ['WS', 'GHI']):
-                axes[0,0].scatter(df['WS'], df['GHI'], alpha=0.6, label=country)
+                binned_scatter(axes[0,0], df['WS'], df['GHI'], alpha=0.6, label=country)
         axes[0,0].set_xlabel('Wind Speed (m/s)')
         axes[0,0].set_ylabel('GHI (W/m²)')
         axes[0,0].set_title('Wind Speed vs GHI')
@@ -150,7 +329,7 @@ class CountryComparator:
         # RH vs Tamb
         for country, df in self.country_data.items():
             if all(col in df.columns for col in ['RH', 'Tamb']):
-                axes[0,1].scatter(df['RH'], df['Tamb'], alpha=0.6, label=country)
+                binned_scatter(axes[0,1], df['RH'], df['Tamb'], alpha=0.6, label=country)
         axes[0,1].set_xlabel('Relative Humidity (%)')
         axes[0,1].set_ylabel('Temperature (°C)')
         axes[0,1].set_title('Relative Humidity vs Temperature')
@@ -160,7 +339,7 @@ class CountryComparator:
         # RH vs GHI
         for country, df in self.country_data.items():
             if all(col in df.columns for col in ['RH', 'GHI']):
-                axes[1,0].scatter(df['RH'], df['GHI'], alpha=0.6, label=country)
+                binned_scatter(axes[1,0], df['RH'], df['GHI'], alpha=0.6, label=country)
         axes[1,0].set_xlabel('Relative Humidity (%)')
         axes[1,0].set_ylabel('GHI (W/m²)')
         axes[1,0].set_title('Relative Humidity vs GHI')
@@ -170,7 +349,7 @@ class CountryComparator:
         # WD vs GHI
         for country, df in self.country_data.items():
             if all(col in df.columns for col in ['WD', 'GHI']):
-                axes[1,1].scatter(df['WD'], df['GHI'], alpha=0.6, label=country)
+                binned_scatter(axes[1,1], df['WD'], df['GHI'], alpha=0.6, label=country)
         axes[1,1].set_xlabel('Wind Direction (°)')
         axes[1,1].set_ylabel('GHI (W/m²)')
         axes[1,1].set_title('Wind Direction vs GHI')
@@ -180,24 +359,29 @@ class CountryComparator:
         plt.tight_layout()
         plt.show()
     
+    def wind_roses(self):
+        """Direction × speed counts table per country, merged into ``'All'``"""
+        def compute():
+            roses = {country: WindRose.from_frame(df) for country, df in self.country_data.items()
+                     if 'WD' in df.columns and 'WS' in df.columns}
+            if roses:
+                roses['All'] = WindRose()
+                for country in list(roses)[:-1]:
+                    roses['All'].merge(roses[country])
+            return roses
+        return self._memoized('wind_roses', None, compute)
+
     def generate_wind_analysis(self):
-        """Generate wind rose and wind analysis"""
-        if any('WD' in df.columns for df in self.country_data.values()):
-            fig, axes = plt.subplots(1, 3, figsize=(15, 5), subplot_kw=dict(projection='polar'))
-            
-            for idx, (country, df) in enumerate(self.country_data.items()):
-                if 'WD' in df.columns and 'WS' in df.columns:
-                    wind_dir = df['WD'].dropna()
-                    wind_speed = df['WS'].dropna()
-                    
-                    if len(wind_dir) > 0:
-                        theta = np.radians(wind_dir)
-                        radii = wind_speed
-                        
-                        axes[idx].scatter(theta, radii, alpha=0.6)
-                        axes[idx].set_title(f'Wind Pattern - {country}')
-            
+        """Generate a wind rose per country"""
+        roses = {country: rose for country, rose in self.wind_roses().items() if country != 'All'}
+        if roses:
+            fig, axes = plt.subplots(1, len(roses), figsize=(5 * len(roses), 5),
+                                     subplot_kw=dict(projection='polar'), squeeze=False)
+            for ax, (country, rose) in zip(axes[0], roses.items()):
+                rose.plot(ax, title=f'Wind Rose - {country}')
+            axes[0, -1].legend(loc='upper left', bbox_to_anchor=(1.05, 1.0), fontsize='small')
+
             plt.tight_layout()
             plt.show()
         else:
-            print("Wind direction data not available for wind rose")
\ No newline at end of file
+            print("Wind direction data not available for wind rose")
@@ -0,0 +1,166 @@
+from itertools import combinations
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2, mannwhitneyu, norm
+
+
+def adjust_p_values(p_values, method='holm'):
+    """Adjust p-values for multiple comparisons ('holm', 'bonferroni' or None)"""
+    p_values = np.asarray(p_values, dtype=np.float64)
+    m = len(p_values)
+    if method is None or m == 0:
+        return p_values
+    if method == 'bonferroni':
+        return np.minimum(p_values * m, 1.0)
+    if method == 'holm':
+        order = np.argsort(p_values)
+        adjusted = np.maximum.accumulate(p_values[order] * (m - np.arange(m)))
+        result = np.empty(m)
+        result[order] = np.minimum(adjusted, 1.0)
+        return result
+    raise ValueError(f"Unknown p-value adjustment: {method}")
+
+
+class GroupedStats:
+    """Per-country statistics from one partition of a combined frame
+
+    Rows are ordered by group once (optionally restricted by a boolean
+    ``mask``, e.g. daytime rows); every metric is then read as contiguous
+    per-group slices, so Kruskal-Wallis, the post-hoc tests and the summary
+    statistics never build a boolean mask per country. Per-metric arrays and
+    ranks are memoized, so several tests on the same metric sort it only once.
+    """
+
+    def __init__(self, df, group_col='country', mask=None):
+        self.df = df
+        self.group_col = group_col
+        self.mask = mask
+        groups = df[group_col]
+        if isinstance(groups.dtype, pd.CategoricalDtype):
+            codes = groups.cat.codes.to_numpy()
+            names = list(groups.cat.categories)
+        else:
+            codes, names = pd.factorize(groups)
+            names = list(names)
+        self.names = names
+        self.codes = codes
+        self.order = np.argsort(codes, kind='stable')
+        self._grouped = {}
+        self._ranked = {}
+
+    def grouped(self, metric):
+        """Non-null values of ``metric`` ordered by group, with per-group counts"""
+        if metric not in self._grouped:
+            values = self.df[metric].to_numpy(dtype=np.float64)[self.order]
+            codes = self.codes[self.order]
+            keep = ~np.isnan(values) & (codes >= 0)
+            if self.mask is not None:
+                keep &= np.asarray(self.mask, dtype=bool)[self.order]
+            values, codes = values[keep], codes[keep]
+            counts = np.bincount(codes, minlength=len(self.names))
+            self._grouped[metric] = (values, codes, counts)
+        return self._grouped[metric]
+
+    def groups(self, metric):
+        """Per-group value arrays (views into one ordered array)"""
+        values, _, counts = self.grouped(metric)
+        bounds = np.concatenate([[0], np.cumsum(counts)])
+        return {name: values[bounds[i]:bounds[i + 1]]
+                for i, name in enumerate(self.names) if counts[i]}
+
+    def ranks(self, metric):
+        """Average ranks of the pooled values and the tie correction term"""
+        if metric not in self._ranked:
+            values, _, _ = self.grouped(metric)
+            order = np.argsort(values, kind='mergesort')
+            sorted_values = values[order]
+            starts = np.flatnonzero(np.r_[True, sorted_values[1:] != sorted_values[:-1]])
+            ties = np.diff(np.r_[starts, len(values)])
+            average = starts + (ties + 1) / 2
+            ranks = np.empty(len(values))
+            ranks[order] = np.repeat(average, ties)
+            tie_term = float((ties.astype(np.float64) ** 3 - ties).sum())
+            self._ranked[metric] = (ranks, tie_term)
+        return self._ranked[metric]
+
+    def kruskal(self, metric):
+        """Kruskal-Wallis H test across groups, same result as ``scipy.stats.kruskal``"""
+        _, codes, counts = self.grouped(metric)
+        ranks, tie_term = self.ranks(metric)
+        present = counts > 0
+        n = counts.sum()
+        if present.sum() < 2 or n < 2:
+            return np.nan, np.nan
+
+        rank_sums = np.bincount(codes, weights=ranks, minlength=len(self.names))[present]
+        h = 12.0 / (n * (n + 1)) * (rank_sums ** 2 / counts[present]).sum() - 3 * (n + 1)
+        correction = 1 - tie_term / (n ** 3 - n)
+        h = h / correction if correction > 0 else np.nan
+        return h, chi2.sf(h, present.sum() - 1)
+
+    def kruskal_many(self, metrics):
+        """Kruskal-Wallis results for several metrics as a DataFrame"""
+        rows = {metric: self.kruskal(metric) for metric in metrics}
+        return pd.DataFrame.from_dict(rows, orient='index', columns=['H', 'p_value'])
+
+    def dunn(self, metric, p_adjust='holm'):
+        """Dunn's pairwise post-hoc test on the Kruskal-Wallis ranks"""
+        _, codes, counts = self.grouped(metric)
+        ranks, tie_term = self.ranks(metric)
+        n = counts.sum()
+        present = np.flatnonzero(counts)
+        mean_ranks = np.bincount(codes, weights=ranks, minlength=len(self.names))[present] / counts[present]
+
+        i, j = np.triu_indices(len(present), k=1)
+        variance = n * (n + 1) / 12.0 - tie_term / (12.0 * (n - 1))
+        se = np.sqrt(variance * (1.0 / counts[present][i] + 1.0 / counts[present][j]))
+        z = (mean_ranks[i] - mean_ranks[j]) / se
+        p_values = 2 * norm.sf(np.abs(z))
+        return self._pairs_frame(present, i, j, z, p_values, 'z', p_adjust)
+
+    def mannwhitney(self, metric, p_adjust='holm'):
+        """Pairwise two-sided Mann-Whitney U tests"""
+        groups = self.groups(metric)
+        names = list(groups)
+        pairs = list(combinations(range(len(names)), 2))
+        results = [mannwhitneyu(groups[names[a]], groups[names[b]]) for a, b in pairs]
+        present = np.array([self.names.index(name) for name in names])
+        i = np.array([a for a, _ in pairs], dtype=int)
+        j = np.array([b for _, b in pairs], dtype=int)
+        statistics = np.array([result.statistic for result in results])
+        p_values = np.array([result.pvalue for result in results])
+        return self._pairs_frame(present, i, j, statistics, p_values, 'U', p_adjust)
+
+    def _pairs_frame(self, present, i, j, statistics, p_values, stat_name, p_adjust):
+        return pd.DataFrame({
+            'group_a': [self.names[present[k]] for k in i],
+            'group_b': [self.names[present[k]] for k in j],
+            stat_name: statistics,
+            'p_value': p_values,
+            'p_adjusted': adjust_p_values(p_values, p_adjust),
+        })
+
+    def summary(self, metrics, stats=('mean', 'median', 'std')):
+        """Per-group mean, median and std (ddof=1), shaped like ``groupby().agg()``"""
+        columns = {}
+        for metric in metrics:
+            values, _, counts = self.grouped(metric)
+            present = counts > 0
+            bounds = np.concatenate([[0], np.cumsum(counts)])[:-1][present]
+            n = counts[present]
+            names = [name for name, count in zip(self.names, counts) if count]
+            if not len(values):
+                means = stds = medians = np.zeros(0)
+            else:
+                means = np.add.reduceat(values, bounds) / n
+                squares = np.add.reduceat((values - np.repeat(means, n)) ** 2, bounds)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    stds = np.sqrt(squares / (n - 1))
+                medians = np.array([np.median(group) for group in self.groups(metric).values()])
+            computed = {'mean': means, 'median': medians, 'std': stds}
+            for stat in stats:
+                columns[(metric, stat)] = pd.Series(computed[stat], index=names, dtype=np.float64)
+        summary = pd.DataFrame(columns).reindex([name for name in self.names
+                                                 if any(name in col.index for col in columns.values())])
+        summary.index.name = self.group_col
+        return summary
@@ -0,0 +1,245 @@
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from src.cache import read_csv_cached, read_path
+from src.export import write_parquet
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # The dataset store needs pyarrow
+    pa = None
+
+INDEX_FILE = '_index.json'
+PARTITION_PATTERN = re.compile(r'year=(\d{4})[/\\]month=(\d{2})')
+
+
+def _timestamp(value):
+    return None if value is None else pd.Timestamp(value)
+
+
+def slice_time(df, start=None, end=None):
+    """Rows of a Timestamp-indexed frame with start <= time < end, in their original order"""
+    if start is None and end is None:
+        return df
+    index = df.index
+    if not index.is_monotonic_increasing:
+        # Keep unsorted rows in file order so validation still sees the disorder
+        mask = np.ones(len(df), dtype=bool)
+        if start is not None:
+            mask &= index >= _timestamp(start)
+        if end is not None:
+            mask &= index < _timestamp(end)
+        return df[mask]
+    lo = 0 if start is None else index.searchsorted(_timestamp(start), side='left')
+    hi = len(index) if end is None else index.searchsorted(_timestamp(end), side='left')
+    return df.iloc[lo:hi]
+
+
+def filter_time_column(df, start=None, end=None, column='Timestamp'):
+    """Rows with start <= ``column`` < end, for frames that keep the time as a column"""
+    if (start is None and end is None) or column not in df.columns:
+        return df
+    times = pd.to_datetime(df[column], errors='coerce')
+    mask = np.ones(len(df), dtype=bool)
+    if start is not None:
+        mask &= (times >= _timestamp(start)).to_numpy()
+    if end is not None:
+        mask &= (times < _timestamp(end)).to_numpy()
+    return df[mask]
+
+
+def _overlaps(entry, start, end):
+    if entry['start'] is None:
+        return False
+    if end is not None and pd.Timestamp(entry['start']) >= end:
+        return False
+    if start is not None and pd.Timestamp(entry['end']) < start:
+        return False
+    return True
+
+
+def _matches(entry, where):
+    """False when a partition's min/max rule out every row of a ``where`` range"""
+    for col, (low, high) in (where or {}).items():
+        bounds = entry.get('stats', {}).get(col, 'missing')
+        if bounds == 'missing':
+            continue  # No statistics for the column, so it cannot be pruned
+        if bounds is None:
+            return False  # All values missing
+        if (high is not None and bounds[0] > high) or (low is not None and bounds[1] < low):
+            return False
+    return True
+
+
+class DatasetStore:
+    """Parquet dataset partitioned as ``country=<name>/year=YYYY/month=MM``
+
+    Every country directory holds an ``_index.json`` listing its partition
+    files with their row counts, time ranges and per-column min/max, so
+    queries pick the files to open without touching the others. Countries
+    are written independently (one index each), so several processes can
+    fill one store at once. Time ranges are half-open: ``start <= t < end``.
+    """
+
+    def __init__(self, root):
+        if pa is None:
+            raise ImportError("The dataset store needs the 'pyarrow' package")
+        self.root = root
+        self._indexes = {}
+
+    @staticmethod
+    def locate(path):
+        """(store, country) when ``path`` is a country directory of a store, else None"""
+        path = os.path.abspath(path)
+        name = os.path.basename(path)
+        if name.startswith('country=') and os.path.exists(os.path.join(path, INDEX_FILE)):
+            return DatasetStore(os.path.dirname(path)), name.split('=', 1)[1]
+        return None
+
+    def country_dir(self, country):
+        return os.path.join(self.root, f"country={country}")
+
+    def countries(self):
+        if not os.path.isdir(self.root):
+            return []
+        names = [name.split('=', 1)[1] for name in os.listdir(self.root) if name.startswith('country=')]
+        return sorted(name for name in names if self.has(name))
+
+    def has(self, country):
+        return os.path.exists(os.path.join(self.country_dir(country), INDEX_FILE))
+
+    def index_path(self, country):
+        return os.path.join(self.country_dir(country), INDEX_FILE)
+
+    def index(self, country):
+        """The country's index, re-read only when the file changes"""
+        path = self.index_path(country)
+        mtime = os.stat(path).st_mtime_ns
+        cached = self._indexes.get(country)
+        if cached is None or cached[0] != mtime:
+            with open(path, encoding='utf-8') as f:
+                cached = (mtime, json.load(f))
+            self._indexes[country] = cached
+        return cached[1]
+
+    def write(self, country, df, compression='zstd', chunksize=500_000, workers=None):
+        """Replace ``country``'s data with a Timestamp-indexed frame; returns its index
+
+        The index is written into the new tree before it replaces the old
+        one, so readers see either the old or the new country, never a
+        directory without its index.
+        """
+        result = {}
+
+        def write_index(tmp_dir, files):
+            partitions = []
+            for entry in files:
+                relative = os.path.relpath(entry['path'], tmp_dir)
+                year, month = PARTITION_PATTERN.search(relative).groups()
+                partitions.append(dict(entry, path=relative, year=int(year), month=int(month)))
+
+            starts = [entry['start'] for entry in partitions if entry['start'] is not None]
+            ends = [entry['end'] for entry in partitions if entry['end'] is not None]
+            result['index'] = {
+                'country': country,
+                'rows': sum(entry['rows'] for entry in partitions),
+                'bytes': sum(entry['bytes'] for entry in partitions),
+                'columns': ([df.index.name] if df.index.name else []) + list(df.columns),
+                'start': min(starts) if starts else None,
+                'end': max(ends) if ends else None,
+                'partitions': partitions,
+            }
+            with open(os.path.join(tmp_dir, INDEX_FILE), 'w', encoding='utf-8') as f:
+                json.dump(result['index'], f, indent=1)
+
+        write_parquet(df, self.country_dir(country), compression, chunksize, workers, before_swap=write_index)
+        return result['index']
+
+    def partitions(self, country, start=None, end=None, where=None):
+        """Index entries of the files that can hold rows in [start, end) matching ``where``
+
+        ``where`` maps columns to ``(low, high)`` bounds (either may be None)
+        checked against each file's min/max.
+        """
+        start, end = _timestamp(start), _timestamp(end)
+        return [entry for entry in self.index(country)['partitions']
+                if _overlaps(entry, start, end) and _matches(entry, where)]
+
+    def plan(self, country, start=None, end=None, where=None):
+        """Files and bytes a query would read, against the country's total"""
+        selected = self.partitions(country, start, end, where)
+        index = self.index(country)
+        return {'files': len(selected), 'total_files': len(index['partitions']),
+                'bytes': sum(entry['bytes'] for entry in selected), 'total_bytes': index['bytes'],
+                'rows': sum(entry['rows'] for entry in selected), 'total_rows': index['rows']}
+
+    def time_range(self, country):
+        index = self.index(country)
+        return _timestamp(index['start']), _timestamp(index['end'])
+
+    def read(self, country, start=None, end=None, columns=None, where=None):
+        """Timestamp-indexed rows of ``country`` in [start, end), reading only matching files
+
+        ``columns`` restricts the columns read; ``where`` bounds prune files
+        by their min/max and then filter the rows.
+        """
+        index = self.index(country)
+        entries = self.partitions(country, start, end, where)
+        read_columns = None
+        if columns is not None:
+            wanted = ['Timestamp'] + [col for col in columns if col != 'Timestamp'] + list(where or {})
+            read_columns = [col for col in dict.fromkeys(wanted) if col in index['columns']]
+
+        directory = self.country_dir(country)
+        tables = [pq.read_table(os.path.join(directory, entry['path']), columns=read_columns)
+                  for entry in entries]
+        if tables:
+            df = pa.concat_tables(tables).to_pandas()
+        else:
+            df = pd.DataFrame(columns=read_columns or index['columns'])
+            df['Timestamp'] = pd.to_datetime(df['Timestamp'])
+        df = df.set_index('Timestamp')
+        df = slice_time(df, start, end)
+
+        for col, (low, high) in (where or {}).items():
+            if col in df.columns:
+                values = df[col].to_numpy()
+                keep = np.ones(len(df), dtype=bool)
+                if low is not None:
+                    keep &= values >= low
+                if high is not None:
+                    keep &= values <= high
+                df = df[keep]
+        if columns is not None:
+            df = df[[col for col in columns if col in df.columns and col != 'Timestamp']]
+        return df
+
+
+def source_files(path, start=None, end=None, cached=True):
+    """Files a load of ``path`` reads: matching partitions of a store, else the CSV or its cache"""
+    located = DatasetStore.locate(path)
+    if located is not None:
+        store, country = located
+        return [os.path.join(store.country_dir(country), entry['path'])
+                for entry in store.partitions(country, start, end)]
+    return [read_path(path) if cached else path]
+
+
+def read_country(path, columns=None, start=None, end=None):
+    """One country's rows with Timestamp as a column, from a CSV or a DatasetStore directory
+
+    Dataset stores read only the partitions overlapping [start, end); CSVs
+    are read through their columnar cache and filtered afterwards.
+    """
+    located = DatasetStore.locate(path)
+    if located is not None:
+        store, country = located
+        return store.read(country, start, end, columns).reset_index()
+    if columns is not None and (start is not None or end is not None):
+        columns = ['Timestamp'] + [col for col in columns if col != 'Timestamp']
+    return filter_time_column(read_csv_cached(path, columns=columns), start, end)
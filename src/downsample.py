@@ -0,0 +1,118 @@
+import numpy as np
+from matplotlib import colors as mcolors
+
+# Screen pixels per bucket/bin; output resolution follows the axes size
+PIXELS_PER_BUCKET = 1
+PIXELS_PER_BIN = 4
+PIXELS_PER_MARKER = 10
+
+
+def axes_pixels(ax):
+    """Width and height of an axes in display pixels"""
+    fig = ax.figure
+    position = ax.get_position()
+    width = position.width * fig.get_figwidth() * fig.dpi
+    height = position.height * fig.get_figheight() * fig.dpi
+    return max(int(width), 1), max(int(height), 1)
+
+
+def minmax_decimate(x, y, n_buckets):
+    """Keep the min and max of ``y`` in each of ``n_buckets`` equal-count buckets
+
+    Returns at most ``2 * n_buckets`` points in their original order, which
+    renders the same envelope as the raw line at the given pixel width.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= 2 * n_buckets:
+        return x, y
+
+    size = -(-n // n_buckets)
+    n_buckets = -(-n // size)
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = y
+    buckets = padded.reshape(n_buckets, size)
+
+    valid = ~np.isnan(buckets)
+    has_data = valid.any(axis=1)
+    lows = np.where(valid, buckets, np.inf).argmin(axis=1)
+    highs = np.where(valid, buckets, -np.inf).argmax(axis=1)
+
+    base = np.arange(n_buckets) * size
+    first = np.minimum(lows, highs)[has_data] + base[has_data]
+    second = np.maximum(lows, highs)[has_data] + base[has_data]
+    idx = np.unique(np.column_stack([first, second]).ravel())
+    x = x[idx] if not hasattr(x, 'iloc') else x.iloc[idx]
+    return x, y[idx]
+
+
+def binned_points(x, y, bins, weights=None):
+    """Collapse (x, y) pairs into non-empty 2D bins
+
+    Returns bin centres, counts and, if ``weights`` is given, the mean weight
+    per bin.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    finite = np.isfinite(x) & np.isfinite(y)
+    if weights is not None:
+        weights = np.asarray(weights, dtype=np.float64)
+        finite &= np.isfinite(weights)
+    x, y = x[finite], y[finite]
+    if len(x) == 0:
+        empty = np.empty(0)
+        return empty, empty, empty, (empty if weights is not None else None)
+
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins)
+    ix, iy = np.nonzero(counts)
+    x_centres = (x_edges[ix] + x_edges[ix + 1]) / 2
+    y_centres = (y_edges[iy] + y_edges[iy + 1]) / 2
+
+    mean_weights = None
+    if weights is not None:
+        totals, _, _ = np.histogram2d(x, y, bins=[x_edges, y_edges], weights=weights[finite])
+        mean_weights = totals[ix, iy] / counts[ix, iy]
+    return x_centres, y_centres, counts[ix, iy], mean_weights
+
+
+def _bins_for(ax, pixels_per_bin):
+    width, height = axes_pixels(ax)
+    return [max(width // pixels_per_bin, 1), max(height // pixels_per_bin, 1)]
+
+
+def plot_decimated(ax, x, y, **kwargs):
+    """Line plot of at most two points per horizontal pixel"""
+    width, _ = axes_pixels(ax)
+    x, y = minmax_decimate(x, y, max(width // PIXELS_PER_BUCKET, 1))
+    return ax.plot(x, y, **kwargs)
+
+
+def density_scatter(ax, x, y, color='blue', alpha=0.6):
+    """Scatter replacement drawing a log-scaled 2D histogram in a single colour"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    finite = np.isfinite(x) & np.isfinite(y)
+    if not finite.any():
+        return None
+    counts, x_edges, y_edges = np.histogram2d(x[finite], y[finite],
+                                              bins=_bins_for(ax, PIXELS_PER_BIN))
+    cmap = mcolors.LinearSegmentedColormap.from_list(
+        'density', [mcolors.to_rgba(color, 0.25), mcolors.to_rgba(color, 1.0)])
+    return ax.pcolormesh(x_edges, y_edges, np.ma.masked_equal(counts.T, 0), cmap=cmap,
+                         norm=mcolors.LogNorm(), alpha=alpha)
+
+
+def binned_scatter(ax, x, y, sizes=None, size_scale=0.5, **kwargs):
+    """Scatter one marker per occupied bin
+
+    With ``sizes`` each marker is sized by the bin's mean value times
+    ``size_scale`` (bubble charts); otherwise by the bin's share of points.
+    """
+    x_centres, y_centres, counts, mean_sizes = binned_points(x, y, _bins_for(ax, PIXELS_PER_MARKER), sizes)
+    if len(counts) == 0:
+        return None
+    if mean_sizes is not None:
+        s = mean_sizes * size_scale
+    else:
+        s = 4 + 60 * np.sqrt(counts / counts.max())
+    return ax.scatter(x_centres, y_centres, s=s, **kwargs)
@@ -5,24 +5,280 @@ import pandas as pd
 from scipy import stats
 import seaborn as sns
 
+from src.cache import cache_path, read_csv_cached, write_cache
+from src.cleaning import StreamingCleaner
+from src.features import DerivedFeatures
+from src.instrumentation import instrumented
+from src.outliers import OutlierDetector, rule_counts
+from src.resample import ROLLUP_LEVELS, Rollup, measured_rows, regularize, rollups
+from src.soiling import MIN_IRRADIANCE, event_windows, soiling_summary
+from src.solar_geometry import zenith_func
+from src.streaming_stats import collect_stats, frame_stats
+from src.validation import REQUIRED_COLUMNS, SchemaValidator, validate_csv, validate_frame
+from src.wind_rose import WindRose
+from src.dataset import DatasetStore, slice_time, source_files
+from src.export import append_csv, export_frame, finest_unit, read_csv_tail, timestamp_unit
+from src.downsample import binned_scatter, density_scatter, plot_decimated
+
+# Fixed layout of the station exports, e.g. "2021-08-09 00:01"
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M'
+
+# Irradiance and meteorological readings fit comfortably in float32
+MEASUREMENT_COLUMNS = ['GHI', 'DNI', 'DHI', 'ModA', 'ModB', 'Tamb', 'RH', 'WS', 'WSgust',
+                       'WSstdev', 'WD', 'WDstdev', 'BP', 'Precipitation', 'TModA', 'TModB']
+FLAG_COLUMNS = ['Cleaning']
+# Repository data folder, so exports do not depend on the working directory
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data'))
+COMPRESSED_SUFFIXES = ('.gz', '.bz2', '.xz', '.zip', '.zst')
+
+
+def _count_rows(path, block_size=1 << 20):
+    """Data rows of an uncompressed CSV (newlines minus the header), None for compressed files"""
+    if path.endswith(COMPRESSED_SUFFIXES):
+        return None
+    lines, last = 0, b'\n'
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            lines += block.count(b'\n')
+            last = block[-1:]
+    return max(lines - (last == b'\n'), 0)
+
+
+def _grow(array, size):
+    grown = np.empty(size, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+def _stack_chunks(chunks, capacity=None):
+    """One frame from Timestamp-indexed chunks, copied into preallocated column arrays
+
+    Unlike collecting the chunks and concatenating them, peak memory stays
+    near one frame plus one chunk. ``capacity`` (an upper bound on the rows)
+    sizes the arrays up front; without it they grow by half as needed.
+    Columns whose dtype changes between chunks (e.g. all-NaN text) are
+    promoted as ``pd.concat`` would.
+    """
+    columns, dtypes, index, rows = None, None, None, 0
+    for chunk in chunks:
+        n = len(chunk)
+        if columns is None:
+            size = max(capacity or 0, n)
+            columns = {col: np.empty(size, dtype=chunk[col].to_numpy().dtype) for col in chunk.columns}
+            dtypes = chunk.dtypes.to_dict()
+            index = np.empty(size, dtype=chunk.index.dtype)
+        if not n:
+            continue
+        if rows + n > len(index):
+            size = max(rows + n, len(index) * 3 // 2)
+            columns = {col: _grow(array, size) for col, array in columns.items()}
+            index = _grow(index, size)
+        for col, array in columns.items():
+            values = chunk[col].to_numpy()
+            if values.dtype != array.dtype:
+                promoted = object if object in (values.dtype, array.dtype) else np.result_type(values, array)
+                columns[col] = array = array.astype(promoted)
+            if chunk[col].dtype != dtypes[col]:
+                dtypes[col] = array.dtype
+            array[rows:rows + n] = values
+        values = chunk.index.to_numpy()
+        if values.dtype != index.dtype:
+            index = index.astype(np.result_type(values, index))
+        index[rows:rows + n] = values
+        rows += n
+    if columns is None:
+        return pd.DataFrame()
+    # Views of the filled rows, copied only when the bound was far too generous
+    trim = (lambda array: array[:rows].copy()) if rows < len(index) // 2 else (lambda array: array[:rows])
+    index = pd.DatetimeIndex(trim(index), name='Timestamp')
+    return pd.DataFrame({col: pd.Series(trim(array), index=index, dtype=dtypes[col], copy=False)
+                         for col, array in columns.items()}, copy=False)
+
+
 class SolarDataEDA:
-    def __init__(self, filepath):
-        """Initialize with the dataset's filepath"""
+    def __init__(self, filepath, location=None):
+        """Initialize with the dataset's filepath
+
+        ``location`` (a site name from ``solar_geometry.SITES`` or
+        ``(lat, lon[, utc_offset])``) enables the solar-geometry features.
+        """
         self.filepath = filepath
+        self.location = location
         self.df = None
         self.key_columns = ['GHI', 'DNI', 'DHI', 'ModA', 'ModB', 'WS', 'WSgust']
+        self._features = None
+        self._file_stats = None
+        self.validation = None
+        self._validation_required = None
+        self.gaps = None
+
+    @property
+    def features(self):
+        """Derived features of the current frame, rebuilt whenever self.df changes"""
+        if self._features is None or not self._features.matches(self.df, self.location):
+            self._features = DerivedFeatures(self.df, self.location)
+        return self._features
+
+    def set_frame(self, df, features=None):
+        """Use an already loaded and cleaned frame, with derived results from ``precompute``"""
+        self.df = df
+        self._features = DerivedFeatures(df, self.location, features)
+        return self
+
+    def precompute(self):
+        """Compute the derived data the report figures share and return it for ``set_frame``
+
+        Streaming statistics, rollups, hour keys and, with a location, the
+        solar position and daytime mask.
+        """
+        self.streaming_stats()
+        self.rollups()
+        self.features.hour()
+        if self.location is not None:
+            self.features.daytime()
+        return self.features.snapshot()
+
+    def add_solar_features(self):
+        """Add Daytime and ClearSkyIndex columns computed from the station location"""
+        daytime = self.features.daytime()
+        csi = self.features.clear_sky_index() if 'GHI' in self.df.columns else None
+        self.df['Daytime'] = daytime
+        if csi is not None:
+            self.df['ClearSkyIndex'] = csi.astype(np.float32)
+        print(f"☀️ Solar features added: {daytime.mean() * 100:.1f}% of rows are daytime")
+        return self.df
+
+    def invalidate_features(self):
+        """Drop derived features after modifying self.df values in place"""
+        self._features = None
 
     
-    def load_data(self):
-        """Load dataset from CSV and preprocess it"""
+    @instrumented('eda.load_data', reads=lambda self, call: source_files(self.filepath, call['start'], call['end'],
+                                                                        cached=call['use_cache']))
+    def load_data(self, chunksize=None, columns=None, timestamp_format=TIMESTAMP_FORMAT,
+                  use_cache=False, start=None, end=None, validate=True):
+        """Load dataset from CSV and preprocess it
+
+        With ``chunksize`` set, the file is streamed in bounded chunks with
+        float32 measurements and uint8 flags instead of being parsed in one go.
+        ``columns`` restricts the load to a subset of columns (Timestamp is
+        always kept as the index). ``use_cache`` reads through the columnar
+        cache next to the CSV, building it on the first call. ``start`` and
+        ``end`` keep rows with start <= Timestamp < end; when ``filepath`` is
+        a country directory of a ``DatasetStore`` only the matching
+        partitions are read. ``validate`` checks the loaded rows against the
+        station schema (see ``validate``), so bad files stop before cleaning.
+        """
         if not os.path.exists(self.filepath):
             print(f"❌ File not found: {self.filepath}")
             return
         
-        self.df = pd.read_csv(self.filepath, parse_dates=['Timestamp'], index_col='Timestamp')
-        self.df.sort_index(inplace=True)
+        located = DatasetStore.locate(self.filepath)
+        if located is not None:
+            store, country = located
+            self.df = store.read(country, start, end, columns)
+        elif use_cache:
+            self.df = read_csv_cached(self.filepath, columns=columns,
+                                      parse_dates=['Timestamp'], index_col='Timestamp')
+        elif chunksize:
+            # Rows outside [start, end) are dropped chunk by chunk, and the rest is
+            # copied into arrays sized from a row count, to bound memory
+            chunks = (slice_time(chunk, start, end)
+                      for chunk in self.iter_chunks(chunksize, columns, timestamp_format))
+            self.df = _stack_chunks(chunks, _count_rows(self.filepath))
+        else:
+            usecols = self._usecols(columns)
+            self.df = pd.read_csv(self.filepath, parse_dates=['Timestamp'], index_col='Timestamp',
+                                  usecols=usecols)
+        if located is None:
+            self.df = slice_time(self.df, start, end)
         print("✅ Data loaded successfully!")
+        if validate:
+            # Before sorting, so out-of-order rows are reported rather than hidden
+            required = None if columns is None else [col for col in REQUIRED_COLUMNS
+                                                     if col == 'Timestamp' or col in columns]
+            self.validate(required=required)
+        self.df.sort_index(inplace=True)
         return self.df
+
+    def regularize(self, freq='1min', max_gap='15min'):
+        """Align self.df to a fixed ``freq`` grid, merging duplicates and filling short gaps
+
+        Gaps up to ``max_gap`` are interpolated in time (following the
+        clear-sky curve for irradiance when a location is set); longer gaps
+        stay NaN and are listed in ``self.gaps``. Run it before
+        ``clean_data``, whose median fill then only sees the long gaps; the
+        rows inserted for them (``Inserted``) do not count towards a
+        column's null fraction. An earlier validation report is refreshed
+        against the regularized frame.
+        """
+        self.df, report = regularize(self.df, freq, max_gap, self.location)
+        self.gaps = report['gaps']
+        filled = int(self.df['Filled'].sum())
+        print(f"🧩 Regularized to {freq}: {report['duplicates']} duplicates merged, "
+              f"{report['realigned']} timestamps realigned, {report['inserted_rows']} missing rows "
+              f"in {len(self.gaps)} gaps, {filled} rows interpolated")
+        if self.validation is not None:
+            self.validate(required=self._validation_required)
+        return report
+
+    def rollups(self, levels=ROLLUP_LEVELS):
+        """Sums and counts of the numeric columns at each of ``levels`` (15-min, hourly, daily)"""
+        return self.features.memo(('rollups', tuple(levels)), lambda: rollups(self.df, levels))
+
+    def validate(self, report_path=None, chunksize=500_000, required=None):
+        """Check the data against the station schema and keep the report in self.validation
+
+        Validates the loaded frame, or streams the CSV when nothing is loaded.
+        Missing required columns, non-numeric readings and unparseable
+        timestamps are errors, which stop ``clean_data``; range violations,
+        unordered or duplicate timestamps and gaps are warnings.
+        ``report_path`` saves the report as JSON.
+        """
+        self._validation_required = required
+        if self.df is not None:
+            report = validate_frame(self.df, chunksize=chunksize, source=self.filepath, required=required)
+        else:
+            report = validate_csv(self.filepath, chunksize=chunksize, required=required)
+        self.validation = report
+        print(f"🔎 Validation {report.summary()}")
+        for error in report.errors:
+            print(f"   ❌ {error}")
+        if report_path:
+            report.save(report_path)
+        return report
+
+    def _passes_validation(self):
+        if self.validation is not None and not self.validation.ok:
+            print(f"❌ {self.filepath} failed validation; fix it before cleaning: "
+                  + '; '.join(self.validation.errors))
+            return False
+        return True
+
+    def iter_chunks(self, chunksize=100_000, columns=None, timestamp_format=TIMESTAMP_FORMAT):
+        """Yield typed DataFrame chunks of the CSV, indexed by Timestamp"""
+        usecols = self._usecols(columns)
+        dtypes = {col: 'float32' for col in MEASUREMENT_COLUMNS
+                  if usecols is None or col in usecols}
+        reader = pd.read_csv(self.filepath, usecols=usecols, dtype=dtypes, chunksize=chunksize)
+        for chunk in reader:
+            timestamps = chunk.pop('Timestamp')
+            try:
+                timestamps = pd.to_datetime(timestamps, format=timestamp_format)
+            except ValueError:  # e.g. exports whose timestamps carry seconds
+                timestamps = pd.to_datetime(timestamps, format='ISO8601')
+            chunk.index = pd.DatetimeIndex(timestamps, name='Timestamp')
+            for col in FLAG_COLUMNS:
+                if col in chunk.columns:
+                    chunk[col] = chunk[col].fillna(0).astype('uint8')
+            yield chunk
+
+    @staticmethod
+    def _usecols(columns):
+        """Column projection for read_csv, always including the Timestamp"""
+        if columns is None:
+            return None
+        return ['Timestamp'] + [col for col in columns if col != 'Timestamp']
     
 
     def basic_info(self):
@@ -30,53 +286,204 @@ class SolarDataEDA:
         print(self.df.head())
         print(self.df.describe())
     
-    def clean_data(self):
-        """Removes highly null columns and outliers for proper data visualization"""
+    @instrumented('eda.clean_data')
+    def clean_data(self, chunksize=None, exact_median=False, outlier_rules=None, daytime_only=False):
+        """Removes highly null columns and outliers for proper data visualization
+
+        With ``chunksize`` set, cleaning runs through ``StreamingCleaner`` one
+        chunk at a time instead of on full-frame copies (see its docstring for
+        the tolerance against this in-memory path). ``outlier_rules`` selects
+        ``OutlierDetector`` rules instead of the global z-score and adds an
+        ``OutlierFlags`` bitmask column recording which rule fired.
+        ``daytime_only`` (needs a location, in-memory path) takes the fill
+        medians and z-scores of daytime and night rows separately, so night
+        zeros neither fill daytime gaps nor widen the daytime z-score.
+        """
+        if not self._passes_validation():
+            return None
+        if chunksize and daytime_only:
+            raise ValueError("daytime_only cleaning needs the in-memory path (no chunksize)")
+        if chunksize:
+            return self._clean_chunked(chunksize, exact_median, outlier_rules)
+        # One group of all rows, or daytime and night rows
+        groups = self.features.daytime() if daytime_only else np.ones(len(self.df), dtype=bool)
+
         outliers = pd.Series(False, index=self.df.index)
-        self.missing_data = self.df.isna().sum()
+        # Rows regularize inserted for long gaps are not counted as missing readings
+        measured = measured_rows(self.df)
+        self.missing_data = self.df[measured].isna().sum()
         self.total_rows = len(self.df)
-        self.missing_percentage = (self.missing_data / self.total_rows) * 100
+        self.missing_percentage = (self.missing_data / max(int(measured.sum()), 1)) * 100
         self.columns_to_drop = self.missing_percentage[self.missing_percentage > 5].index
 
         # Remove columns with above 5% null values
         self.df = self.df.drop(columns=self.columns_to_drop) 
         self.numeric_cols = self.df.select_dtypes(include=[np.number]).columns.tolist()
-        self.df = self.df.fillna(self.df[self.numeric_cols].median())
+        self.df = self.df.fillna(self.df[self.numeric_cols].groupby(groups).transform('median'))
 
         # Detect outliers with z_score
         available_key_cols = [col for col in self.key_columns if col in self.df.columns]
-        if available_key_cols:
+        if available_key_cols and outlier_rules:
+            self._flag_outliers(available_key_cols, outlier_rules)
+        elif available_key_cols and daytime_only:
+            grouped = self.df[available_key_cols].groupby(groups)
+            z_scores = (self.df[available_key_cols] - grouped.transform('mean')) / grouped.transform('std', ddof=0)
+            outliers = (z_scores.abs() > 3).any(axis=1)
+            self.df['Outliers'] = outliers
+        elif available_key_cols:
             outlier_flags = np.abs(stats.zscore(self.df[available_key_cols]))
             outliers = (outlier_flags > 3).any(axis=1)
             self.df['Outliers'] = outliers
         print("✅ Data cleaning completed!")
         return self.df
 
+    def _clean_chunked(self, chunksize, exact_median, outlier_rules=None):
+        """Streaming variant of clean_data over slices of the loaded frame"""
+        def chunks():
+            return (self.df.iloc[start:start + chunksize] for start in range(0, len(self.df), chunksize))
 
-def export_cleaned_data(self, country_name="benin"):
-    """Export cleaned dataset to CSV with validation"""
-    import os
-    
-    # Create data directory if it doesn't exist
-    os.makedirs('../data', exist_ok=True)
-    
-    # Generate output path
-    output_path = f'../data/{country_name}_clean.csv'
-    
-    # Export with explicit success message
-    self.df.to_csv(output_path, index=False)
-    
-    # Verify file was created
-    if os.path.exists(output_path):
-        file_size = os.path.getsize(output_path) / 1024  # Size in KB
-        print(f"✅ SUCCESS: Cleaned data exported to: {output_path}")
-        print(f"📁 File size: {file_size:.2f} KB")
-        print(f"📊 Rows exported: {len(self.df)}")
-        print(f"📈 Columns exported: {len(self.df.columns)}")
-    else:
-        print(f"❌ ERROR: Failed to export to {output_path}")
-    
-    return output_path
+        cleaner = StreamingCleaner(self.key_columns, exact_median=exact_median).fit(chunks)
+        self._keep_cleaning_stats(cleaner)
+        self.df = pd.concat([cleaner.transform(chunk) for chunk in chunks()])
+        if outlier_rules and cleaner.z_columns:
+            self._flag_outliers(cleaner.z_columns, outlier_rules, chunksize)
+        print("✅ Data cleaning completed!")
+        return self.df
+
+    def _flag_outliers(self, columns, rules, chunksize=100_000):
+        """Flag outliers with the selected OutlierDetector rules"""
+        zenith = zenith_func(self.location) if self.location is not None else None
+        self.outlier_detector = OutlierDetector(columns, rules, zenith_func=zenith).fit_frame(self.df, chunksize)
+        flags = self.outlier_detector.flag_frame(self.df, chunksize)
+        self.df['OutlierFlags'] = flags
+        self.df['Outliers'] = flags != 0
+
+    @instrumented('eda.clean_to_csv', reads=lambda self, call: self.filepath)
+    def clean_to_csv(self, output_path, chunksize=100_000, exact_median=False):
+        """Clean the source CSV out-of-core and stream the result to ``output_path``
+
+        The first pass over the file also validates it; nothing is written
+        when validation fails.
+        """
+        validator = SchemaValidator()
+        passes = []
+
+        def chunks():
+            passes.append(None)
+            first_pass = len(passes) == 1
+            for chunk in self.iter_chunks(chunksize):
+                if first_pass:
+                    validator.update(chunk)
+                yield chunk
+
+        cleaner = StreamingCleaner(self.key_columns, exact_median=exact_median).fit(chunks)
+        self.validation = validator.report(self.filepath)
+        if not self._passes_validation():
+            return None
+        self._keep_cleaning_stats(cleaner)
+        rows = 0
+        for i, chunk in enumerate(chunks()):
+            cleaned = cleaner.transform(chunk)
+            cleaned.to_csv(output_path, mode='w' if i == 0 else 'a', header=i == 0)
+            rows += len(cleaned)
+        print(f"✅ Data cleaning completed! {rows} rows written to {output_path}")
+        return cleaner
+
+    @instrumented('eda.ingest')
+    def ingest(self, new_data, store_path, state_path=None, chunksize=100_000):
+        """Clean newly arrived rows and append them to the cleaned store
+
+        ``new_data`` is a DataFrame indexed by Timestamp or a path to a CSV of
+        new readings. Running statistics (null counts, mean/variance and median
+        sketches) are persisted in ``state_path`` (default: next to the store)
+        and updated with the new rows only, so the cost tracks the size of the
+        new data rather than the whole history; without a state file they
+        are first built from the existing store. Rows up to the store's last
+        timestamp are skipped, so ingesting the same data twice appends
+        nothing, and rows are appended in the export's timestamp layout.
+        Rows already in the store are not re-flagged when the statistics drift.
+        """
+        state_path = state_path or f"{os.path.splitext(store_path)[0]}.state.json"
+        has_store = os.path.exists(store_path) and os.path.getsize(store_path) > 0
+        last = read_csv_tail(store_path)[1] if has_store else None
+        if os.path.exists(state_path):
+            cleaner = StreamingCleaner.load(state_path)
+        else:
+            cleaner = StreamingCleaner(self.key_columns)
+            if last is not None:
+                for chunk in SolarDataEDA(store_path).iter_chunks(chunksize):
+                    cleaner.partial_fit(chunk)
+
+        if isinstance(new_data, pd.DataFrame):
+            chunks = [new_data.iloc[start:start + chunksize]
+                      for start in range(0, len(new_data), chunksize)]
+        else:
+            chunks = list(SolarDataEDA(new_data).iter_chunks(chunksize))
+        if last is not None:
+            chunks = [chunk[chunk.index > pd.Timestamp(last)] for chunk in chunks]
+        chunks = [chunk for chunk in chunks if len(chunk)]
+        for chunk in chunks:
+            cleaner.partial_fit(chunk)
+        cleaner.finalize()
+        self._keep_cleaning_stats(cleaner)
+
+        unit = finest_unit(timestamp_unit(chunk.index) for chunk in chunks)
+        rows = sum(append_csv(cleaner.transform(chunk), store_path, unit) for chunk in chunks)
+
+        cleaner.save(state_path)
+        print(f"✅ Ingested {rows} new rows into {store_path} ({cleaner.total_rows} rows seen in total)")
+        return cleaner
+
+    def _keep_cleaning_stats(self, cleaner):
+        """Expose the cleaner's statistics under the same names as clean_data"""
+        self.missing_data = cleaner.missing_data
+        self.total_rows = cleaner.total_rows
+        self.missing_percentage = cleaner.missing_percentage
+        self.columns_to_drop = cleaner.columns_to_drop
+        self.numeric_cols = [col for col in cleaner.numeric_cols if col not in cleaner.columns_to_drop]
+
+
+    @instrumented('eda.export_cleaned_data')
+    def export_cleaned_data(self, country_name="benin", fmt='csv', output_dir=DATA_DIR, compression=None,
+                            chunksize=None, workers=None):
+        """Export cleaned dataset with its Timestamp, plus a manifest of row counts and checksums
+
+        ``fmt='csv'`` writes ``{country}_clean.csv`` (``compression='gzip'`` or
+        ``'zstd'`` for .gz/.zst); ``fmt='parquet'`` writes a directory
+        partitioned by year and month; ``fmt='dataset'`` adds the country to
+        the ``DatasetStore`` rooted at ``output_dir`` (by default the
+        repository's ``data/`` folder, whatever the working directory).
+        Chunks are formatted by ``workers`` in parallel with bounded memory
+        (see ``src.export``).
+        """
+        if fmt == 'dataset':
+            store = DatasetStore(output_dir)
+            index = store.write(country_name, self.df, compression or 'zstd', chunksize or 500_000, workers)
+            output_path = store.country_dir(country_name)
+            print(f"✅ SUCCESS: Cleaned data stored in: {output_path}")
+            print(f"📁 Partitions: {len(index['partitions'])} ({index['bytes'] / 1024:.2f} KB)")
+            print(f"📊 Rows exported: {index['rows']}")
+            return output_path
+
+        name = f"{country_name}_clean"
+        manifest = export_frame(self.df, output_dir, name, fmt, compression, chunksize, workers)
+        output_path = manifest['output_path']
+        
+        # Verify file was created
+        if os.path.exists(output_path):
+            print(f"✅ SUCCESS: Cleaned data exported to: {output_path}")
+            print(f"📁 File size: {sum(entry['bytes'] for entry in manifest['files']) / 1024:.2f} KB")
+            print(f"📊 Rows exported: {manifest['rows']}")
+            print(f"📈 Columns exported: {len(manifest['columns'])}")
+            print(f"🧾 Manifest written to: {manifest['manifest_path']}")
+
+            # Columnar cache next to the CSV so loaders can skip the CSV parse
+            if fmt == 'csv' and write_cache(self.df, output_path):
+                print(f"🗄️ Columnar cache written to: {cache_path(output_path)}")
+        else:
+            print(f"❌ ERROR: Failed to export to {output_path}")
+        
+        return output_path
 
 
     def time_series_analysis(self):
@@ -85,28 +492,28 @@ def export_cleaned_data(self, country_name="benin"):
         
         if 'GHI' in self.df.columns:
             plt.subplot(2, 2, 1)
-            plt.plot(self.df.index, self.df['GHI'], color='orange', alpha=0.7)
+            plot_decimated(plt.gca(), self.df.index, self.df['GHI'], color='orange', alpha=0.7)
             plt.title('GHI Over Time')
             plt.ylabel('GHI (W/m²)')
             plt.grid(True, alpha=0.3)
 
         if 'DNI' in self.df.columns:
             plt.subplot(2, 2, 2)
-            plt.plot(self.df.index, self.df['DNI'], color='red', alpha=0.7)
+            plot_decimated(plt.gca(), self.df.index, self.df['DNI'], color='red', alpha=0.7)
             plt.title('DNI Over Time')
             plt.ylabel('DNI (W/m²)')
             plt.grid(True, alpha=0.3)
 
         if 'DHI' in self.df.columns:
             plt.subplot(2, 2, 3)
-            plt.plot(self.df.index, self.df['DHI'], color='blue', alpha=0.7)
+            plot_decimated(plt.gca(), self.df.index, self.df['DHI'], color='blue', alpha=0.7)
             plt.title('DHI Over Time')
             plt.ylabel('DHI (W/m²)')
             plt.grid(True, alpha=0.3)
 
         if 'Tamb' in self.df.columns:
             plt.subplot(2, 2, 4)
-            plt.plot(self.df.index, self.df['Tamb'], color='green', alpha=0.7)
+            plot_decimated(plt.gca(), self.df.index, self.df['Tamb'], color='green', alpha=0.7)
             plt.title('Temperature Over Time')
             plt.ylabel('Temperature (°C)')
             plt.grid(True, alpha=0.3)
@@ -115,10 +522,16 @@ def export_cleaned_data(self, country_name="benin"):
         plt.show()
 
 
-    def daily_solar_patterns(self):
-        """Analyze daily patterns of solar radiation"""
-        self.df['Hour'] = self.df.index.hour
-        daily_patterns = self.df.groupby('Hour')[['GHI', 'DNI', 'DHI']].mean()
+    def daily_solar_patterns(self, daytime_only=False):
+        """Analyze daily patterns of solar radiation (``daytime_only`` skips night rows, needs a location)"""
+        if daytime_only:
+            daily_patterns = self.features.hourly_means(['GHI', 'DNI', 'DHI'], daytime_only=True)
+        else:
+            # Exact hour-of-day means from the hourly sums and counts, not the minute rows
+            hourly = self.rollups()['1h']
+            columns = [col for col in ['GHI', 'DNI', 'DHI'] if col in hourly.sums.columns]
+            daily_patterns = Rollup(hourly.sums[columns], hourly.counts[columns]).mean_by(
+                hourly.sums.index.hour.rename('Hour'))
 
         plt.figure(figsize=(12, 6))
         if 'GHI' in daily_patterns.columns:
@@ -135,12 +548,31 @@ def export_cleaned_data(self, country_name="benin"):
         plt.show()
 
 
+    def streaming_stats(self, columns=None, chunksize=500_000, workers=None):
+        """Correlation, histogram and quantile statistics of the measurement columns
+
+        Computed over the loaded frame in chunks, or, before ``load_data``,
+        streamed from the file (or a ``DatasetStore``'s partitions, summarised
+        in parallel processes) without loading it, so the distribution and
+        correlation figures work on data larger than memory.
+        """
+        columns = tuple(columns or MEASUREMENT_COLUMNS)
+        if self.df is not None:
+            present = [col for col in columns if col in self.df.columns]
+            return self.features.memo(('streaming_stats', tuple(present)),
+                                       lambda: frame_stats(self.df, present, chunksize))
+        key = (columns, os.stat(self.filepath).st_mtime_ns)
+        if self._file_stats is None or self._file_stats[0] != key:
+            self._file_stats = (key, collect_stats([self.filepath], columns, chunksize, workers))
+        return self._file_stats[1]
+
     def correlation_analysis(self):
         """Create correlation heatmap for key variables"""
-        available_cols = [col for col in self.key_columns if col in self.df.columns]
+        summary = self.streaming_stats()
+        available_cols = summary.present(self.key_columns)
         if available_cols:
             plt.figure(figsize=(10, 8))
-            correlation_matrix = self.df[available_cols].corr()
+            correlation_matrix = summary.corr(available_cols)
             sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0,
                        square=True, linewidths=0.5)
             plt.title('Correlation Heatmap - Solar Measurements')
@@ -150,10 +582,12 @@ def export_cleaned_data(self, country_name="benin"):
 
     def distribution_analysis(self):
         """Show distribution of key measurements using boxplots"""
-        available_cols = [col for col in self.key_columns if col in self.df.columns]
+        summary = self.streaming_stats()
+        available_cols = summary.present(self.key_columns)
         if available_cols:
             plt.figure(figsize=(12, 6))
-            self.df[available_cols].boxplot()
+            # Quartiles from the quantile sketches instead of sorting every column
+            plt.gca().bxp([summary.box_stats(col) for col in available_cols], showfliers=False)
             plt.title('Distribution of Solar & Wind Measurements')
             plt.ylabel('Measurement Values')
             plt.xticks(rotation=45)
@@ -175,6 +609,9 @@ def export_cleaned_data(self, country_name="benin"):
             plt.show()
             
             print(f"Outlier Summary: {outlier_summary.get(True, 0)} rows with outliers")
+            if 'OutlierFlags' in self.df.columns:
+                print("Rows flagged per rule:")
+                print(rule_counts(self.df['OutlierFlags']).to_string())
 
 
     def cleaning_impact_analysis(self):
@@ -190,14 +627,42 @@ def export_cleaned_data(self, country_name="benin"):
             plt.grid(True, alpha=0.3)
             plt.show()
 
+    def soiling_analysis(self, window='1D', modules=('ModA', 'ModB'), min_irradiance=MIN_IRRADIANCE):
+        """Module/GHI ratios in the ``window`` before and after every cleaning event
+
+        Shows the ratios around each event and prints the median recovery and
+        soiling rate per module; returns ``(events, summary)``.
+        """
+        if 'Cleaning' not in self.df.columns or 'GHI' not in self.df.columns:
+            print("❌ Cleaning flags or GHI not available for soiling analysis")
+            return None, None
+        events = event_windows(self.df, modules, window, min_irradiance=min_irradiance)
+        summary = soiling_summary(self.df, modules, window, min_irradiance=min_irradiance)
+        print(f"🧽 {len(events)} cleaning events")
+        print(summary.round(3))
+
+        measured = [m for m in modules if f'{m}_recovery' in events.columns]
+        if len(events) and measured:
+            fig, axes = plt.subplots(len(measured), 1, figsize=(12, 4 * len(measured)), squeeze=False)
+            for ax, module in zip(axes[:, 0], measured):
+                ax.plot(events['start'], events[f'{module}_before'], 'o', alpha=0.6, label=f'{window} before')
+                ax.plot(events['start'], events[f'{module}_after'], 'o', alpha=0.6, label=f'{window} after')
+                ax.set_ylabel(f'{module} / GHI')
+                ax.set_title(f'{module} Ratio Around Cleaning Events')
+                ax.legend()
+                ax.grid(True, alpha=0.3)
+            plt.tight_layout()
+            plt.show()
+        return events, summary
+
     # NEW METHODS ADDED BELOW
 
     def generate_bubble_chart(self):
         """Bubble Chart: GHI vs Tamb with RH bubble size"""
         if all(col in self.df.columns for col in ['GHI', 'Tamb', 'RH']):
             plt.figure(figsize=(10, 6))
-            plt.scatter(self.df['Tamb'], self.df['GHI'], 
-                       s=self.df['RH']/2, alpha=0.6, color='blue')
+            binned_scatter(plt.gca(), self.df['Tamb'], self.df['GHI'],
+                           sizes=self.df['RH'], size_scale=0.5, alpha=0.6, color='blue')
             plt.xlabel('Temperature (°C)')
             plt.ylabel('GHI (W/m²)')
             plt.title('Bubble Chart: GHI vs Temperature (Bubble size = RH%)')
@@ -208,20 +673,23 @@ def export_cleaned_data(self, country_name="benin"):
 
     def generate_histograms(self):
         """Generate Histograms for GHI and Wind Speed"""
+        summary = self.streaming_stats()
         fig, axes = plt.subplots(1, 2, figsize=(15, 5))
         
-        if 'GHI' in self.df.columns:
-            axes[0].hist(self.df['GHI'].dropna(), alpha=0.7, bins=30, color='orange')
+        if summary.present(['GHI']):
+            counts, edges = summary.histogram('GHI')
+            axes[0].hist(edges[:-1], bins=edges, weights=counts, alpha=0.7, color='orange')
             axes[0].set_xlabel('GHI (W/m²)')
             axes[0].set_ylabel('Frequency')
-            axes[0].set_title('GHI Distribution Histogram')
+            axes[0].set_title('GHI Distribution Histogram' + summary.outside_note('GHI'))
             axes[0].grid(True, alpha=0.3)
         
-        if 'WS' in self.df.columns:
-            axes[1].hist(self.df['WS'].dropna(), alpha=0.7, bins=30, color='green')
+        if summary.present(['WS']):
+            counts, edges = summary.histogram('WS')
+            axes[1].hist(edges[:-1], bins=edges, weights=counts, alpha=0.7, color='green')
             axes[1].set_xlabel('Wind Speed (m/s)')
             axes[1].set_ylabel('Frequency')
-            axes[1].set_title('Wind Speed Distribution Histogram')
+            axes[1].set_title('Wind Speed Distribution Histogram' + summary.outside_note('WS'))
             axes[1].grid(True, alpha=0.3)
         
         plt.tight_layout()
@@ -229,12 +697,12 @@ def export_cleaned_data(self, country_name="benin"):
 
     def generate_correlation_heatmap(self):
         """Generate Correlation Heatmap"""
-        numeric_cols = self.df.select_dtypes(include=[np.number]).columns
-        key_cols = [col for col in ['GHI', 'DNI', 'DHI', 'Tamb', 'RH', 'WS', 'BP'] if col in numeric_cols]
+        summary = self.streaming_stats()
+        key_cols = summary.present(['GHI', 'DNI', 'DHI', 'Tamb', 'RH', 'WS', 'BP'])
         
         if len(key_cols) > 1:
             plt.figure(figsize=(8, 6))
-            correlation_matrix = self.df[key_cols].corr()
+            correlation_matrix = summary.corr(key_cols)
             sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0,
                        square=True, linewidths=0.5)
             plt.title('Correlation Heatmap - Solar Measurements')
@@ -247,7 +715,7 @@ def export_cleaned_data(self, country_name="benin"):
         fig, axes = plt.subplots(2, 2, figsize=(15, 12))
         
         if all(col in self.df.columns for col in ['WS', 'GHI']):
-            axes[0,0].scatter(self.df['WS'], self.df['GHI'], alpha=0.6, color='red')
+            density_scatter(axes[0,0], self.df['WS'], self.df['GHI'], color='red', alpha=0.6)
             axes[0,0].set_xlabel('Wind Speed (m/s)')
             axes[0,0].set_ylabel('GHI (W/m²)')
             axes[0,0].set_title('Wind Speed vs GHI')
@@ -255,7 +723,7 @@ def export_cleaned_data(self, country_name="benin"):
             plots_created += 1
         
         if all(col in self.df.columns for col in ['RH', 'Tamb']):
-            axes[0,1].scatter(self.df['RH'], self.df['Tamb'], alpha=0.6, color='blue')
+            density_scatter(axes[0,1], self.df['RH'], self.df['Tamb'], color='blue', alpha=0.6)
             axes[0,1].set_xlabel('Relative Humidity (%)')
             axes[0,1].set_ylabel('Temperature (°C)')
             axes[0,1].set_title('Relative Humidity vs Temperature')
@@ -263,7 +731,7 @@ def export_cleaned_data(self, country_name="benin"):
             plots_created += 1
         
         if all(col in self.df.columns for col in ['RH', 'GHI']):
-            axes[1,0].scatter(self.df['RH'], self.df['GHI'], alpha=0.6, color='green')
+            density_scatter(axes[1,0], self.df['RH'], self.df['GHI'], color='green', alpha=0.6)
             axes[1,0].set_xlabel('Relative Humidity (%)')
             axes[1,0].set_ylabel('GHI (W/m²)')
             axes[1,0].set_title('Relative Humidity vs GHI')
@@ -271,7 +739,7 @@ def export_cleaned_data(self, country_name="benin"):
             plots_created += 1
         
         if all(col in self.df.columns for col in ['WD', 'GHI']):
-            axes[1,1].scatter(self.df['WD'], self.df['GHI'], alpha=0.6, color='purple')
+            density_scatter(axes[1,1], self.df['WD'], self.df['GHI'], color='purple', alpha=0.6)
             axes[1,1].set_xlabel('Wind Direction (°)')
             axes[1,1].set_ylabel('GHI (W/m²)')
             axes[1,1].set_title('Wind Direction vs GHI')
@@ -283,26 +751,25 @@ def export_cleaned_data(self, country_name="benin"):
             plt.show()
 
     def generate_wind_analysis(self):
-        """Generate wind analysis"""
+        """Generate wind rose and wind speed distribution from a direction × speed table"""
         if all(col in self.df.columns for col in ['WD', 'WS']):
-            plt.figure(figsize=(12, 5))
-            
-            plt.subplot(1, 2, 1)
-            plt.hist(self.df['WD'].dropna(), bins=30, alpha=0.7, color='cyan')
-            plt.xlabel('Wind Direction (°)')
-            plt.ylabel('Frequency')
-            plt.title('Wind Direction Distribution')
-            plt.grid(True, alpha=0.3)
-            
-            plt.subplot(1, 2, 2)
-            plt.hist(self.df['WS'].dropna(), bins=30, alpha=0.7, color='orange')
-            plt.xlabel('Wind Speed (m/s)')
-            plt.ylabel('Frequency')
-            plt.title('Wind Speed Distribution')
-            plt.grid(True, alpha=0.3)
-            
+            rose = WindRose.from_frame(self.df)
+            fig = plt.figure(figsize=(12, 5))
+
+            ax = fig.add_subplot(1, 2, 1, projection='polar')
+            rose.plot(ax, title='Wind Rose')
+            ax.legend(loc='upper left', bbox_to_anchor=(1.05, 1.0), fontsize='small')
+
+            ax = fig.add_subplot(1, 2, 2)
+            ax.bar(rose.speed_labels(), rose.frequencies().sum(axis=0), alpha=0.7, color='orange')
+            ax.set_xlabel('Wind Speed (m/s)')
+            ax.set_ylabel('Frequency (%)')
+            ax.set_title('Wind Speed Distribution')
+            ax.grid(True, alpha=0.3)
+
             plt.tight_layout()
             plt.show()
+            return rose
         else:
             print("❌ Wind data not available")
 
@@ -314,6 +781,7 @@ if __name__ == "__main__":
     
     # Load and clean data
     eda.load_data()
+    eda.regularize()
     eda.clean_data()
     eda.basic_info()
 
@@ -324,6 +792,7 @@ if __name__ == "__main__":
     eda.distribution_analysis()
     eda.outlier_analysis()
     eda.cleaning_impact_analysis()
+    eda.soiling_analysis()
     
     # New analyses
     eda.generate_bubble_chart()
@@ -0,0 +1,306 @@
+import csv
+import gzip
+import hashlib
+import json
+import os
+import shutil
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+try:
+    import zstandard
+except ImportError:  # zstd output is optional
+    zstandard = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional
+    pa = None
+
+# Timestamp layout per resolution; 'm' is the station exports' own layout
+# ("2021-08-09 00:01"), the finer ones keep seconds and fractions exactly
+CSV_DATE_FORMATS = {'m': '%Y-%m-%d %H:%M', 's': '%Y-%m-%d %H:%M:%S', 'us': '%Y-%m-%d %H:%M:%S.%f',
+                    'ns': '%Y-%m-%d %H:%M:%S.%f'}
+_UNIT_NS = (('m', 60_000_000_000), ('s', 1_000_000_000), ('us', 1_000), ('ns', 1))
+_UNITS = [unit for unit, _ in _UNIT_NS]
+# Length of a timestamp written in each layout, to recognise an existing file's
+_UNIT_BY_LENGTH = {16: 'm', 19: 's', 26: 'us', 29: 'ns'}
+COMPRESSION_SUFFIXES = {None: '', 'gzip': '.gz', 'zstd': '.zst'}
+FORMATS = ('csv', 'parquet')
+MANIFEST_SUFFIX = '.manifest.json'
+
+
+def _compress(data, compression, level=None):
+    """One self-contained gzip member or zstd frame; concatenations stay valid files"""
+    if compression is None:
+        return data
+    if compression == 'gzip':
+        return gzip.compress(data, compresslevel=level or 6, mtime=0)
+    if compression == 'zstd':
+        if zstandard is None:
+            raise ImportError("zstd export needs the 'zstandard' package")
+        return zstandard.ZstdCompressor(level=level or 3).compress(data)
+    raise ValueError(f"Unknown compression: {compression!r} (use None, 'gzip' or 'zstd')")
+
+
+def timestamp_unit(index):
+    """Coarsest of 'm', 's', 'us', 'ns' that writes every timestamp of ``index`` exactly"""
+    keys = index.as_unit('ns').asi8[~index.isna()]
+    return next(unit for unit, step in _UNIT_NS if not np.count_nonzero(keys % step))
+
+
+def _timestamp_strings(index, unit):
+    """CSV_DATE_FORMATS[unit] strings of a naive DatetimeIndex, far faster than strftime"""
+    text = np.datetime_as_string(index.to_numpy(), unit=unit)
+    return pd.Index(np.char.replace(text, 'T', ' '), name=index.name)
+
+
+def _format_csv_chunk(chunk, header, compression, level, unit='m'):
+    """CSV bytes of one chunk with its Timestamp index, compressed if requested"""
+    if len(chunk) and isinstance(chunk.index, pd.DatetimeIndex) and chunk.index.tz is None:
+        chunk = chunk.set_axis(_timestamp_strings(chunk.index, unit))
+    text = chunk.to_csv(header=header, index=chunk.index.name is not None, date_format=CSV_DATE_FORMATS[unit])
+    return len(chunk), _compress(text.encode('utf-8'), compression, level)
+
+
+def _slices(n_rows, chunksize):
+    return [(start, min(start + chunksize, n_rows)) for start in range(0, n_rows, chunksize)] or [(0, 0)]
+
+
+def _ordered_map(func, items, workers, executor):
+    """Like executor.map, but with at most 2 × workers tasks in flight to bound memory
+
+    No more workers than items are started, and a single item runs in-process.
+    """
+    items = list(items)
+    workers = min(workers, len(items))
+    if workers <= 1:
+        for item in items:
+            yield func(*item)
+        return
+    pool_class = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+    with pool_class(max_workers=workers) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(func, *item))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _time_range(df):
+    if len(df) == 0 or not isinstance(df.index, pd.DatetimeIndex):
+        return None, None
+    return str(df.index.min()), str(df.index.max())
+
+
+def write_csv(df, path, compression=None, chunksize=200_000, workers=None, executor='thread', level=None):
+    """Write ``df`` (Timestamp index kept) as CSV in chunks formatted and compressed in parallel
+
+    Chunks are written in order as they complete, with at most a few in
+    memory at once. Compressed output is a sequence of gzip members or zstd
+    frames, which standard tools and ``pd.read_csv`` read as one stream.
+    Timestamps are written to the minute when they all fall on whole
+    minutes, else with the seconds (and fractions) they carry; the manifest
+    entry of the file records the ``date_format`` used.
+    """
+    workers = workers or os.cpu_count() or 1
+    digest = hashlib.sha256()
+    rows = 0
+    unit = timestamp_unit(df.index) if isinstance(df.index, pd.DatetimeIndex) else 'm'
+    items = ((df.iloc[start:stop], start == 0, compression, level, unit)
+             for start, stop in _slices(len(df), chunksize))
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        for chunk_rows, data in _ordered_map(_format_csv_chunk, items, workers, executor):
+            f.write(data)
+            digest.update(data)
+            rows += chunk_rows
+    os.replace(tmp_path, path)
+    start, end = _time_range(df)
+    return {'path': path, 'rows': rows, 'bytes': os.path.getsize(path), 'sha256': digest.hexdigest(),
+            'start': start, 'end': end, 'date_format': CSV_DATE_FORMATS[unit]}
+
+
+def finest_unit(units):
+    """The finest of several ``timestamp_unit`` results ('m' for none)"""
+    return max(units, key=_UNITS.index, default='m')
+
+
+def read_csv_tail(path, block_size=1 << 16):
+    """(header, last row's first field) of an uncompressed CSV, reading only its two ends
+
+    The last field is None when the file holds no rows.
+    """
+    with open(path, 'rb') as f:
+        first = f.readline()
+        size = f.seek(0, os.SEEK_END)
+        f.seek(max(size - block_size, len(first)))
+        lines = [line for line in f.read().splitlines() if line.strip()]
+    header = next(csv.reader([first.decode('utf-8')]), [])
+    last = next(csv.reader([lines[-1].decode('utf-8')]))[0] if lines else None
+    return header, last
+
+
+def append_csv(df, path, unit=None):
+    """Append ``df`` (Timestamp index kept) to a CSV written by ``write_csv``
+
+    Rows follow the file's column order and timestamps its layout, so the
+    file keeps a single date format; a new or empty file gets a header and
+    the layout ``write_csv`` would pick (or ``unit``). Raises ValueError
+    when the rows need a finer layout than the file already uses.
+    Returns the number of rows written.
+    """
+    needed = unit or (timestamp_unit(df.index) if len(df) else 'm')
+    header, last = read_csv_tail(path) if os.path.exists(path) and os.path.getsize(path) else (None, None)
+    if header is not None:
+        df = df.reindex(columns=[col for col in header if col != df.index.name])
+    if last is not None:
+        file_unit = _UNIT_BY_LENGTH.get(len(last), 'ns')
+        if _UNITS.index(needed) > _UNITS.index(file_unit):
+            raise ValueError(f"{path} stores timestamps as {CSV_DATE_FORMATS[file_unit]!r}, "
+                             f"too coarse for the appended rows")
+        needed = file_unit
+    rows, data = _format_csv_chunk(df, header is None, None, None, needed)
+    with open(path, 'ab') as f:
+        f.write(data)
+    return rows
+
+
+def file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _month_slices(df):
+    """(year, month, start, stop) row ranges of a time-sorted frame"""
+    if len(df) == 0:
+        return []
+    periods = df.index.year.to_numpy() * 12 + df.index.month.to_numpy() - 1
+    boundaries = [0] + list((periods[1:] != periods[:-1]).nonzero()[0] + 1) + [len(df)]
+    return [(int(periods[start] // 12), int(periods[start] % 12 + 1), start, stop)
+            for start, stop in zip(boundaries[:-1], boundaries[1:])]
+
+
+def column_stats(df):
+    """[min, max] of each numeric column (None for all-NaN columns)"""
+    numeric = df.select_dtypes(include=[np.number])
+    lows, highs = numeric.min(), numeric.max()
+    return {col: None if pd.isna(lows[col]) else [float(lows[col]), float(highs[col])]
+            for col in numeric.columns}
+
+
+def _write_parquet_part(part, path, compression):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.Table.from_pandas(part.reset_index() if part.index.name else part, preserve_index=False)
+    pq.write_table(table, path, compression=compression or 'none')
+    start, end = _time_range(part)
+    return {'path': path, 'rows': len(part), 'bytes': os.path.getsize(path), 'sha256': file_sha256(path),
+            'start': start, 'end': end, 'stats': column_stats(part)}
+
+
+def write_parquet(df, directory, compression='zstd', chunksize=500_000, workers=None, before_swap=None):
+    """Write a Timestamp-indexed frame as Parquet partitioned by year and month
+
+    Files go to ``directory/year=YYYY/month=MM/part-NNNNN.parquet`` (Hive
+    layout, so pyarrow and pandas read the partitions back selectively),
+    one file per month and chunk. The tree is built in a temporary
+    directory that replaces ``directory`` only when complete;
+    ``before_swap(tmp_dir, entries)`` can add files to it first (e.g. an
+    index), so they appear together with the partitions. Returns the
+    manifest entries of the files.
+    """
+    if pa is None:
+        raise ImportError("Parquet export needs the 'pyarrow' package")
+    if not isinstance(df.index, pd.DatetimeIndex):
+        raise ValueError("Partitioned Parquet export needs a Timestamp (DatetimeIndex) index")
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+
+    # Build the new tree next to the old one and swap, so no stale parts survive
+    tmp_dir = f"{directory}.{os.getpid()}.tmp"
+    items = []
+    for year, month, start, stop in _month_slices(df):
+        for part, (chunk_start, chunk_stop) in enumerate(_slices(stop - start, chunksize)):
+            path = os.path.join(tmp_dir, f"year={year}", f"month={month:02d}", f"part-{part:05d}.parquet")
+            items.append((df.iloc[start + chunk_start:start + chunk_stop], path, compression))
+    os.makedirs(tmp_dir, exist_ok=True)
+    # pyarrow releases the GIL while encoding, so threads are enough here
+    files = list(_ordered_map(_write_parquet_part, items, workers or os.cpu_count() or 1, 'thread'))
+    if before_swap is not None:
+        before_swap(tmp_dir, files)
+    # Move the old tree aside instead of deleting it first, so the directory
+    # is only missing between two renames
+    old_dir = None
+    if os.path.isdir(directory):
+        old_dir = f"{directory}.{os.getpid()}.old"
+        os.replace(directory, old_dir)
+    os.replace(tmp_dir, directory)
+    if old_dir is not None:
+        shutil.rmtree(old_dir)
+    for entry in files:
+        entry['path'] = os.path.join(directory, os.path.relpath(entry['path'], tmp_dir))
+    return files
+
+
+def export_frame(df, output_dir, name, fmt='csv', compression=None, chunksize=None, workers=None,
+                 executor='thread'):
+    """Export ``df`` as ``fmt`` under ``output_dir`` and write ``<name>.manifest.json``
+
+    ``fmt='csv'`` writes ``<name>.csv`` (``.gz``/``.zst`` with gzip/zstd
+    compression); ``fmt='parquet'`` writes the partitioned directory
+    ``<name>/`` (zstd-compressed unless ``compression`` says otherwise).
+    The manifest lists every file with its rows, size, sha256 and time range.
+    CSV chunks are formatted in a thread pool by default, which avoids
+    copying chunks to workers; ``to_csv`` holds the GIL, so
+    ``executor='process'`` only pays off with several cores and chunks to
+    spread over them.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt!r} (use one of {FORMATS})")
+    os.makedirs(output_dir, exist_ok=True)
+
+    if fmt == 'csv':
+        path = os.path.join(output_dir, f"{name}.csv{COMPRESSION_SUFFIXES[compression]}")
+        files = [write_csv(df, path, compression, chunksize or 200_000, workers, executor)]
+    else:
+        compression = compression or 'zstd'
+        files = write_parquet(df, os.path.join(output_dir, name), compression, chunksize or 500_000, workers)
+
+    manifest = {
+        'name': name,
+        'format': fmt,
+        'compression': compression,
+        'rows': sum(entry['rows'] for entry in files),
+        'columns': ([df.index.name] if df.index.name else []) + list(df.columns),
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'files': [dict(entry, path=os.path.relpath(entry['path'], output_dir)) for entry in files],
+    }
+    manifest_path = os.path.join(output_dir, name + MANIFEST_SUFFIX)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+    manifest['manifest_path'] = manifest_path
+    manifest['output_path'] = files[0]['path'] if fmt == 'csv' else os.path.join(output_dir, name)
+    return manifest
+
+
+def verify_manifest(manifest_path):
+    """Paths of the files that are missing or whose checksum no longer matches"""
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    base = os.path.dirname(manifest_path)
+    bad = []
+    for entry in manifest['files']:
+        path = os.path.join(base, entry['path'])
+        if not os.path.exists(path) or file_sha256(path) != entry['sha256']:
+            bad.append(path)
+    return bad
@@ -0,0 +1,80 @@
+import numpy as np
+
+from src.solar_geometry import clear_sky, clear_sky_index, daytime_mask, resolve_location
+
+
+class DerivedFeatures:
+    """Memoized hour keys, hourly means and solar features of a Timestamp-indexed frame
+
+    Nothing is added to the frame itself: the hour key is kept as a compact
+    int8 array next to it and every aggregate is computed once; ``memo``
+    holds other per-frame results (rollups, streaming statistics). The
+    cache belongs to one frame; ``matches`` tells whether a frame is still the
+    one it was built for (same object, shape and columns). ``snapshot`` and
+    the ``cache`` argument hand computed results to a copy of the same frame
+    in another process.
+    """
+
+    def __init__(self, df, location=None, cache=None):
+        self.df = df
+        self.location = location
+        self._fingerprint = self.fingerprint(df)
+        self._cache = dict(cache or {})
+
+    @staticmethod
+    def fingerprint(df):
+        return (id(df), df.shape, tuple(df.columns))
+
+    def matches(self, df, location=None):
+        return (df is self.df and self.fingerprint(df) == self._fingerprint
+                and location == self.location)
+
+    def memo(self, key, compute):
+        """Result of ``compute()``, computed once per ``key`` for this frame"""
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def snapshot(self):
+        """Everything computed so far, keyed as in ``memo``"""
+        return dict(self._cache)
+
+    # Calendar key
+
+    def hour(self):
+        return self.memo('hour', lambda: self.df.index.hour.to_numpy().astype(np.int8))
+
+    # Aggregates
+
+    def _columns(self, columns):
+        return tuple(col for col in columns if col in self.df.columns)
+
+    def hourly_means(self, columns, daytime_only=False):
+        """Mean of ``columns`` for each hour of the day, optionally over daytime rows only"""
+        columns = self._columns(columns)
+
+        def compute():
+            frame, hours = self.df[list(columns)], self.hour()
+            if daytime_only:
+                mask = self.daytime()
+                frame, hours = frame[mask], hours[mask]
+            return frame.groupby(hours).mean().rename_axis('Hour')
+
+        return self.memo(('hourly_means', columns, daytime_only), compute)
+
+    # Solar geometry (needs a location)
+
+    def solar(self):
+        """Solar position and clear-sky irradiance for every row"""
+        if self.location is None:
+            raise ValueError("Solar features need a location (site name or (lat, lon[, utc_offset]))")
+        return self.memo('solar', lambda: clear_sky(self.df.index, *resolve_location(self.location)))
+
+    def daytime(self):
+        """Boolean mask of rows with the sun above the horizon"""
+        return self.memo('daytime', lambda: daytime_mask(self.solar()['zenith'].to_numpy()))
+
+    def clear_sky_index(self):
+        """GHI over clear-sky GHI (NaN at night)"""
+        return self.memo('clear_sky_index', lambda: clear_sky_index(
+            self.df['GHI'].to_numpy(), self.solar()['ghi_clear'].to_numpy()))
@@ -0,0 +1,284 @@
+import argparse
+import cProfile
+import contextlib
+import functools
+import inspect
+import io
+import json
+import logging
+import os
+import pstats
+import runpy
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; the RSS high-water mark is skipped there
+    resource = None
+
+# SOLAR_METRICS=log sends stage records to the 'solar.metrics' logger,
+# any other value is taken as the path of a JSONL metrics file.
+# SOLAR_METRICS_MEMORY=1 also traces Python allocations for per-stage peaks.
+METRICS_ENV = 'SOLAR_METRICS'
+MEMORY_ENV = 'SOLAR_METRICS_MEMORY'
+
+logger = logging.getLogger('solar.metrics')
+
+
+class _Config:
+    enabled = False
+    log = False
+    path = None
+    trace_memory = False
+
+
+_config = _Config()
+_local = threading.local()
+_write_lock = threading.Lock()
+
+
+def enable(path=None, log=None, trace_memory=False):
+    """Start recording stages to a JSONL file at ``path`` and/or the logger
+
+    With neither ``path`` nor ``log`` given, records go to the logger.
+    ``trace_memory`` starts tracemalloc so each stage reports its own peak of
+    Python allocations (numpy and pandas buffers included), at some cost.
+    """
+    _config.path = path
+    _config.log = log if log is not None else path is None
+    _config.trace_memory = trace_memory
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _config.enabled = True
+
+
+def disable():
+    """Stop recording stages"""
+    if _config.trace_memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _config.enabled = False
+    _config.trace_memory = False
+
+
+def is_enabled():
+    return _config.enabled
+
+
+def enable_from_env():
+    """Apply SOLAR_METRICS / SOLAR_METRICS_MEMORY, if set
+
+    Called by the entry points (command-line mains, the pipeline's worker
+    processes, the dashboard and model servers); importing this module
+    changes nothing. An explicit ``enable`` takes precedence.
+    """
+    if _config.enabled:
+        return True
+    target = os.environ.get(METRICS_ENV, '').strip()
+    if not target or target.lower() in ('0', 'off', 'false'):
+        return False
+    trace_memory = os.environ.get(MEMORY_ENV, '').strip().lower() in ('1', 'true', 'on')
+    if target.lower() in ('1', 'log', 'true', 'on'):
+        enable(log=True, trace_memory=trace_memory)
+    else:
+        enable(path=target, log=False, trace_memory=trace_memory)
+    return True
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+def emit(record):
+    """Send one finished stage record to the configured outputs"""
+    line = json.dumps(record, default=str)
+    if _config.log:
+        logger.info(line)
+    if _config.path:
+        with _write_lock, open(_config.path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+
+@contextlib.contextmanager
+def stage(name, rows=None, bytes_read=None, **fields):
+    """Time a block and emit its record; the yielded dict can be filled in
+
+    Nested stages name their parent. When memory tracing is on, each stage
+    reports its own peak and the enclosing stage's peak still covers it.
+    The record's ``seconds`` is set on exit even while disabled (nothing is
+    emitted then), so callers can report durations from it.
+    """
+    if not _config.enabled:
+        record = {}
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = time.perf_counter() - start
+        return
+
+    stack = _local.__dict__.setdefault('stack', [])
+    record = {'stage': name, 'rows': rows, 'bytes_read': bytes_read, **fields}
+    tracing = _config.trace_memory and tracemalloc.is_tracing()
+    if tracing:
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1]['_peak'] = max(stack[-1].get('_peak', 0), peak)
+        tracemalloc.reset_peak()
+        record['_start_memory'] = current
+    if stack:
+        record['parent'] = stack[-1]['stage']
+    stack.append(record)
+    start = time.perf_counter()
+    try:
+        yield record
+    except BaseException as exc:
+        record['error'] = type(exc).__name__
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        stack.pop()
+        start_memory = record.pop('_start_memory', None)
+        own_peak = record.pop('_peak', 0)
+        if tracing and tracemalloc.is_tracing():
+            peak = max(own_peak, tracemalloc.get_traced_memory()[1])
+            record['peak_mb'] = (peak - start_memory) / 1024 ** 2
+            if stack:
+                stack[-1]['_peak'] = max(stack[-1].get('_peak', 0), peak)
+        record['seconds'] = seconds
+        if record.get('rows') and seconds > 0:
+            record['rows_per_s'] = record['rows'] / seconds
+        record['peak_rss_mb'] = _peak_rss_mb()
+        record['pid'] = os.getpid()
+        record['timestamp'] = datetime.now(timezone.utc).isoformat(timespec='milliseconds')
+        emit(record)
+
+
+def _default_rows(instance, result):
+    """Rows of the returned frame, else of the instance's working frame"""
+    for candidate in (result, getattr(instance, 'df', None)):
+        if hasattr(candidate, 'shape') and len(getattr(candidate, 'shape', ())) >= 1:
+            return int(candidate.shape[0])
+    return None
+
+
+def file_size(path):
+    """Size of ``path`` in bytes, or None if it is missing"""
+    try:
+        return os.path.getsize(path)
+    except (OSError, TypeError):
+        return None
+
+
+def instrumented(name, rows=_default_rows, reads=None):
+    """Decorator recording a stage for every call while instrumentation is enabled
+
+    ``rows(instance, result)`` counts the rows processed and
+    ``reads(instance, call)`` returns the file paths read by the call (their
+    sizes are summed into ``bytes_read``), where ``call`` maps every
+    parameter name to its value, defaults included. ``instance`` is the
+    bound instance for methods and None for functions. When disabled, the
+    call goes straight through.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        is_method = next(iter(signature.parameters), None) == 'self'
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _config.enabled:
+                return func(*args, **kwargs)
+            instance = args[0] if is_method and args else None
+            bytes_read = None
+            if reads is not None:
+                call = signature.bind(*args, **kwargs)
+                call.apply_defaults()
+                paths = reads(instance, call.arguments)
+                paths = [paths] if isinstance(paths, (str, os.PathLike)) else list(paths or [])
+                sizes = [size for size in map(file_size, paths) if size is not None]
+                bytes_read = sum(sizes) if sizes else None
+            with stage(name, bytes_read=bytes_read) as record:
+                result = func(*args, **kwargs)
+                if rows is not None:
+                    record['rows'] = rows(instance, result)
+            return result
+        return wrapper
+    return decorator
+
+
+@contextlib.contextmanager
+def profile(mode='cprofile', output=None, top=25):
+    """Capture a cProfile or tracemalloc profile of one run
+
+    The ``top`` entries are printed; with ``output`` the cProfile stats are
+    dumped for snakeviz/pstats, or the tracemalloc listing is written as text.
+    """
+    if mode == 'cprofile':
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield profiler
+        finally:
+            profiler.disable()
+            if output:
+                profiler.dump_stats(output)
+            stream = io.StringIO()
+            pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(top)
+            print(stream.getvalue())
+    elif mode == 'tracemalloc':
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start(25)
+        try:
+            yield None
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            if not was_tracing:
+                tracemalloc.stop()
+            lines = [f"Peak traced memory: {peak / 1024 ** 2:.1f} MB"]
+            lines += [str(stat) for stat in snapshot.statistics('lineno')[:top]]
+            report = '\n'.join(lines)
+            if output:
+                with open(output, 'w', encoding='utf-8') as f:
+                    f.write(report + '\n')
+            print(report)
+    else:
+        raise ValueError(f"Unknown profile mode: {mode!r} (use 'cprofile' or 'tracemalloc')")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run a module with stage metrics and optionally a profile, "
+                    "e.g. python -m src.instrumentation --metrics run.jsonl src.report data/benin.csv --out reports")
+    parser.add_argument('--metrics', help="JSONL metrics file (default: log to stderr)")
+    parser.add_argument('--memory', action='store_true', help="trace per-stage peak memory")
+    parser.add_argument('--profile', choices=['cprofile', 'tracemalloc'], help="capture a profile of the run")
+    parser.add_argument('--profile-out', help="where to write the profile")
+    parser.add_argument('module', help="module to run as __main__")
+    parser.add_argument('args', nargs=argparse.REMAINDER, help="arguments for the module")
+    args = parser.parse_args(argv)
+
+    if not args.metrics:
+        logging.basicConfig(level=logging.INFO, format='%(message)s')
+    enable(path=args.metrics, log=not args.metrics, trace_memory=args.memory)
+    sys.argv = [args.module] + args.args
+    capture = profile(args.profile, args.profile_out) if args.profile else contextlib.nullcontext()
+    try:
+        with capture:
+            runpy.run_module(args.module, run_name='__main__', alter_sys=True)
+    finally:
+        disable()
+
+
+if __name__ == "__main__":
+    # Run through the importable module so the pipeline sees the same switch
+    from src.instrumentation import main as _main
+    _main()
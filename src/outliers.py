@@ -0,0 +1,224 @@
+import numpy as np
+import pandas as pd
+
+from src.sketches import QuantileSketch
+
+# One bit per rule in the per-row flag mask
+RULE_BITS = {
+    'zscore': 1,
+    'seasonal_zscore': 2,
+    'mad': 4,
+    'iqr': 8,
+    'physical_range': 16,
+    'closure': 32,
+}
+
+# Plausible sensor ranges; readings outside are physically impossible
+PHYSICAL_LIMITS = {
+    'GHI': (-10, 1500), 'DNI': (-10, 1400), 'DHI': (-10, 900),
+    'ModA': (-10, 1500), 'ModB': (-10, 1500),
+    'Tamb': (-40, 60), 'RH': (0, 100), 'BP': (800, 1100),
+    'WS': (0, 60), 'WSgust': (0, 80), 'WD': (0, 360),
+}
+
+# GHI vs DNI*cos(zenith) + DHI closure test, only meaningful with the sun up
+CLOSURE_MAX_ZENITH = 75
+CLOSURE_MIN_GHI = 50
+CLOSURE_TOLERANCE = 0.08
+CLOSURE_MIN_ERROR = 50
+
+
+def explain(mask):
+    """Names of the rules set in a flag value"""
+    return [rule for rule, bit in RULE_BITS.items() if int(mask) & bit]
+
+
+def rule_counts(masks):
+    """Number of rows flagged by each rule"""
+    masks = np.asarray(masks)
+    return pd.Series({rule: int(((masks & bit) != 0).sum()) for rule, bit in RULE_BITS.items()})
+
+
+class OutlierDetector:
+    """Chunked outlier detection with selectable rules
+
+    Rules: ``zscore`` (global), ``seasonal_zscore`` (per hour of day),
+    ``mad`` (median/MAD robust z-score), ``iqr`` (Tukey fences),
+    ``physical_range`` (sensor limits) and ``closure`` (GHI against
+    DNI·cos(zenith) + DHI, needs ``zenith_func``). Medians, MADs and
+    quartiles are taken per hour of day like the seasonal z-score, so night
+    zeros and midday peaks are not judged against one diurnal mixture; hours
+    with no spread (MAD or IQR of 0, e.g. GHI at night) flag nothing.
+    Statistics are accumulated in O(columns × 24) state plus quantile
+    sketches per hour and column; ``flag`` returns a uint8 mask per row with
+    one bit per rule that fired.
+    """
+
+    def __init__(self, columns, rules=('zscore',), z_threshold=3, mad_threshold=3.5,
+                 iqr_factor=1.5, limits=PHYSICAL_LIMITS, zenith_func=None, compression=1000):
+        unknown = set(rules) - set(RULE_BITS)
+        if unknown:
+            raise ValueError(f"Unknown outlier rules: {sorted(unknown)}")
+        if 'closure' in rules and zenith_func is None:
+            raise ValueError("The 'closure' rule needs zenith_func (set the station location)")
+        self.columns = list(columns)
+        self.rules = tuple(rules)
+        self.z_threshold = z_threshold
+        self.mad_threshold = mad_threshold
+        self.iqr_factor = iqr_factor
+        self.limits = limits
+        self.zenith_func = zenith_func
+        self.compression = compression
+        self.reset()
+
+    def reset(self):
+        k = len(self.columns)
+        self.counts = np.zeros(k)
+        self.means = np.zeros(k)
+        self.m2 = np.zeros(k)
+        self.hour_counts = np.zeros((24, k))
+        self.hour_sums = np.zeros((24, k))
+        self.hour_squares = np.zeros((24, k))
+        # [hour][column] sketches of the values and of their deviations from the hour's median
+        self.sketches = [[QuantileSketch(self.compression) for _ in self.columns] for _ in range(24)]
+        self.deviation_sketches = [[QuantileSketch(self.compression) for _ in self.columns] for _ in range(24)]
+
+    def _needs_quantiles(self):
+        return 'mad' in self.rules or 'iqr' in self.rules
+
+    def _values(self, chunk):
+        return chunk[self.columns].to_numpy(dtype=np.float64)
+
+    @staticmethod
+    def _hour_groups(chunk):
+        """(hour, row positions) for each hour of day present in ``chunk``"""
+        hours = chunk.index.hour.to_numpy()
+        order = np.argsort(hours, kind='stable')
+        bounds = np.searchsorted(hours[order], np.arange(25))
+        return [(hour, order[bounds[hour]:bounds[hour + 1]])
+                for hour in range(24) if bounds[hour + 1] > bounds[hour]]
+
+    def partial_fit(self, chunk):
+        """Accumulate first-pass statistics from one chunk"""
+        values = self._values(chunk)
+        valid = ~np.isnan(values)
+        filled = np.where(valid, values, 0)
+
+        n_b = valid.sum(axis=0)
+        mean_b = np.divide(filled.sum(axis=0), n_b, out=np.zeros(len(self.columns)), where=n_b > 0)
+        m2_b = np.where(valid, (values - mean_b) ** 2, 0).sum(axis=0)
+        n = self.counts + n_b
+        delta = mean_b - self.means
+        ratio = np.divide(n_b, n, out=np.zeros_like(n), where=n > 0)
+        self.means = self.means + delta * ratio
+        self.m2 = self.m2 + m2_b + delta ** 2 * self.counts * ratio
+        self.counts = n
+
+        if 'seasonal_zscore' in self.rules:
+            hours = chunk.index.hour.to_numpy()
+            for idx in range(len(self.columns)):
+                self.hour_counts[:, idx] += np.bincount(hours, weights=valid[:, idx], minlength=24)
+                self.hour_sums[:, idx] += np.bincount(hours, weights=filled[:, idx], minlength=24)
+                self.hour_squares[:, idx] += np.bincount(hours, weights=filled[:, idx] ** 2, minlength=24)
+
+        if self._needs_quantiles():
+            for hour, rows in self._hour_groups(chunk):
+                for idx, sketch in enumerate(self.sketches[hour]):
+                    sketch.update(values[rows, idx])  # Sketches skip NaNs
+        return self
+
+    def _partial_fit_deviations(self, chunk):
+        """Second pass for MAD: sketch the absolute deviations from the hour's median"""
+        values = self._values(chunk)
+        for hour, rows in self._hour_groups(chunk):
+            deviations = np.abs(values[rows] - self.medians[hour])
+            for idx, sketch in enumerate(self.deviation_sketches[hour]):
+                sketch.update(deviations[:, idx])
+
+    def fit(self, chunks):
+        """Fit on an iterable of chunks, or a callable returning one (needed for 'mad')"""
+        self.reset()
+        for chunk in (chunks() if callable(chunks) else chunks):
+            self.partial_fit(chunk)
+        self.finalize()
+        if 'mad' in self.rules:
+            if not callable(chunks):
+                raise ValueError("The 'mad' rule needs a callable that re-creates the chunks")
+            for chunk in chunks():
+                self._partial_fit_deviations(chunk)
+            self.finalize()
+        return self
+
+    def fit_frame(self, df, chunksize=100_000):
+        """Fit on an in-memory frame in slices"""
+        return self.fit(lambda: (df.iloc[start:start + chunksize]
+                                 for start in range(0, len(df), chunksize)))
+
+    def finalize(self):
+        """Derive thresholds from the accumulated statistics"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.stds = np.sqrt(self.m2 / self.counts)
+            self.hour_means = self.hour_sums / self.hour_counts
+            self.hour_stds = np.sqrt(np.maximum(self.hour_squares / self.hour_counts - self.hour_means ** 2, 0))
+        if self._needs_quantiles():
+            # (24, columns) arrays, NaN for hours without data
+            quartiles = np.array([[sketch.quantile([0.25, 0.5, 0.75]) for sketch in hour]
+                                  for hour in self.sketches])
+            self.q1, self.medians, self.q3 = np.moveaxis(quartiles, 2, 0)
+            self.mads = np.array([[sketch.median() for sketch in hour] for hour in self.deviation_sketches])
+        return self
+
+    def flag(self, chunk):
+        """uint8 rule mask for each row of ``chunk``"""
+        values = self._values(chunk)
+        mask = np.zeros(len(chunk), dtype=np.uint8)
+
+        if 'seasonal_zscore' in self.rules or self._needs_quantiles():
+            hours = chunk.index.hour.to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if 'zscore' in self.rules:
+                z = np.abs((values - self.means) / self.stds)
+                mask[(z > self.z_threshold).any(axis=1)] |= RULE_BITS['zscore']
+            if 'seasonal_zscore' in self.rules:
+                z = np.abs((values - self.hour_means[hours]) / self.hour_stds[hours])
+                mask[(z > self.z_threshold).any(axis=1)] |= RULE_BITS['seasonal_zscore']
+            if 'mad' in self.rules:
+                # 0.6745 scales the MAD to the standard deviation of a normal distribution
+                mads = self.mads[hours]
+                robust_z = 0.6745 * np.abs(values - self.medians[hours]) / np.where(mads > 0, mads, np.nan)
+                mask[(robust_z > self.mad_threshold).any(axis=1)] |= RULE_BITS['mad']
+            if 'iqr' in self.rules:
+                q1, q3 = self.q1[hours], self.q3[hours]
+                spread = np.where(q3 > q1, self.iqr_factor * (q3 - q1), np.nan)
+                outside = (values < q1 - spread) | (values > q3 + spread)
+                mask[outside.any(axis=1)] |= RULE_BITS['iqr']
+
+        if 'physical_range' in self.rules:
+            mask[self._out_of_range(chunk)] |= RULE_BITS['physical_range']
+        if 'closure' in self.rules:
+            mask[self._closure_failures(chunk)] |= RULE_BITS['closure']
+        return mask
+
+    def _out_of_range(self, chunk):
+        outside = np.zeros(len(chunk), dtype=bool)
+        for col, (low, high) in self.limits.items():
+            if col in chunk.columns:
+                values = chunk[col].to_numpy(dtype=np.float64)
+                outside |= (values < low) | (values > high)
+        return outside
+
+    def _closure_failures(self, chunk):
+        if not all(col in chunk.columns for col in ['GHI', 'DNI', 'DHI']):
+            return np.zeros(len(chunk), dtype=bool)
+        zenith = np.asarray(self.zenith_func(chunk.index), dtype=np.float64)
+        ghi = chunk['GHI'].to_numpy(dtype=np.float64)
+        expected = chunk['DNI'].to_numpy(dtype=np.float64) * np.cos(np.radians(zenith)) \
+            + chunk['DHI'].to_numpy(dtype=np.float64)
+        tolerance = np.maximum(CLOSURE_TOLERANCE * np.abs(ghi), CLOSURE_MIN_ERROR)
+        checked = (zenith < CLOSURE_MAX_ZENITH) & (ghi > CLOSURE_MIN_GHI)
+        return checked & (np.abs(ghi - expected) > tolerance)
+
+    def flag_frame(self, df, chunksize=100_000):
+        """Rule mask for a whole frame, computed slice by slice"""
+        return np.concatenate([self.flag(df.iloc[start:start + chunksize])
+                               for start in range(0, len(df), chunksize)] or [np.zeros(0, np.uint8)])
@@ -0,0 +1,179 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src.dataset import INDEX_FILE, DatasetStore, source_files
+from src.eda import SolarDataEDA
+from src.instrumentation import enable_from_env, stage
+from src.report import FORMATS, render_comparison_report, render_eda_report
+from src.solar_geometry import SITES
+from src.validation import ValidationReport
+
+STAGES = ('load', 'validate', 'clean', 'export', 'report')
+EXPORT_FORMATS = ('csv', 'dataset')
+
+
+class CountryPaths:
+    """Absolute input and output paths of one country under the pipeline's output directory"""
+
+    def __init__(self, name, source, out_dir, fmt='csv'):
+        self.name = name
+        self.source = os.path.abspath(source)
+        self.validation = os.path.join(out_dir, 'validation', f"{name}.validation.json")
+        if fmt == 'dataset':
+            self.export_dir = os.path.join(out_dir, 'dataset')
+            self.cleaned = DatasetStore(self.export_dir).country_dir(name)
+            self.cleaned_marker = os.path.join(self.cleaned, INDEX_FILE)
+        else:
+            self.export_dir = os.path.join(out_dir, 'data')
+            self.cleaned = os.path.join(self.export_dir, f"{name}_clean.csv")
+            self.cleaned_marker = self.cleaned
+        self.report_dir = os.path.join(out_dir, 'reports', name)
+        self.report = os.path.join(self.report_dir, 'index.html')
+
+    def inputs(self):
+        return source_files(self.source, cached=False)
+
+
+def up_to_date(outputs, inputs):
+    """True when every output exists and is newer than every input"""
+    if not all(os.path.exists(path) for path in outputs):
+        return False
+    newest_input = max((os.path.getmtime(path) for path in inputs), default=0)
+    return min(os.path.getmtime(path) for path in outputs) >= newest_input
+
+
+def site_for(name):
+    """The solar_geometry site of a country name, if known"""
+    key = name.lower().replace(' ', '').replace('_', '')
+    return key if key in SITES else None
+
+
+def run_country(name, source, out_dir, fmt='csv', force=False, regularize=False, formats=('png',)):
+    """load → validate → clean → export → report for one country; returns its timings
+
+    The load, validate, clean and export stages are skipped together when
+    the export is newer than the source and its validation report, and the
+    report stage when it is newer than the export. A country whose report
+    cannot be rendered is marked 'no-report' and left out of the comparison.
+    """
+    paths = CountryPaths(name, source, out_dir, fmt)
+    timings = {stage_name: None for stage_name in STAGES}
+    result = {'country': name, 'status': 'ok', 'timings': timings, 'cleaned': paths.cleaned, 'errors': []}
+
+    def timed(stage_name, func, *args, **kwargs):
+        with stage(f'pipeline.{stage_name}', country=name) as record:
+            value = func(*args, **kwargs)
+        timings[stage_name] = record['seconds']
+        return value
+
+    eda = None
+    if force or not up_to_date([paths.cleaned_marker, paths.validation], paths.inputs()):
+        eda = SolarDataEDA(paths.source, location=site_for(name))
+
+        def load():
+            # Regularized before validation, so the report describes the frame that gets cleaned
+            df = eda.load_data(validate=False)
+            if df is not None and regularize:
+                eda.regularize()
+            return df
+
+        if timed('load', load) is None:
+            result.update(status='missing', errors=[f"File not found: {paths.source}"])
+            return result
+        os.makedirs(os.path.dirname(paths.validation), exist_ok=True)
+        report = timed('validate', eda.validate, report_path=paths.validation)
+        if not report.ok:
+            result.update(status='invalid', errors=report.errors)
+            return result
+
+        timed('clean', eda.clean_data)
+        timed('export', eda.export_cleaned_data, name, fmt, paths.export_dir)
+    else:
+        report = ValidationReport.load(paths.validation)
+        if not report.ok:
+            result.update(status='invalid', errors=report.errors)
+            return result
+
+    if force or eda is not None or not up_to_date([paths.report], [paths.cleaned_marker]):
+        # Workers already run one country each, so figures render in-process;
+        # a stale report alone re-reads the export as is, without cleaning it again
+        rendered = timed('report', render_eda_report, paths.cleaned, paths.report_dir, formats, 1,
+                         title=name, eda=eda, location=site_for(name), clean=False)
+        if not rendered:
+            result.update(status='no-report',
+                          errors=[f"Could not load a valid cleaned export from {paths.cleaned}"])
+    return result
+
+
+def run_pipeline(country_files, out_dir, fmt='csv', workers=None, force=False, regularize=False,
+                 formats=('png',), compare=True):
+    """Run every country in parallel, then the cross-country comparison; returns all results"""
+    out_dir = os.path.abspath(out_dir)
+    start = time.perf_counter()
+    workers = workers or min(len(country_files), os.cpu_count() or 1)
+    args = [(name, source, out_dir, fmt, force, regularize, tuple(formats))
+            for name, source in country_files.items()]
+
+    if workers <= 1:
+        results = [run_country(*item) for item in args]
+    else:
+        # Spawned workers do not inherit the metrics switch, so each applies the environment's
+        with ProcessPoolExecutor(max_workers=workers, initializer=enable_from_env) as pool:
+            futures = [pool.submit(run_country, *item) for item in args]
+            results = [future.result() for future in as_completed(futures)]
+    results.sort(key=lambda result: list(country_files).index(result['country']))
+
+    comparison = {'country': 'comparison', 'status': 'skipped', 'timings': {'report': None}, 'errors': []}
+    cleaned = {result['country']: result['cleaned'] for result in results if result['status'] == 'ok'}
+    if compare and len(cleaned) > 1:
+        markers = [CountryPaths(name, country_files[name], out_dir, fmt).cleaned_marker for name in cleaned]
+        report_dir = os.path.join(out_dir, 'reports', 'comparison')
+        comparison['status'] = 'ok'
+        if force or not up_to_date([os.path.join(report_dir, 'index.html')], markers):
+            with stage('pipeline.compare', countries=len(cleaned)) as record:
+                render_comparison_report(cleaned, report_dir, formats, os.cpu_count())
+            comparison['timings']['report'] = record['seconds']
+    results.append(comparison)
+    print_summary(results, time.perf_counter() - start)
+    return results
+
+
+def print_summary(results, total_seconds):
+    """Table of stage timings per country ('-' = skipped as up to date)"""
+    header = f"{'country':<14}" + ''.join(f"{name:>10}" for name in STAGES) + f"{'status':>10}"
+    print("\n⏱️ Pipeline timings (s)")
+    print(header)
+    for result in results:
+        cells = ''.join(f"{result['timings'][name]:>10.2f}" if result['timings'].get(name) is not None
+                        else f"{'-':>10}" for name in STAGES)
+        print(f"{result['country']:<14}{cells}{result['status']:>10}")
+        for error in result['errors']:
+            print(f"   ❌ {error}")
+    print(f"Total wall time: {total_seconds:.2f} s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Validate, clean, export and report station files, one process per country")
+    parser.add_argument('sources', nargs='+', help="NAME=PATH pairs (station CSV or dataset store directory)")
+    parser.add_argument('--out', required=True, help="output directory")
+    parser.add_argument('--format', default='csv', choices=EXPORT_FORMATS, help="export format")
+    parser.add_argument('--workers', type=int, default=None, help="country processes (1 = in-process)")
+    parser.add_argument('--force', action='store_true', help="rerun stages even when outputs are up to date")
+    parser.add_argument('--regularize', action='store_true',
+                        help="align to a 1-min grid and fill short gaps before cleaning")
+    parser.add_argument('--formats', nargs='+', default=['png'], choices=FORMATS, help="figure formats")
+    parser.add_argument('--no-compare', action='store_true', help="skip the cross-country report")
+    args = parser.parse_args(argv)
+
+    enable_from_env()
+    country_files = dict(source.split('=', 1) for source in args.sources)
+    results = run_pipeline(country_files, args.out, args.format, args.workers, args.force, args.regularize,
+                           args.formats, not args.no_compare)
+    return 0 if all(result['status'] in ('ok', 'skipped') for result in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
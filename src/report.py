@@ -0,0 +1,170 @@
+import argparse
+import html
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+from src.comparison import CountryComparator
+from src.eda import SolarDataEDA
+from src.instrumentation import enable_from_env
+
+EDA_ANALYSES = [
+    'time_series_analysis', 'daily_solar_patterns', 'correlation_analysis',
+    'distribution_analysis', 'outlier_analysis', 'cleaning_impact_analysis', 'soiling_analysis',
+    'generate_bubble_chart', 'generate_histograms', 'generate_correlation_heatmap',
+    'generate_scatter_plots', 'generate_wind_analysis',
+]
+COMPARISON_ANALYSES = [
+    'generate_boxplots', 'plot_ranking', 'generate_bubble_chart', 'generate_histograms',
+    'generate_correlation_heatmaps', 'generate_scatter_plots', 'generate_wind_analysis',
+]
+FORMATS = ('png', 'svg')
+
+# Analyzer shared by every figure rendered in a worker process
+_analyzer = None
+
+
+def render_analysis(analyzer, analysis, output_dir, formats=('png',)):
+    """Run one analysis method headless and save every figure it opens"""
+    plt.switch_backend('Agg')
+    before = set(plt.get_fignums())
+    start = time.perf_counter()
+    with warnings.catch_warnings():
+        # plt.show() is a no-op on Agg
+        warnings.filterwarnings('ignore', message='.*non-interactive.*')
+        getattr(analyzer, analysis)()
+
+    figures = [plt.figure(num) for num in plt.get_fignums() if num not in before]
+    figures = [fig for fig in figures if fig.axes]
+    files = []
+    for i, fig in enumerate(figures):
+        stem = analysis if len(figures) == 1 else f"{analysis}_{i + 1}"
+        for fmt in formats:
+            path = os.path.join(output_dir, f"{stem}.{fmt}")
+            fig.savefig(path, format=fmt, bbox_inches='tight')
+            files.append(path)
+    plt.close('all')
+    return {'analysis': analysis, 'files': files, 'seconds': time.perf_counter() - start}
+
+
+def _init_eda_worker(filepath, df, location=None, features=None):
+    global _analyzer
+    _analyzer = SolarDataEDA(filepath, location=location).set_frame(df, features)
+
+
+def _init_comparison_worker(combined_df, results=None):
+    global _analyzer
+    _analyzer = CountryComparator().set_combined(combined_df, results)
+
+
+def _render_in_worker(analysis, output_dir, formats):
+    return render_analysis(_analyzer, analysis, output_dir, formats)
+
+
+def _render_all(analyzer, initializer, initargs, analyses, output_dir, formats, workers):
+    """Render analyses in-process (workers=1) or spread over worker processes
+
+    Each worker receives the prepared data once through its initializer and
+    reuses it for every figure it renders; ``initargs`` is a callable so the
+    shared derived data is only computed when there are workers to send it to.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or min(len(analyses), os.cpu_count() or 1)
+    if workers <= 1:
+        return [render_analysis(analyzer, analysis, output_dir, formats) for analysis in analyses]
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs()) as pool:
+        futures = [pool.submit(_render_in_worker, analysis, output_dir, formats) for analysis in analyses]
+        return [future.result() for future in futures]
+
+
+def render_eda_report(filepath, output_dir, formats=('png',), workers=None, analyses=EDA_ANALYSES,
+                      title=None, eda=None, location=None, clean=True):
+    """Load and clean one station file once, then render all its analyses to ``output_dir``
+
+    An already loaded and cleaned ``eda`` is rendered as is. ``location``
+    is the station site for the solar-geometry figures; ``clean=False``
+    renders an exported cleaned file without cleaning it a second time.
+    Returns ``[]`` when the file cannot be loaded or fails validation.
+    """
+    start = time.perf_counter()
+    if eda is None:
+        eda = SolarDataEDA(filepath, location=location)
+        if eda.load_data() is None or (eda.validation is not None and not eda.validation.ok):
+            return []
+        if clean and eda.clean_data() is None:
+            return []
+    # Statistics, rollups and solar features are computed here once, not in every worker
+    results = _render_all(eda, _init_eda_worker, lambda: (filepath, eda.df, eda.location, eda.precompute()),
+                          analyses, output_dir, formats, workers)
+    write_index(output_dir, results, title or os.path.basename(filepath), time.perf_counter() - start)
+    return results
+
+
+def render_comparison_report(country_files, output_dir, formats=('png',), workers=None,
+                             analyses=COMPARISON_ANALYSES, title='Country comparison'):
+    """Combine the country files once, then render the cross-country analyses"""
+    start = time.perf_counter()
+    comparator = CountryComparator()
+    comparator.load_and_combine(country_files)
+    results = _render_all(comparator, _init_comparison_worker,
+                          lambda: (comparator.combined_df, comparator.precompute()), analyses,
+                          output_dir, formats, workers)
+    write_index(output_dir, results, title, time.perf_counter() - start)
+    return results
+
+
+def write_index(output_dir, results, title, total_seconds):
+    """Write an index.html linking every rendered figure"""
+    sections = []
+    for result in results:
+        images = [path for path in result['files'] if path.endswith(('.png', '.svg'))]
+        # One image per figure is enough for the page; prefer SVG
+        shown = {}
+        for path in images:
+            stem = os.path.splitext(os.path.basename(path))[0]
+            if stem not in shown or path.endswith('.svg'):
+                shown[stem] = os.path.basename(path)
+        tags = ''.join(f'<img src="{html.escape(name)}" alt="{html.escape(stem)}">'
+                       for stem, name in shown.items())
+        sections.append(f"<h2>{html.escape(result['analysis'])}</h2>"
+                        f"<p>{result['seconds']:.2f} s</p>{tags or '<p>No figure</p>'}")
+
+    page = (f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title>"
+            "<style>img{max-width:100%;display:block;margin-bottom:1em}</style></head><body>"
+            f"<h1>{html.escape(title)}</h1><p>Rendered in {total_seconds:.2f} s</p>"
+            f"{''.join(sections)}</body></html>")
+    path = os.path.join(output_dir, 'index.html')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(page)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render EDA reports without a display")
+    parser.add_argument('sources', nargs='+',
+                        help="station CSV for an EDA report, or NAME=PATH pairs with --compare")
+    parser.add_argument('--out', required=True, help="output directory")
+    parser.add_argument('--compare', action='store_true', help="render the cross-country report")
+    parser.add_argument('--formats', nargs='+', default=['png'], choices=FORMATS)
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (1 = in-process)")
+    args = parser.parse_args(argv)
+
+    enable_from_env()
+    if args.compare:
+        country_files = dict(source.split('=', 1) for source in args.sources)
+        results = render_comparison_report(country_files, args.out, args.formats, args.workers)
+    else:
+        results = []
+        for source in args.sources:
+            name = os.path.splitext(os.path.basename(source))[0]
+            results += render_eda_report(source, os.path.join(args.out, name), args.formats, args.workers)
+    print(f"✅ Rendered {sum(len(result['files']) for result in results)} files to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
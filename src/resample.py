@@ -0,0 +1,195 @@
+import numpy as np
+import pandas as pd
+
+from src.solar_geometry import MIN_CLEAR_SKY_GHI, clear_sky, resolve_location
+
+# Irradiance readings and the clear-sky component their diurnal shape follows
+IRRADIANCE_REFERENCE = {'GHI': 'ghi_clear', 'DNI': 'dni_clear', 'DHI': 'dhi_clear',
+                        'ModA': 'ghi_clear', 'ModB': 'ghi_clear'}
+FLAG_COLUMNS = ('Cleaning',)
+# Row markers added by ``regularize``, not readings
+MARKER_COLUMNS = ('Filled', 'Inserted')
+ROLLUP_LEVELS = ('15min', '1h', '1D')
+
+
+def _short_runs(missing, limit):
+    """True inside runs of missing values of at most ``limit`` rows with data on both sides"""
+    n = len(missing)
+    edges = np.diff(np.concatenate([[0], missing.astype(np.int8), [0]]))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    keep = (ends - starts <= limit) & (starts > 0) & (ends < n)
+    delta = np.zeros(n + 1, dtype=np.int64)
+    delta[starts[keep]] += 1  # Runs never share a start or an end, so no index repeats
+    delta[ends[keep]] -= 1
+    return np.cumsum(delta[:n]) > 0
+
+
+def _interpolate(values, fill):
+    """``values`` with the ``fill`` positions linearly interpolated between valid rows"""
+    valid = ~np.isnan(values)
+    out = values.copy()
+    positions = np.arange(len(values))
+    out[fill] = np.interp(positions[fill], positions[valid], values[valid])
+    return out
+
+
+def _merge_duplicates(df):
+    """One row per timestamp: readings averaged, flags maxed, text kept from the first row"""
+    agg = {}
+    for col in df.columns:
+        if col in FLAG_COLUMNS:
+            agg[col] = 'max'
+        elif pd.api.types.is_numeric_dtype(df[col].dtype):
+            agg[col] = 'mean'
+        else:
+            agg[col] = 'first'
+    return df.groupby(level=0, sort=True).agg(agg)
+
+
+def regularize(df, freq='1min', max_gap='15min', location=None):
+    """Align a Timestamp-indexed frame to a fixed ``freq`` grid and fill short gaps
+
+    Timestamps are floored onto the grid and duplicates merged (readings
+    averaged); missing grid rows are inserted. Runs of missing readings up to
+    ``max_gap`` long are interpolated in time. With a ``location``,
+    irradiance columns interpolate the ratio to the matching clear-sky
+    component instead, so a gap around noon follows the sun rather than a
+    straight line (rows where the clear-sky value is too small for a stable
+    ratio fall back to linear interpolation). Flags of inserted rows are 0;
+    longer gaps stay NaN. A ``Filled`` uint8 column marks rows with
+    interpolated values and an ``Inserted`` one the rows added to the grid.
+
+    Returns ``(regular_df, report)``; the report holds the counts and a
+    ``gaps`` frame of every run of inserted rows.
+    """
+    step = pd.Timedelta(freq).value
+    limit = max(int(pd.Timedelta(max_gap).value // step), 0)
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+    keys = df.index.as_unit('ns').asi8
+    realigned = int(np.count_nonzero(keys % step))
+    aligned = df.set_axis(pd.DatetimeIndex(keys - keys % step, name=df.index.name).as_unit(df.index.unit))
+    duplicates = int(aligned.index.duplicated().sum())
+    if duplicates:
+        aligned = _merge_duplicates(aligned)
+
+    report = {'freq': freq, 'rows_in': len(df), 'realigned': realigned, 'duplicates': duplicates,
+              'inserted_rows': 0, 'gaps': pd.DataFrame(columns=['start', 'end', 'rows', 'filled']),
+              'filled_values': {}}
+    if len(aligned) == 0:
+        return aligned, report
+
+    grid = pd.date_range(aligned.index[0], aligned.index[-1], freq=freq, name=df.index.name)
+    present = np.zeros(len(grid), dtype=bool)
+    present[(aligned.index.as_unit('ns').asi8 - grid[0].value) // step] = True
+    regular = aligned.reindex(grid)
+    inserted = ~present
+    for col in FLAG_COLUMNS:
+        if col in regular.columns:
+            regular[col] = regular[col].fillna(0).astype(aligned[col].dtype)
+
+    # Runs of inserted rows, for the gap report
+    edges = np.diff(np.concatenate([[0], inserted.astype(np.int8), [0]]))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    report['inserted_rows'] = int(inserted.sum())
+    report['gaps'] = pd.DataFrame({'start': grid[starts], 'end': grid[ends - 1],
+                                   'rows': ends - starts, 'filled': ends - starts <= limit})
+
+    reference = None
+    if location is not None and any(col in regular.columns for col in IRRADIANCE_REFERENCE):
+        reference = clear_sky(grid, *resolve_location(location))
+
+    filled_rows = np.zeros(len(grid), dtype=bool)
+    for col in regular.columns:
+        if col in FLAG_COLUMNS or not pd.api.types.is_numeric_dtype(regular[col].dtype):
+            continue
+        values = regular[col].to_numpy(dtype=np.float64)
+        fill = _short_runs(np.isnan(values), limit)
+        if not fill.any():
+            continue
+        linear = _interpolate(values, fill)
+        if reference is not None and col in IRRADIANCE_REFERENCE:
+            clear = reference[IRRADIANCE_REFERENCE[col]].to_numpy()
+            bright = clear >= MIN_CLEAR_SKY_GHI
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ratio = np.where(bright, values / clear, np.nan)
+            known = ~np.isnan(ratio)
+            if known.any():
+                ratio_fill = fill & bright
+                ratio[ratio_fill] = np.interp(np.flatnonzero(ratio_fill), np.flatnonzero(known), ratio[known])
+                linear = np.where(ratio_fill, ratio * clear, linear)
+        regular[col] = linear.astype(regular[col].dtype, copy=False)
+        filled_rows |= fill
+        report['filled_values'][col] = int(fill.sum())
+    regular['Filled'] = filled_rows.astype(np.uint8)
+    regular['Inserted'] = inserted.astype(np.uint8)
+    return regular, report
+
+
+def measured_rows(df):
+    """True for rows read from the source, False for rows ``regularize`` inserted"""
+    if 'Inserted' not in df.columns:
+        return np.ones(len(df), dtype=bool)
+    return df['Inserted'].to_numpy() == 0
+
+
+class Rollup:
+    """Per-period sums and counts of numeric columns at one resolution
+
+    Means are ``sums / counts``, so a coarser rollup built from a finer one
+    gives exactly the means of the underlying rows, not means of means.
+    """
+
+    def __init__(self, sums, counts):
+        self.sums = sums
+        self.counts = counts
+
+    @classmethod
+    def from_frame(cls, df, freq, columns=None):
+        """Rollup of a Timestamp-indexed frame's numeric ``columns`` to ``freq``"""
+        if columns is None:
+            columns = [col for col in df.select_dtypes(include=[np.number]).columns
+                       if col not in FLAG_COLUMNS and col not in MARKER_COLUMNS]
+        values = df[list(columns)].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values)
+        return cls._reduce(df.index, freq, np.where(valid, values, 0.0), valid.astype(np.int64), columns)
+
+    def coarsen(self, freq):
+        """The same sums and counts at a coarser ``freq`` (a multiple of this one)"""
+        return self._reduce(self.sums.index, freq, self.sums.to_numpy(), self.counts.to_numpy(),
+                            list(self.sums.columns))
+
+    @classmethod
+    def _reduce(cls, index, freq, sums, counts, columns):
+        periods = index.floor(freq)
+        if len(periods) and not periods.is_monotonic_increasing:
+            raise ValueError("Rollups need a time-sorted index")
+        keys = periods.as_unit('ns').asi8
+        starts = np.flatnonzero(np.concatenate([[True], keys[1:] != keys[:-1]])) if len(keys) else []
+        labels = periods[starts]
+        if len(labels):
+            sums = np.add.reduceat(sums, starts, axis=0)
+            counts = np.add.reduceat(counts, starts, axis=0)
+        return cls(pd.DataFrame(sums, index=labels, columns=columns),
+                   pd.DataFrame(counts, index=labels, columns=columns))
+
+    def mean(self):
+        return self.sums / self.counts.where(self.counts > 0)
+
+    def mean_by(self, keys):
+        """Means over the periods grouped by ``keys`` (e.g. the hour of each period)"""
+        return self.sums.groupby(keys).sum() / self.counts.groupby(keys).sum().replace(0, np.nan)
+
+
+def rollups(df, levels=ROLLUP_LEVELS, columns=None):
+    """Rollups of ``df`` at each of ``levels`` (finest first), each built from the previous one
+
+    Only the first level touches the rows; 15-min → hourly → daily then
+    reduce the much smaller tables before them.
+    """
+    result = {}
+    previous = None
+    for level in levels:
+        previous = Rollup.from_frame(df, level, columns) if previous is None else previous.coarsen(level)
+        result[level] = previous
+    return result
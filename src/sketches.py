@@ -0,0 +1,84 @@
+import numpy as np
+
+
+class QuantileSketch:
+    """Mergeable t-digest style sketch for approximate quantiles
+
+    Values are kept as weighted centroids whose size is bounded by the arcsine
+    scale function, so the tails stay sharp while the state holds at most
+    about ``compression / 2`` centroids regardless of how many values were seen.
+    """
+
+    def __init__(self, compression=1000):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        """Add a batch of values, ignoring NaNs"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.min = min(self.min, values.min())
+            self.max = max(self.max, values.max())
+            self._absorb(values, np.ones(len(values)))
+        return self
+
+    def merge(self, other):
+        """Fold another sketch into this one"""
+        if other.count:
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._absorb(other.means, other.weights)
+        return self
+
+    def _absorb(self, means, weights):
+        means = np.concatenate([self.means, means])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+
+        total = weights.sum()
+        mid_quantiles = (np.cumsum(weights) - weights / 2) / total
+        scale = self.compression / (2 * np.pi)
+        k = scale * np.arcsin(2 * mid_quantiles - 1)
+        buckets = np.floor(k - k[0]).astype(np.int64)
+
+        merged_weights = np.bincount(buckets, weights=weights)
+        keep = merged_weights > 0
+        self.means = np.bincount(buckets, weights=means * weights)[keep] / merged_weights[keep]
+        self.weights = merged_weights[keep]
+        self.count = total
+
+    def quantile(self, q):
+        """Approximate value at quantile ``q`` (scalar or array in [0, 1])"""
+        if not self.count:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        positions = np.cumsum(self.weights) - self.weights / 2
+        xp = np.concatenate([[0], positions, [self.count]])
+        fp = np.concatenate([[self.min], self.means, [self.max]])
+        return np.interp(np.asarray(q, dtype=np.float64) * self.count, xp, fp)
+
+    def median(self):
+        """Approximate median"""
+        return float(self.quantile(0.5))
+
+    def to_dict(self):
+        """JSON-serialisable state"""
+        return {'compression': self.compression, 'count': float(self.count),
+                'min': float(self.min), 'max': float(self.max),
+                'means': self.means.tolist(), 'weights': self.weights.tolist()}
+
+    @classmethod
+    def from_dict(cls, state):
+        """Rebuild a sketch saved with ``to_dict``"""
+        sketch = cls(state['compression'])
+        sketch.count = state['count']
+        sketch.min = state['min']
+        sketch.max = state['max']
+        sketch.means = np.asarray(state['means'], dtype=np.float64)
+        sketch.weights = np.asarray(state['weights'], dtype=np.float64)
+        return sketch
@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+
+MODULE_COLUMNS = ('ModA', 'ModB')
+# Module/GHI ratios are noisy with the sun low, so only bright rows are used
+MIN_IRRADIANCE = 200  # W/m²
+NANOSECONDS_PER_DAY = 86_400e9
+
+
+def _time_values(df):
+    """int64 nanoseconds of the frame's times (DatetimeIndex or Timestamp column)"""
+    if isinstance(df.index, pd.DatetimeIndex):
+        times = df.index
+    else:
+        times = pd.DatetimeIndex(pd.to_datetime(df['Timestamp']))
+    if not times.is_monotonic_increasing:
+        raise ValueError("Soiling analysis needs rows sorted by Timestamp")
+    return times.as_unit('ns').asi8
+
+
+def _prefix(values):
+    """Prefix sums with a leading zero, so sum(values[a:b]) == p[b] - p[a]"""
+    out = np.zeros(len(values) + 1)
+    np.cumsum(values, out=out[1:])
+    return out
+
+
+def cleaning_events(df, flag='Cleaning', merge_gap='1h'):
+    """Row positions (first, last) of each cleaning event
+
+    Flagged rows closer than ``merge_gap`` to the previous flagged row belong
+    to the same event, so a cleaning logged over several minutes counts once.
+    """
+    if flag not in df.columns:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    flagged = np.flatnonzero(df[flag].fillna(0).to_numpy() > 0)
+    if len(flagged) == 0:
+        return flagged, flagged
+    times = _time_values(df)[flagged]
+    breaks = np.flatnonzero(np.diff(times) > pd.Timedelta(merge_gap).value) + 1
+    firsts = np.concatenate([[0], breaks])
+    lasts = np.concatenate([breaks - 1, [len(flagged) - 1]])
+    return flagged[firsts], flagged[lasts]
+
+
+def normalized_ratio(df, module, reference='GHI', min_irradiance=MIN_IRRADIANCE):
+    """Module reading over reference irradiance, NaN where the reference is too low"""
+    values = df[module].to_numpy(dtype=np.float64)
+    ref = df[reference].to_numpy(dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(ref >= min_irradiance, values / ref, np.nan)
+
+
+def _window_means(ratio, times, lo_times, hi_times):
+    """Mean and count of the valid ratios with lo <= time < hi, for every window at once"""
+    valid = ~np.isnan(ratio)
+    sums, counts = _prefix(np.where(valid, ratio, 0)), _prefix(valid)
+    lo = np.searchsorted(times, lo_times, side='left')
+    hi = np.searchsorted(times, hi_times, side='left')
+    n = counts[hi] - counts[lo]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (sums[hi] - sums[lo]) / n, n.astype(np.int64)
+
+
+def event_windows(df, modules=MODULE_COLUMNS, window='1D', gap='0min', reference='GHI',
+                  min_irradiance=MIN_IRRADIANCE, merge_gap='1h', min_samples=10):
+    """Normalised module ratios before and after every cleaning event
+
+    The ``window`` before an event ends at its first flagged row; the one
+    after starts ``gap`` past its last flagged row. One row per event with
+    the mean ratio and sample count of each window and the relative
+    recovery (after / before - 1); windows with fewer than ``min_samples``
+    bright rows give NaN. All events are computed together from prefix sums.
+    """
+    firsts, lasts = cleaning_events(df, merge_gap=merge_gap)
+    times = _time_values(df)
+    event_start, event_end = times[firsts], times[lasts]
+    window_ns, gap_ns = pd.Timedelta(window).value, pd.Timedelta(gap).value
+
+    result = pd.DataFrame({'start': pd.to_datetime(event_start), 'end': pd.to_datetime(event_end)})
+    for module in modules:
+        if module not in df.columns or reference not in df.columns:
+            continue
+        ratio = normalized_ratio(df, module, reference, min_irradiance)
+        before, n_before = _window_means(ratio, times, event_start - window_ns, event_start)
+        # The after window starts strictly after the last flagged row
+        after, n_after = _window_means(ratio, times, event_end + 1 + gap_ns, event_end + 1 + gap_ns + window_ns)
+        before[n_before < min_samples] = np.nan
+        after[n_after < min_samples] = np.nan
+        result[f'{module}_before'] = before
+        result[f'{module}_after'] = after
+        result[f'{module}_n_before'] = n_before
+        result[f'{module}_n_after'] = n_after
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result[f'{module}_recovery'] = after / before - 1
+    return result
+
+
+def soiling_rates(df, modules=MODULE_COLUMNS, reference='GHI', min_irradiance=MIN_IRRADIANCE,
+                  merge_gap='1h', min_days=2, min_samples=100):
+    """Linear trend of the normalised ratio in every interval between cleanings
+
+    Each interval gets a least-squares slope from prefix sums of t, r, t·r
+    and t², expressed as % of the interval's starting ratio per day (negative
+    means the sensor is soiling). Intervals shorter than ``min_days`` or with
+    fewer than ``min_samples`` bright rows give NaN.
+    """
+    firsts, lasts = cleaning_events(df, merge_gap=merge_gap)
+    times = _time_values(df)
+    # Intervals run from the end of one event (or the data start) to the next event
+    lo = np.concatenate([[0], lasts + 1])
+    hi = np.concatenate([firsts, [len(df)]])
+    keep = hi > lo
+    lo, hi = lo[keep], hi[keep]
+    days = (times - times[0]) / NANOSECONDS_PER_DAY if len(times) else np.zeros(0)
+
+    result = pd.DataFrame({
+        'start': pd.to_datetime(times[lo]) if len(times) else pd.to_datetime([]),
+        'end': pd.to_datetime(times[hi - 1]) if len(times) else pd.to_datetime([]),
+    })
+    result['days'] = (days[hi - 1] - days[lo]) if len(times) else []
+    for module in modules:
+        if module not in df.columns or reference not in df.columns:
+            continue
+        ratio = normalized_ratio(df, module, reference, min_irradiance)
+        valid = ~np.isnan(ratio)
+        t = np.where(valid, days, 0)
+        r = np.where(valid, ratio, 0)
+        sums = [_prefix(values) for values in (valid, t, r, t * t, t * r)]
+        n, st, sr, stt, s_tr = (p[hi] - p[lo] for p in sums)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = (n * s_tr - st * sr) / (n * stt - st ** 2)
+            intercept = (sr - slope * st) / n
+            start_ratio = intercept + slope * days[lo]
+            rate = 100 * slope / start_ratio
+        rate[(n < min_samples) | (result['days'].to_numpy() < min_days)] = np.nan
+        result[f'{module}_rate_pct_per_day'] = rate
+        result[f'{module}_n'] = n.astype(np.int64)
+    return result
+
+
+def soiling_summary(df, modules=MODULE_COLUMNS, window='1D', reference='GHI',
+                    min_irradiance=MIN_IRRADIANCE, merge_gap='1h'):
+    """Per-module event count, median recovery and median soiling rate of one site"""
+    events = event_windows(df, modules, window, reference=reference, min_irradiance=min_irradiance,
+                           merge_gap=merge_gap)
+    rates = soiling_rates(df, modules, reference, min_irradiance, merge_gap)
+    summary = {}
+    for module in modules:
+        if f'{module}_recovery' not in events.columns:
+            continue
+        summary[module] = {
+            'events': len(events),
+            'events_measured': int(events[f'{module}_recovery'].notna().sum()),
+            'median_recovery_pct': float(events[f'{module}_recovery'].median() * 100),
+            'median_rate_pct_per_day': float(rates[f'{module}_rate_pct_per_day'].median()),
+            'intervals_measured': int(rates[f'{module}_rate_pct_per_day'].notna().sum()),
+        }
+    return pd.DataFrame(summary).T
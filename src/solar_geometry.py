@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+
+SOLAR_CONSTANT = 1361  # W/m²
+
+# Station coordinates (latitude, longitude in degrees, east positive) and the
+# UTC offset in hours of the local clock the station timestamps are recorded in
+SITES = {
+    'benin': (11.87, 3.38, 1),         # Malanville, West Africa Time
+    'sierraleone': (9.05, -11.74, 0),  # Bumbuna, GMT
+    'togo': (10.86, 0.21, 0),          # Dapaong, GMT
+}
+
+# Below this clear-sky GHI the clear-sky index is meaningless
+MIN_CLEAR_SKY_GHI = 10
+
+
+def resolve_location(location):
+    """(latitude, longitude, utc_offset) from a site name or a 2/3-tuple"""
+    if isinstance(location, str):
+        return SITES[location.lower().replace(' ', '')]
+    if len(location) == 2:
+        return location[0], location[1], 0
+    return tuple(location)
+
+
+def _julian_days(times, utc_offset=0):
+    """Julian day numbers of timestamps whose clock is ``utc_offset`` hours ahead of UTC"""
+    nanoseconds = pd.DatetimeIndex(times).as_unit('ns').asi8.astype(np.float64)
+    return nanoseconds / 86_400e9 - utc_offset / 24 + 2440587.5
+
+
+def _sun_terms(jd):
+    """Declination (radians), equation of time (minutes) and Earth-Sun distance (AU)"""
+    jc = (jd - 2451545) / 36525
+    mean_long = np.radians((280.46646 + jc * (36000.76983 + jc * 0.0003032)) % 360)
+    mean_anom = np.radians(357.52911 + jc * (35999.05029 - 0.0001537 * jc))
+    eccentricity = 0.016708634 - jc * (0.000042037 + 0.0000001267 * jc)
+    centre = np.radians(np.sin(mean_anom) * (1.914602 - jc * (0.004817 + 0.000014 * jc))
+                        + np.sin(2 * mean_anom) * (0.019993 - 0.000101 * jc)
+                        + np.sin(3 * mean_anom) * 0.000289)
+    omega = np.radians(125.04 - 1934.136 * jc)
+    apparent_long = mean_long + centre - np.radians(0.00569 + 0.00478 * np.sin(omega))
+    obliquity = np.radians(23 + (26 + (21.448 - jc * (46.815 + jc * (0.00059 - jc * 0.001813))) / 60) / 60
+                           + 0.00256 * np.cos(omega))
+    declination = np.arcsin(np.sin(obliquity) * np.sin(apparent_long))
+
+    y = np.tan(obliquity / 2) ** 2
+    equation_of_time = 4 * np.degrees(
+        y * np.sin(2 * mean_long) - 2 * eccentricity * np.sin(mean_anom)
+        + 4 * eccentricity * y * np.sin(mean_anom) * np.cos(2 * mean_long)
+        - 0.5 * y ** 2 * np.sin(4 * mean_long) - 1.25 * eccentricity ** 2 * np.sin(2 * mean_anom))
+    distance = 1.000001018 * (1 - eccentricity ** 2) / (1 + eccentricity * np.cos(mean_anom + centre))
+    return declination, equation_of_time, distance
+
+
+def solar_position(times, latitude, longitude, utc_offset=0):
+    """Solar zenith, azimuth and extraterrestrial irradiance (NOAA algorithm)
+
+    Fully vectorized over ``times``; no calendar fields are extracted. The
+    slowly varying terms (declination, equation of time, Earth-Sun distance)
+    are evaluated on an hourly grid and interpolated when that grid is much
+    smaller than ``times``, which changes them by far less than 0.01°.
+    Returns a DataFrame indexed by ``times`` with ``zenith`` and ``azimuth``
+    in degrees (azimuth clockwise from north) and ``extra_radiation`` in W/m².
+    """
+    jd = _julian_days(times, utc_offset)
+    if len(jd) == 0:
+        return pd.DataFrame({'zenith': [], 'azimuth': [], 'extra_radiation': []}, index=times)
+
+    start, stop = np.floor(jd.min() * 24), np.ceil(jd.max() * 24) + 1
+    if stop - start < len(jd) / 4:
+        grid = np.arange(start, stop) / 24
+        declination, equation_of_time, distance = (np.interp(jd, grid, term) for term in _sun_terms(grid))
+    else:
+        declination, equation_of_time, distance = _sun_terms(jd)
+
+    minutes_utc = ((jd - 0.5) % 1) * 1440
+    true_solar_time = (minutes_utc + equation_of_time + 4 * longitude) % 1440
+    hour_angle = np.radians(true_solar_time / 4 - 180)
+
+    lat = np.radians(latitude)
+    cos_hour_angle = np.cos(hour_angle)
+    cos_zenith = (np.sin(lat) * np.sin(declination)
+                  + np.cos(lat) * np.cos(declination) * cos_hour_angle)
+    zenith = np.degrees(np.arccos(np.clip(cos_zenith, -1, 1)))
+    azimuth = (np.degrees(np.arctan2(np.sin(hour_angle),
+                                     cos_hour_angle * np.sin(lat)
+                                     - np.tan(declination) * np.cos(lat))) + 180) % 360
+
+    return pd.DataFrame({
+        'zenith': zenith,
+        'azimuth': azimuth,
+        'extra_radiation': SOLAR_CONSTANT / distance ** 2,
+    }, index=times)
+
+
+def air_mass(zenith):
+    """Relative optical air mass (Kasten & Young 1989), NaN with the sun down"""
+    zenith = np.asarray(zenith, dtype=np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        am = 1 / (np.cos(np.radians(zenith)) + 0.50572 * (96.07995 - zenith) ** -1.6364)
+    return np.where(zenith < 90, am, np.nan)
+
+
+def clear_sky(times, latitude, longitude, utc_offset=0):
+    """Simple clear-sky irradiance: Meinel beam attenuation with a 14% diffuse share
+
+    Returns the solar position columns plus ``ghi_clear``, ``dni_clear`` and
+    ``dhi_clear`` (zero at night).
+    """
+    position = solar_position(times, latitude, longitude, utc_offset)
+    zenith = position['zenith'].to_numpy()
+    am = air_mass(zenith)
+    with np.errstate(invalid='ignore'):
+        dni = np.nan_to_num(position['extra_radiation'].to_numpy() * 0.7 ** (am ** 0.678))
+    dhi = 0.14 * dni
+    ghi = dni * np.maximum(np.cos(np.radians(zenith)), 0) + dhi
+    position['ghi_clear'] = ghi
+    position['dni_clear'] = dni
+    position['dhi_clear'] = dhi
+    return position
+
+
+def daytime_mask(zenith, max_zenith=90):
+    """True where the sun is above the horizon (or below ``max_zenith``)"""
+    return np.asarray(zenith) < max_zenith
+
+
+def clear_sky_index(ghi, ghi_clear, min_clear=MIN_CLEAR_SKY_GHI):
+    """Measured over clear-sky GHI, NaN where the clear-sky value is too small"""
+    ghi = np.asarray(ghi, dtype=np.float64)
+    ghi_clear = np.asarray(ghi_clear, dtype=np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(ghi_clear >= min_clear, ghi / ghi_clear, np.nan)
+
+
+def zenith_func(location):
+    """Callable mapping a DatetimeIndex to solar zenith for ``location``"""
+    latitude, longitude, utc_offset = resolve_location(location)
+    return lambda times: solar_position(times, latitude, longitude, utc_offset)['zenith'].to_numpy()
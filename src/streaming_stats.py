@@ -0,0 +1,218 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+from src.dataset import source_files
+from src.sketches import QuantileSketch
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # Only needed to stream Parquet partitions
+    pq = None
+
+# Physical range of each reading, used for fixed histogram bins when the data's
+# own range is unknown (streamed files); values outside go to under/overflow
+HISTOGRAM_RANGES = {
+    'GHI': (-50, 1450), 'DNI': (-50, 1450), 'DHI': (-50, 1450),
+    'ModA': (-50, 1450), 'ModB': (-50, 1450),
+    'Tamb': (-10, 50), 'TModA': (-10, 90), 'TModB': (-10, 90), 'RH': (0, 100),
+    'WS': (0, 30), 'WSgust': (0, 40), 'WSstdev': (0, 5), 'WD': (0, 360), 'WDstdev': (0, 100),
+    'BP': (950, 1050), 'Precipitation': (0, 5),
+}
+
+
+class StreamingStats:
+    """Mergeable correlation, histogram and quantile statistics of numeric columns
+
+    Per chunk it keeps pairwise-complete co-moment sums (so ``corr`` equals
+    ``DataFrame.corr()``, which also drops missing values pair by pair),
+    fixed-bin histogram counts and one ``QuantileSketch`` per column. Sums
+    are taken around a fixed shift per column (the first chunk's mean),
+    which keeps the variance of large-offset readings like BP precise. Two
+    instances built from different chunks, files or processes combine with
+    ``merge``; the figures then need only these small tables.
+    """
+
+    def __init__(self, columns, bins=30, ranges=None, compression=200):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.bins = bins
+        ranges = {**HISTOGRAM_RANGES, **(ranges or {})}
+        self.edges = {col: np.linspace(*ranges[col], bins + 1) for col in self.columns if col in ranges}
+        self.hist_counts = {col: np.zeros(bins, dtype=np.int64) for col in self.edges}
+        self.outside = {col: np.zeros(2, dtype=np.int64) for col in self.edges}  # below, above
+        self.sketches = {col: QuantileSketch(compression) for col in self.columns}
+        self.shift = None
+        # [i, j] entries sum over the rows where both column i and column j are present
+        self.n = np.zeros((k, k))
+        self.sums = np.zeros((k, k))     # Σ x_i
+        self.squares = np.zeros((k, k))  # Σ x_i²
+        self.products = np.zeros((k, k))  # Σ x_i x_j
+
+    def update(self, df):
+        """Add a chunk; columns missing from it count as missing values"""
+        values = np.column_stack([df[col].to_numpy(dtype=np.float64) if col in df.columns
+                                  else np.full(len(df), np.nan) for col in self.columns])
+        present = ~np.isnan(values)
+        if self.shift is None:
+            counts = present.sum(axis=0)
+            with np.errstate(invalid='ignore'):
+                self.shift = np.where(counts > 0, np.nansum(values, axis=0) / np.maximum(counts, 1), 0.0)
+        centred = np.where(present, values - self.shift, 0.0)
+        mask = present.astype(np.float64)
+        self.n += mask.T @ mask
+        self.sums += centred.T @ mask
+        self.squares += (centred ** 2).T @ mask
+        self.products += centred.T @ centred
+
+        for i, col in enumerate(self.columns):
+            column = values[present[:, i], i]
+            self.sketches[col].update(column)
+            if col in self.edges:
+                edges = self.edges[col]
+                self.hist_counts[col] += np.histogram(column, bins=edges)[0]
+                self.outside[col] += [(column < edges[0]).sum(), (column > edges[-1]).sum()]
+        return self
+
+    def merge(self, other):
+        """Fold statistics of other chunks with the same columns and bins into this one"""
+        if other.columns != self.columns:
+            raise ValueError("Only statistics of the same columns can be merged")
+        if other.shift is None:
+            return self
+        if self.shift is None:
+            self.shift = other.shift.copy()
+        n, sums, squares, products = other._shifted(self.shift)
+        self.n += n
+        self.sums += sums
+        self.squares += squares
+        self.products += products
+        for col in self.columns:
+            self.sketches[col].merge(other.sketches[col])
+        for col in self.edges:
+            if not np.array_equal(self.edges[col], other.edges.get(col)):
+                raise ValueError(f"Histogram bins of {col} differ")
+            self.hist_counts[col] += other.hist_counts[col]
+            self.outside[col] += other.outside[col]
+        return self
+
+    def _shifted(self, shift):
+        """Co-moment sums re-expressed around another shift"""
+        d = (shift - self.shift)[:, None]  # x' = x - d
+        n, sums = self.n, self.sums
+        new_sums = sums - d * n
+        squares = self.squares - 2 * d * sums + d ** 2 * n
+        products = self.products - d.T * sums - d * sums.T + d * d.T * n
+        return n, new_sums, squares, products
+
+    def count(self, col):
+        i = self.columns.index(col)
+        return int(self.n[i, i])
+
+    def present(self, columns=None):
+        """Columns (of ``columns``, default all) with at least one value"""
+        return [col for col in (columns or self.columns) if col in self.columns and self.count(col) > 0]
+
+    def mean(self, col):
+        i = self.columns.index(col)
+        return self.shift[i] + self.sums[i, i] / self.n[i, i] if self.n[i, i] else np.nan
+
+    def corr(self, columns=None):
+        """Pearson correlation matrix with pairwise-complete observations"""
+        columns = columns or self.columns
+        idx = [self.columns.index(col) for col in columns]
+        n = self.n[np.ix_(idx, idx)]
+        sums = self.sums[np.ix_(idx, idx)]
+        squares = self.squares[np.ix_(idx, idx)]
+        products = self.products[np.ix_(idx, idx)]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_i, mean_j = sums / n, sums.T / n
+            cov = products / n - mean_i * mean_j
+            var_i = squares / n - mean_i ** 2
+            var_j = squares.T / n - mean_j ** 2
+            r = cov / np.sqrt(var_i * var_j)
+        r[n < 2] = np.nan
+        return pd.DataFrame(np.clip(r, -1, 1), index=columns, columns=columns)
+
+    def histogram(self, col):
+        """(counts, edges) of ``col``'s fixed bins; see ``outside_note`` for values beyond them"""
+        return self.hist_counts[col], self.edges[col]
+
+    def outside_note(self, col):
+        """' (N below, M above range)' for values outside ``col``'s bins, '' when there are none"""
+        below, above = (int(count) for count in self.outside[col])
+        if not below and not above:
+            return ''
+        return f" ({below} below, {above} above range)"
+
+    def box_stats(self, col, label=None):
+        """Box-plot statistics in the format expected by ``Axes.bxp``
+
+        Quartiles come from the sketch; whiskers are the 1.5 IQR fences
+        clipped to the observed min/max, which approximates the most extreme
+        values inside the fences without keeping the rows.
+        """
+        sketch = self.sketches[col]
+        if not sketch.count:
+            return None
+        q1, med, q3 = sketch.quantile([0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        return {'label': label or col, 'med': med, 'q1': q1, 'q3': q3,
+                'whislo': max(sketch.min, q1 - 1.5 * iqr), 'whishi': min(sketch.max, q3 + 1.5 * iqr),
+                'fliers': []}
+
+
+def frame_stats(df, columns, chunksize=500_000, **kwargs):
+    """StreamingStats of an in-memory frame, folded chunk by chunk to bound temporaries"""
+    stats = StreamingStats(columns, **kwargs)
+    for start in range(0, len(df), chunksize):
+        stats.update(df.iloc[start:start + chunksize])
+    return stats
+
+
+def _iter_file(path, columns, chunksize):
+    if path.endswith('.parquet'):
+        if pq is None:
+            raise ImportError("Reading Parquet needs the 'pyarrow' package")
+        names = pq.read_schema(path).names
+        for batch in pq.ParquetFile(path).iter_batches(chunksize, columns=[c for c in columns if c in names]):
+            yield batch.to_pandas()
+    else:
+        header = pd.read_csv(path, nrows=0).columns
+        yield from pd.read_csv(path, usecols=[col for col in columns if col in header], chunksize=chunksize)
+
+
+def file_stats(path, columns, chunksize=500_000, **kwargs):
+    """StreamingStats of one CSV or Parquet file, read ``chunksize`` rows at a time"""
+    stats = StreamingStats(columns, **kwargs)
+    for chunk in _iter_file(path, columns, chunksize):
+        stats.update(chunk)
+    return stats
+
+
+def collect_stats(paths, columns, chunksize=500_000, workers=None, **kwargs):
+    """StreamingStats of CSVs and DatasetStore country directories, merged across processes
+
+    Store directories expand to their partition files and every file is
+    summarised in its own worker; results are merged as they arrive, with
+    at most 2 × workers files in flight.
+    """
+    files = [file for path in paths for file in source_files(path, cached=False)]
+    workers = min(workers or os.cpu_count() or 1, max(len(files), 1))
+    total = StreamingStats(columns, **kwargs)
+    if workers <= 1:
+        for file in files:
+            total.merge(file_stats(file, columns, chunksize, **kwargs))
+        return total
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending, queue = set(), list(files)
+        while queue or pending:
+            while queue and len(pending) < 2 * workers:
+                pending.add(pool.submit(file_stats, queue.pop(0), columns, chunksize, **kwargs))
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                total.merge(future.result())
+    return total
@@ -0,0 +1,253 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+# Canonical station schema: kind, physical range (inclusive) and whether the column must exist
+SCHEMA = {
+    'Timestamp': {'kind': 'datetime', 'required': True},
+    'GHI': {'kind': 'number', 'min': 0, 'max': 1500, 'required': True},
+    'DNI': {'kind': 'number', 'min': 0, 'max': 1500},
+    'DHI': {'kind': 'number', 'min': 0, 'max': 1500},
+    'ModA': {'kind': 'number', 'min': 0, 'max': 1500},
+    'ModB': {'kind': 'number', 'min': 0, 'max': 1500},
+    'Tamb': {'kind': 'number', 'min': -40, 'max': 60},
+    'RH': {'kind': 'number', 'min': 0, 'max': 100},
+    'WS': {'kind': 'number', 'min': 0, 'max': 60},
+    'WSgust': {'kind': 'number', 'min': 0, 'max': 80},
+    'WSstdev': {'kind': 'number', 'min': 0},
+    'WD': {'kind': 'number', 'min': 0, 'max': 360},
+    'WDstdev': {'kind': 'number', 'min': 0},
+    'BP': {'kind': 'number', 'min': 800, 'max': 1100},
+    'Cleaning': {'kind': 'flag'},
+    'Precipitation': {'kind': 'number', 'min': 0},
+    'TModA': {'kind': 'number', 'min': -40, 'max': 100},
+    'TModB': {'kind': 'number', 'min': -40, 'max': 100},
+    'Comments': {'kind': 'text'},
+}
+REQUIRED_COLUMNS = [col for col, spec in SCHEMA.items() if spec.get('required')]
+# Lower-case spelling of every canonical name, for matching headers loosely
+_CANONICAL = {name.lower(): name for name in SCHEMA}
+
+
+class ValidationError(ValueError):
+    """Raised for a dataset that fails structural validation"""
+
+
+def canonical_name(name):
+    """Schema spelling of a column name ('ghi', ' Mod_A ' -> 'GHI', 'ModA'); unknown names are stripped"""
+    stripped = str(name).strip()
+    key = stripped.lower().replace('_', '').replace(' ', '').replace('-', '')
+    return _CANONICAL.get(key, stripped)
+
+
+def canonicalize_columns(df):
+    """Rename ``df``'s columns (and index name) to their schema spelling, in place"""
+    df.columns = [canonical_name(col) for col in df.columns]
+    if df.index.name is not None:
+        df.index.name = canonical_name(df.index.name)
+    return df
+
+
+class SchemaValidator:
+    """Vectorised schema, range and timestamp checks accumulated over chunks
+
+    ``update`` checks one chunk in a single vectorised pass per column
+    (nulls, non-numeric values, range and min/max), and timestamps are
+    checked for parse failures, order, duplicates and gaps longer than
+    ``freq`` (carrying the last timestamp across chunk boundaries).
+    Duplicates are counted between consecutive rows while the stream is in
+    time order; once a row is out of order they are counted exactly over
+    every timestamp seen, which are kept as int64 keys (8 bytes per row).
+    ``required`` overrides the schema's required columns, e.g. for loads of
+    a column subset. ``report`` turns the counts into a
+    ``ValidationReport``: missing required columns, non-numeric readings and
+    unparseable timestamps are errors; range violations, nulls, out-of-order
+    or duplicate timestamps (which ``load_data`` sorts and ``regularize``
+    merges), gaps and unknown columns are warnings.
+    """
+
+    def __init__(self, schema=SCHEMA, freq='1min', required=None):
+        self.schema = schema
+        if required is None:
+            required = [col for col, spec in schema.items() if spec.get('required')]
+        self.required = list(required)
+        self.freq = pd.Timedelta(freq).value
+        self.columns = None
+        self.rows = 0
+        self.columns_stats = {}
+        self.timestamps = {'first': None, 'last': None, 'invalid': 0, 'out_of_order': 0,
+                           'duplicates': 0, 'gaps': 0, 'missing_rows': 0, 'largest_gap': None}
+        self._first_time = None
+        self._last_time = None
+        self._largest_gap = 0
+        self._keys = []
+
+    def update(self, chunk):
+        """Check one chunk; the Timestamp may be the index or a column"""
+        if self.columns is None:
+            self.columns = ([chunk.index.name] if chunk.index.name else []) + list(chunk.columns)
+        self.rows += len(chunk)
+        if 'Timestamp' in chunk.columns:
+            self._check_times(chunk['Timestamp'])
+        elif chunk.index.name == 'Timestamp':
+            self._check_times(chunk.index)
+
+        for col in chunk.columns:
+            spec = self.schema.get(col, {})
+            if spec.get('kind') in ('number', 'flag'):
+                self._check_numeric(col, chunk[col], spec)
+        return self
+
+    def _check_numeric(self, col, series, spec):
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            nulls = int(np.count_nonzero(np.isnan(values)))
+            invalid = 0
+        else:
+            # Text in a numeric column: count what does not parse as a number
+            values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64)
+            nulls = int(series.isna().sum())
+            invalid = int(np.count_nonzero(np.isnan(values))) - nulls
+        stats = self.columns_stats.setdefault(col, {'nulls': 0, 'invalid': 0, 'below': 0, 'above': 0,
+                                                    'min': np.inf, 'max': -np.inf})
+        stats['nulls'] += nulls
+        stats['invalid'] += invalid
+        if len(values) > nulls + invalid:
+            # fmin/fmax skip NaNs without the copy nanmin makes
+            stats['min'] = min(stats['min'], float(np.fmin.reduce(values)))
+            stats['max'] = max(stats['max'], float(np.fmax.reduce(values)))
+            if 'min' in spec:
+                stats['below'] += int(np.count_nonzero(values < spec['min']))
+            if 'max' in spec:
+                stats['above'] += int(np.count_nonzero(values > spec['max']))
+
+    def _check_times(self, values):
+        times = pd.to_datetime(pd.Series(values), errors='coerce').to_numpy()
+        valid = ~np.isnat(times)
+        self.timestamps['invalid'] += int((~valid).sum())
+        ns = times[valid].astype('datetime64[ns]').astype(np.int64)
+        if not len(ns):
+            return
+        self._keys.append(ns)
+        if self._last_time is not None:
+            ns = np.concatenate([[self._last_time], ns])
+        diffs = np.diff(ns)
+        gaps = diffs[diffs > self.freq]
+        t = self.timestamps
+        t['out_of_order'] += int((diffs < 0).sum())
+        t['duplicates'] += int((diffs == 0).sum())
+        t['gaps'] += len(gaps)
+        t['missing_rows'] += int((gaps // self.freq - (gaps % self.freq == 0)).sum())
+        if len(gaps):
+            self._largest_gap = max(self._largest_gap, int(gaps.max()))
+        if self._first_time is None:
+            self._first_time = int(ns[0])
+            t['first'] = str(pd.Timestamp(self._first_time))
+        self._last_time = int(ns[-1])
+        t['last'] = str(pd.Timestamp(self._last_time))
+
+    def report(self, source=None):
+        """Compact ``ValidationReport`` of everything checked so far"""
+        columns = self.columns or []
+        errors, warnings = [], []
+        missing = [col for col in self.required if col not in columns]
+        if missing:
+            errors.append(f"missing required columns: {', '.join(missing)}")
+        unknown = [col for col in columns if col not in self.schema]
+        if unknown:
+            warnings.append(f"columns outside the schema: {', '.join(map(str, unknown))}")
+
+        column_report = {}
+        for col, stats in self.columns_stats.items():
+            present = self.rows - stats['nulls'] - stats['invalid']
+            entry = {key: value for key, value in stats.items()
+                     if key in ('min', 'max') or value}
+            if present <= 0:
+                entry['min'] = entry['max'] = None
+            column_report[col] = entry
+            if stats['invalid']:
+                errors.append(f"{col}: {stats['invalid']} non-numeric values")
+            if stats['below'] or stats['above']:
+                spec = self.schema[col]
+                warnings.append(f"{col}: {stats['below'] + stats['above']} values outside "
+                                f"[{spec.get('min', '-inf')}, {spec.get('max', 'inf')}]")
+            if stats['nulls']:
+                warnings.append(f"{col}: {stats['nulls']} missing values")
+
+        t = dict(self.timestamps)
+        if t['out_of_order']:
+            # Consecutive diffs miss duplicates that are not adjacent in an unsorted stream
+            keys = np.concatenate(self._keys)
+            t['duplicates'] = int(len(keys) - len(np.unique(keys)))
+        if self._largest_gap:
+            t['largest_gap'] = str(pd.Timedelta(self._largest_gap))
+        if t['invalid']:
+            errors.append(f"Timestamp: {t['invalid']} unparseable values")
+        if t['out_of_order']:
+            warnings.append(f"Timestamp: {t['out_of_order']} rows out of order")
+        if t['duplicates']:
+            warnings.append(f"Timestamp: {t['duplicates']} duplicate timestamps")
+        if t['gaps']:
+            warnings.append(f"Timestamp: {t['gaps']} gaps ({t['missing_rows']} missing rows, "
+                            f"largest {t['largest_gap']})")
+        return ValidationReport(source, self.rows, columns, column_report, t, errors, warnings)
+
+
+class ValidationReport:
+    """Result of a validation run, small enough to store next to the data"""
+
+    def __init__(self, source, rows, columns, column_stats, timestamps, errors, warnings):
+        self.source = source
+        self.rows = rows
+        self.columns = list(columns)
+        self.column_stats = column_stats
+        self.timestamps = timestamps
+        self.errors = errors
+        self.warnings = warnings
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def summary(self):
+        status = "✅ valid" if self.ok else "❌ invalid"
+        return f"{status}: {self.rows} rows, {len(self.errors)} errors, {len(self.warnings)} warnings"
+
+    def raise_for_errors(self):
+        if self.errors:
+            raise ValidationError(f"{self.source or 'dataset'}: " + '; '.join(self.errors))
+        return self
+
+    def to_dict(self):
+        return {'source': self.source, 'ok': self.ok, 'rows': self.rows, 'columns': self.columns,
+                'errors': self.errors, 'warnings': self.warnings,
+                'timestamps': self.timestamps, 'column_stats': self.column_stats}
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=1)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            state = json.load(f)
+        return cls(state['source'], state['rows'], state['columns'], state['column_stats'],
+                   state['timestamps'], state['errors'], state['warnings'])
+
+
+def validate_frame(df, schema=SCHEMA, freq='1min', chunksize=500_000, source=None, required=None):
+    """ValidationReport of an in-memory frame, checked ``chunksize`` rows at a time"""
+    validator = SchemaValidator(schema, freq, required)
+    for start in range(0, max(len(df), 1), chunksize):
+        validator.update(df.iloc[start:start + chunksize])
+    return validator.report(source)
+
+
+def validate_csv(path, schema=SCHEMA, freq='1min', chunksize=500_000, required=None):
+    """ValidationReport of a CSV streamed in chunks, with headers mapped to canonical names"""
+    validator = SchemaValidator(schema, freq, required)
+    for chunk in pd.read_csv(path, chunksize=chunksize, low_memory=False):
+        validator.update(canonicalize_columns(chunk))
+    return validator.report(path)
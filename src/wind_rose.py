@@ -0,0 +1,126 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+SECTOR_NAMES_16 = ['N', 'NNE', 'NE', 'ENE', 'E', 'ESE', 'SE', 'SSE',
+                   'S', 'SSW', 'SW', 'WSW', 'W', 'WNW', 'NW', 'NNW']
+# m/s; the last bin is open-ended
+SPEED_EDGES = (0.0, 0.5, 2.0, 4.0, 6.0, 8.0, 10.0, np.inf)
+
+
+class WindRose:
+    """Mergeable direction × speed counts table
+
+    ``update`` bins aligned (WD, WS) pairs with one ``np.bincount`` and adds
+    them to a ``sectors × speed bins`` int64 table; rows where either value
+    is missing (or the speed is negative) are skipped together, so the two
+    columns never drift apart. Tables of chunks, files or countries with the
+    same bins add up with ``merge``, and plots are drawn from the table, so
+    the plotting cost does not depend on how many rows were binned.
+    Sector 0 is centred on north and directions run clockwise.
+    """
+
+    def __init__(self, sectors=16, speed_edges=SPEED_EDGES):
+        self.sectors = sectors
+        self.speed_edges = np.asarray(speed_edges, dtype=np.float64)
+        self.counts = np.zeros((sectors, len(self.speed_edges) - 1), dtype=np.int64)
+        self.skipped = 0
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    def update(self, directions, speeds):
+        """Add aligned arrays of directions (degrees) and speeds"""
+        directions = np.asarray(directions, dtype=np.float64).ravel()
+        speeds = np.asarray(speeds, dtype=np.float64).ravel()
+        if len(directions) != len(speeds):
+            raise ValueError("Wind directions and speeds must have the same length")
+        valid = np.isfinite(directions) & np.isfinite(speeds) & (speeds >= self.speed_edges[0])
+        self.skipped += int(len(valid) - valid.sum())
+        directions, speeds = directions[valid], speeds[valid]
+
+        width = 360.0 / self.sectors
+        sector = np.floor(((directions + width / 2) % 360.0) / width).astype(np.int64) % self.sectors
+        n_speeds = self.counts.shape[1]
+        speed_bin = np.minimum(np.searchsorted(self.speed_edges, speeds, side='right') - 1, n_speeds - 1)
+        self.counts += np.bincount(sector * n_speeds + speed_bin,
+                                   minlength=self.counts.size).reshape(self.counts.shape)
+        return self
+
+    def update_frame(self, df, direction='WD', speed='WS'):
+        """Add a frame's (direction, speed) columns; frames without them are ignored"""
+        if direction in df.columns and speed in df.columns:
+            self.update(df[direction].to_numpy(dtype=np.float64), df[speed].to_numpy(dtype=np.float64))
+        return self
+
+    @classmethod
+    def from_frame(cls, df, direction='WD', speed='WS', **kwargs):
+        return cls(**kwargs).update_frame(df, direction, speed)
+
+    @classmethod
+    def from_chunks(cls, chunks, direction='WD', speed='WS', **kwargs):
+        """Table of a stream of frames, e.g. ``SolarDataEDA.iter_chunks(columns=['WD', 'WS'])``"""
+        rose = cls(**kwargs)
+        for chunk in chunks:
+            rose.update_frame(chunk, direction, speed)
+        return rose
+
+    def merge(self, other):
+        """Fold another table with the same bins into this one"""
+        if other.sectors != self.sectors or not np.array_equal(other.speed_edges, self.speed_edges):
+            raise ValueError("Only wind roses with the same sectors and speed bins can be merged")
+        self.counts += other.counts
+        self.skipped += other.skipped
+        return self
+
+    def sector_labels(self):
+        if self.sectors == len(SECTOR_NAMES_16):
+            return list(SECTOR_NAMES_16)
+        return [f"{angle:g}°" for angle in np.arange(self.sectors) * 360.0 / self.sectors]
+
+    def speed_labels(self):
+        edges = self.speed_edges
+        return [f"{low:g}-{high:g}" if np.isfinite(high) else f">{low:g}"
+                for low, high in zip(edges[:-1], edges[1:])]
+
+    def frequencies(self):
+        """Share of all binned rows (%) in each sector and speed bin"""
+        return self.counts / max(self.total, 1) * 100
+
+    def to_frame(self, percent=False):
+        """Counts (or percentages) with sectors as rows and speed bins as columns"""
+        values = self.frequencies() if percent else self.counts
+        return pd.DataFrame(values, index=self.sector_labels(), columns=self.speed_labels())
+
+    def plot(self, ax, title=None, cmap='viridis'):
+        """Stacked polar bars of the frequencies on a polar ``ax``"""
+        width = 2 * np.pi / self.sectors
+        theta = np.arange(self.sectors) * width
+        colors = plt.get_cmap(cmap)(np.linspace(0.1, 0.95, self.counts.shape[1]))
+        frequencies = self.frequencies()
+        bottom = np.zeros(self.sectors)
+        for i, label in enumerate(self.speed_labels()):
+            values = frequencies[:, i]
+            ax.bar(theta, values, width=width, bottom=bottom, color=colors[i],
+                   edgecolor='white', linewidth=0.5, label=f"{label} m/s")
+            bottom += values
+        ax.set_theta_zero_location('N')
+        ax.set_theta_direction(-1)
+        if title:
+            ax.set_title(title)
+        return ax
+
+    def to_dict(self):
+        """JSON-serialisable state"""
+        return {'sectors': self.sectors, 'speed_edges': [float(edge) for edge in self.speed_edges],
+                'counts': self.counts.tolist(), 'skipped': self.skipped}
+
+    @classmethod
+    def from_dict(cls, state):
+        """Rebuild a table saved with ``to_dict``"""
+        rose = cls(state['sectors'], state['speed_edges'])
+        rose.counts = np.asarray(state['counts'], dtype=np.int64)
+        rose.skipped = state['skipped']
+        return rose
+
@@ -0,0 +1,79 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.cache import cache_path, is_cache_valid, read_csv_cached, write_cache
+
+
+def _station_csv(tmp_path):
+    times = pd.date_range('2021-08-09', periods=50, freq='min', name='Timestamp')
+    df = pd.DataFrame({'GHI': np.arange(50.0), 'Tamb': np.linspace(20, 30, 50)}, index=times)
+    path = str(tmp_path / 'benin.csv')
+    df.to_csv(path)
+    return path
+
+
+def test_indexed_read_after_plain_read_keeps_datetime_index(tmp_path):
+    path = _station_csv(tmp_path)
+    plain = read_csv_cached(path)
+    assert is_cache_valid(path)
+    indexed = read_csv_cached(path, parse_dates=['Timestamp'], index_col='Timestamp')
+    assert isinstance(indexed.index, pd.DatetimeIndex)
+    assert list(indexed.columns) == ['GHI', 'Tamb']
+    assert list(plain.columns) == ['Timestamp', 'GHI', 'Tamb']
+
+
+def test_plain_read_after_indexed_cache_keeps_timestamp_column(tmp_path):
+    path = _station_csv(tmp_path)
+    indexed = pd.read_csv(path, parse_dates=['Timestamp'], index_col='Timestamp')
+    write_cache(indexed, path)
+    plain = read_csv_cached(path)
+    assert isinstance(plain.index, pd.RangeIndex)
+    assert list(plain.columns) == ['Timestamp', 'GHI', 'Tamb']
+    again = read_csv_cached(path, columns=['GHI'], parse_dates=['Timestamp'], index_col='Timestamp')
+    pd.testing.assert_frame_equal(again, indexed[['GHI']])
+
+
+def test_stale_cache_is_rebuilt(tmp_path):
+    path = _station_csv(tmp_path)
+    read_csv_cached(path)
+    with open(path, 'a') as f:
+        f.write('2021-08-09 00:50:00,50.0,30.0\n')
+    assert not is_cache_valid(path)
+    assert len(read_csv_cached(path)) == 51
+    assert is_cache_valid(path) and cache_path(path).endswith('.feather')
+
+
+def test_read_country_after_eda_export_keeps_timestamp_column(tmp_path):
+    from src.dataset import read_country
+    from src.eda import SolarDataEDA
+
+    eda = SolarDataEDA(_station_csv(tmp_path))
+    eda.load_data()
+    path = eda.export_cleaned_data('benin', output_dir=str(tmp_path / 'out'))
+    df = read_country(path, columns=['GHI'], start='2021-08-09 00:10')
+    assert list(df.columns) == ['Timestamp', 'GHI'] and len(df) == 40
+    loaded = SolarDataEDA(path).load_data(use_cache=True, validate=False)
+    assert isinstance(loaded.index, pd.DatetimeIndex)
+
+
+def test_hits_and_misses_return_the_same_dtypes(tmp_path):
+    path = _station_csv(tmp_path)
+    miss = read_csv_cached(path)
+    hit = read_csv_cached(path)
+    assert pd.api.types.is_datetime64_any_dtype(miss['Timestamp'])
+    assert miss.dtypes.to_dict() == hit.dtypes.to_dict()
+    pd.testing.assert_frame_equal(hit, miss)
+
+    # A cache written from a typed frame (float32 readings, uint8 flags) reads back like a CSV parse
+    typed = pd.read_csv(path, parse_dates=['Timestamp'], index_col='Timestamp').astype('float32')
+    typed['Cleaning'] = np.uint8(0)
+    typed.to_csv(path, date_format='%Y-%m-%d %H:%M')
+    write_cache(typed, path)
+    hit = read_csv_cached(path, parse_dates=['Timestamp'], index_col='Timestamp')
+    os.remove(cache_path(path))
+    miss = read_csv_cached(path, parse_dates=['Timestamp'], index_col='Timestamp')
+    assert hit.dtypes.to_dict() == miss.dtypes.to_dict() == {'GHI': np.float64, 'Tamb': np.float64,
+                                                             'Cleaning': np.int64}
+    pd.testing.assert_frame_equal(hit, miss, rtol=1e-6)
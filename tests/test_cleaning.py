@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from src.cleaning import StreamingCleaner
+from src.eda import SolarDataEDA
+
+
+def _station_frame(rows=60_000, seed=0):
+    rng = np.random.default_rng(seed)
+    times = pd.date_range('2021-08-09', periods=rows, freq='min', name='Timestamp')
+    df = pd.DataFrame({col: rng.gamma(2.0, 150.0, rows) for col in ['GHI', 'DNI', 'DHI', 'ModA', 'ModB']},
+                      index=times)
+    df['WS'] = rng.weibull(2.0, rows) * 3
+    df['WSgust'] = df['WS'] * 1.4
+    df['Tamb'] = rng.normal(27, 4, rows)
+    df['Comments'] = np.nan  # Dropped as highly null
+    for col in ['GHI', 'WS', 'Tamb']:
+        df.loc[df.sample(frac=0.02, random_state=seed).index, col] = np.nan
+    return df
+
+
+def _eda(df):
+    eda = SolarDataEDA('unused.csv')
+    eda.df = df.copy()
+    return eda
+
+
+def test_chunked_outliers_match_in_memory():
+    df = _station_frame()
+    in_memory = _eda(df).clean_data()
+    chunked = _eda(df).clean_data(chunksize=7_000, exact_median=True)
+    assert list(chunked.columns) == list(in_memory.columns)
+    assert 'Comments' not in chunked.columns
+    assert in_memory['Outliers'].sum() > 0
+    pd.testing.assert_series_equal(chunked['Outliers'], in_memory['Outliers'])
+    pd.testing.assert_frame_equal(chunked.drop(columns='Outliers'), in_memory.drop(columns='Outliers'))
+
+
+def test_sketch_medians_within_rank_tolerance():
+    df = _station_frame()
+    chunks = [df.iloc[start:start + 5_000] for start in range(0, len(df), 5_000)]
+    cleaner = StreamingCleaner(['GHI'], compression=1000).fit(chunks)
+    for col in ['GHI', 'DNI', 'WS', 'Tamb']:
+        values = df[col].dropna().to_numpy()
+        rank = (values < cleaner.medians[col]).mean()
+        assert abs(rank - 0.5) <= 1 / cleaner.compression
+
+
+def test_exact_median_mode_matches_pandas():
+    df = _station_frame(rows=20_000, seed=1)
+    chunks = lambda: (df.iloc[start:start + 3_000] for start in range(0, len(df), 3_000))
+    cleaner = StreamingCleaner(['GHI'], exact_median=True).fit(chunks)
+    expected = df.select_dtypes(include=[np.number]).median()
+    np.testing.assert_allclose(cleaner.medians[expected.index].to_numpy(), expected.to_numpy(), rtol=0, atol=0)
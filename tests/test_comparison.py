@@ -0,0 +1,27 @@
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_station_data
+from src.comparison import CountryComparator
+
+
+def _country_files(tmp_path, rows=(1500, 800, 1200)):
+    files = {}
+    for seed, (name, n) in enumerate(zip(['Benin', 'Sierra Leone', 'Togo'], rows)):
+        path = tmp_path / f'{name}.csv'
+        generate_station_data(n, seed=seed).to_csv(path, index=False)
+        files[name] = str(path)
+    return files
+
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+def test_parallel_load_matches_a_serial_load(tmp_path, executor):
+    files = _country_files(tmp_path)
+    serial = CountryComparator().load_and_combine(files, max_workers=1)
+    comparator = CountryComparator()
+    combined = comparator.load_and_combine(files, max_workers=3, executor=executor)
+    pd.testing.assert_frame_equal(combined, serial)
+    assert list(combined['country'].cat.categories) == list(files)
+    assert {name: len(df) for name, df in comparator.country_data.items()} == {
+        'Benin': 1500, 'Sierra Leone': 800, 'Togo': 1200}
+    assert (comparator.country_data['Togo']['country'] == 'Togo').all()
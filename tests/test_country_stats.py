@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import kruskal, mannwhitneyu
+
+from src.country_stats import GroupedStats, adjust_p_values
+
+
+def _combined(seed=0):
+    rng = np.random.default_rng(seed)
+    sizes = {'Benin': 300, 'Sierra Leone': 200, 'Togo': 250}
+    df = pd.DataFrame({
+        # Rounded so the ranks have ties
+        'GHI': np.concatenate([np.round(rng.gamma(2.0, 100.0 + 20 * i, n), -1)
+                               for i, n in enumerate(sizes.values())]),
+        'country': pd.Categorical(np.repeat(list(sizes), list(sizes.values())), categories=list(sizes)),
+    }).sample(frac=1, random_state=seed).reset_index(drop=True)
+    df.loc[df.index[::17], 'GHI'] = np.nan
+    return df
+
+
+def test_kruskal_matches_scipy():
+    df = _combined()
+    engine = GroupedStats(df)
+    groups = [group.dropna().to_numpy() for _, group in df.groupby('country', observed=True)['GHI']]
+    h, p_value = engine.kruskal('GHI')
+    expected = kruskal(*groups)
+    assert h == pytest.approx(expected.statistic, rel=1e-10)
+    assert p_value == pytest.approx(expected.pvalue, rel=1e-8)
+
+
+def test_kruskal_with_a_mask_matches_scipy_on_the_masked_rows():
+    df = _combined(seed=1)
+    mask = np.asarray(df.index % 3 != 0)
+    h, _ = GroupedStats(df, mask=mask).kruskal('GHI')
+    groups = [group.dropna().to_numpy() for _, group in df[mask].groupby('country', observed=True)['GHI']]
+    assert h == pytest.approx(kruskal(*groups).statistic, rel=1e-10)
+
+
+def test_mannwhitney_pairs_match_scipy():
+    df = _combined()
+    result = GroupedStats(df).mannwhitney('GHI', p_adjust=None)
+    assert list(zip(result['group_a'], result['group_b'])) == [
+        ('Benin', 'Sierra Leone'), ('Benin', 'Togo'), ('Sierra Leone', 'Togo')]
+    for row in result.itertuples():
+        a = df.loc[df['country'] == row.group_a, 'GHI'].dropna()
+        b = df.loc[df['country'] == row.group_b, 'GHI'].dropna()
+        expected = mannwhitneyu(a, b)
+        assert row.U == pytest.approx(expected.statistic)
+        assert row.p_value == pytest.approx(expected.pvalue, rel=1e-10)
+        assert row.p_adjusted == row.p_value
+
+
+def test_summary_matches_groupby():
+    df = _combined()
+    summary = GroupedStats(df).summary(['GHI'])
+    expected = df.groupby('country', observed=True)[['GHI']].agg(['mean', 'median', 'std'])
+    assert list(summary.index) == list(expected.index) and list(summary.columns) == list(expected.columns)
+    np.testing.assert_allclose(summary.to_numpy(), expected.to_numpy(), rtol=1e-12)
+
+
+def test_holm_adjustment():
+    adjusted = adjust_p_values([0.01, 0.04, 0.03], 'holm')
+    np.testing.assert_allclose(adjusted, [0.03, 0.06, 0.06])
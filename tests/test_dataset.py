@@ -0,0 +1,41 @@
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from src.dataset import DatasetStore, read_country
+
+
+def _frame(periods, offset=0.0):
+    index = pd.date_range('2021-11-20', periods=periods, freq='h', name='Timestamp')
+    return pd.DataFrame({'GHI': np.arange(periods, dtype=np.float64) + offset}, index=index)
+
+
+def test_write_then_read_date_range(tmp_path):
+    store = DatasetStore(str(tmp_path))
+    df = _frame(24 * 60)
+    index = store.write('benin', df, chunksize=500)
+    assert index['rows'] == len(df)
+    assert store.plan('benin', '2021-12-01', '2022-01-01')['files'] < len(index['partitions'])
+    part = store.read('benin', '2021-12-01', '2022-01-01')
+    pd.testing.assert_frame_equal(part, df.loc['2021-12-01':'2021-12-31'], check_freq=False)
+    back = read_country(store.country_dir('benin'))
+    assert list(back.columns) == ['Timestamp', 'GHI'] and len(back) == len(df)
+
+
+def test_rewrite_keeps_the_country_readable(tmp_path, monkeypatch):
+    store = DatasetStore(str(tmp_path))
+    store.write('togo', _frame(24 * 40))
+    located = []
+    rmtree = shutil.rmtree
+
+    def checked_rmtree(path, *args, **kwargs):
+        # Deleting the old tree must leave the new one, index included, in place
+        rmtree(path, *args, **kwargs)
+        located.append(DatasetStore.locate(store.country_dir('togo')) is not None)
+
+    monkeypatch.setattr(shutil, 'rmtree', checked_rmtree)
+    index = store.write('togo', _frame(24 * 40, 1.0))
+    assert located == [True]
+    assert store.index('togo') == index
+    assert store.read('togo')['GHI'].iloc[0] == 1.0
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.eda import SolarDataEDA
+from src.export import export_frame, timestamp_unit, verify_manifest
+
+
+def _frame(times):
+    index = pd.DatetimeIndex(times, name='Timestamp')
+    return pd.DataFrame({'GHI': np.arange(len(index), dtype=np.float64), 'Cleaning': 0}, index=index)
+
+
+def test_minute_timestamps_keep_the_station_layout(tmp_path):
+    df = _frame(pd.date_range('2021-08-09', periods=500, freq='min'))
+    manifest = export_frame(df, str(tmp_path), 'benin_clean', chunksize=120, workers=2, executor='thread')
+    with open(manifest['output_path']) as f:
+        f.readline()
+        assert f.readline().startswith('2021-08-09 00:00,')
+    assert manifest['files'][0]['date_format'] == '%Y-%m-%d %H:%M'
+    back = pd.read_csv(manifest['output_path'], parse_dates=['Timestamp'], index_col='Timestamp')
+    pd.testing.assert_frame_equal(back, df, check_freq=False)
+    assert verify_manifest(manifest['manifest_path']) == []
+
+
+@pytest.mark.parametrize('offset, unit', [('30s', 's'), ('250ms', 'us')])
+def test_sub_minute_timestamps_round_trip(tmp_path, offset, unit):
+    times = pd.date_range('2021-08-09', periods=300, freq='min').append(
+        pd.date_range('2021-08-09', periods=300, freq='min') + pd.Timedelta(offset)).sort_values()
+    df = _frame(times)
+    assert timestamp_unit(df.index) == unit
+    path = export_frame(df, str(tmp_path), 'togo_clean', chunksize=77, workers=2,
+                        executor='thread')['output_path']
+    back = pd.read_csv(path, parse_dates=['Timestamp'], index_col='Timestamp')
+    assert not back.index.duplicated().any()
+    pd.testing.assert_index_equal(back.index, df.index, check_exact=True)
+
+    chunks = list(SolarDataEDA(path).iter_chunks(chunksize=100))
+    pd.testing.assert_index_equal(pd.concat(chunks).index, df.index.as_unit(chunks[0].index.unit))
+
+
+def test_single_slice_is_written_without_a_pool(tmp_path, monkeypatch):
+    import src.export
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("a pool was started for a single slice")
+
+    monkeypatch.setattr(src.export, 'ProcessPoolExecutor', no_pool)
+    monkeypatch.setattr(src.export, 'ThreadPoolExecutor', no_pool)
+    df = _frame(pd.date_range('2021-08-09', periods=100, freq='min'))
+    manifest = export_frame(df, str(tmp_path), 'benin_clean', workers=8, executor='process')
+    assert manifest['rows'] == 100
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.eda import SolarDataEDA
+from src.features import DerivedFeatures
+
+
+def _station(days=2):
+    times = pd.date_range('2022-03-01', periods=days * 1440, freq='min', name='Timestamp')
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({'GHI': rng.uniform(0, 900, len(times)), 'DNI': rng.uniform(0, 700, len(times)),
+                         'Tamb': 25.0}, index=times)
+
+
+def test_hourly_means_match_groupby_and_are_computed_once():
+    df = _station()
+    features = DerivedFeatures(df, location='benin')
+    means = features.hourly_means(['GHI', 'DNI', 'Missing'])
+    expected = df[['GHI', 'DNI']].groupby(df.index.hour).mean()
+    np.testing.assert_allclose(means.to_numpy(), expected.to_numpy())
+    assert features.hourly_means(['GHI', 'DNI']) is means
+
+    daytime = features.hourly_means(['GHI'], daytime_only=True)
+    mask = features.daytime()
+    np.testing.assert_allclose(daytime['GHI'].to_numpy(),
+                               df.loc[mask, 'GHI'].groupby(df.index.hour[mask]).mean().to_numpy())
+    assert 0 not in daytime.index and 12 in daytime.index
+
+
+def test_solar_features_need_a_location():
+    with pytest.raises(ValueError):
+        DerivedFeatures(_station()).daytime()
+
+
+def test_eda_rebuilds_features_for_a_new_frame():
+    eda = SolarDataEDA('unused.csv', location='benin')
+    eda.df = _station()
+    features = eda.features
+    hours = features.hour()
+    assert eda.features is features and hours.dtype == np.int8
+
+    eda.df = eda.df.iloc[:1440]
+    assert eda.features is not features
+    assert len(eda.features.hour()) == 1440
+
+    cache = DerivedFeatures(eda.df, 'benin', features.snapshot())
+    assert cache.hour() is hours
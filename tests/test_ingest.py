@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.eda import SolarDataEDA
+from src.export import append_csv, read_csv_tail
+
+
+def _station(periods=300, start='2021-08-09', seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=periods, freq='min', name='Timestamp')
+    return pd.DataFrame({'GHI': rng.uniform(0, 900, periods), 'DNI': rng.uniform(0, 700, periods),
+                         'Tamb': rng.uniform(20, 35, periods), 'Cleaning': 0}, index=index)
+
+
+def test_ingesting_the_same_rows_twice_appends_them_once(tmp_path):
+    store = str(tmp_path / 'benin_clean.csv')
+    df = _station()
+    eda = SolarDataEDA(store)
+    eda.ingest(df.iloc[:200], store, chunksize=64)
+    eda.ingest(df, store, chunksize=64)
+    eda.ingest(df, store, chunksize=64)
+
+    back = pd.read_csv(store, parse_dates=['Timestamp'], index_col='Timestamp')
+    assert len(back) == 300 and not back.index.duplicated().any()
+    assert read_csv_tail(store) == (['Timestamp', 'GHI', 'DNI', 'Tamb', 'Cleaning', 'Outliers'],
+                                    '2021-08-09 04:59')
+    with open(store) as f:
+        times = [line.split(',', 1)[0] for line in f.readlines()[1:]]
+    assert {len(time) for time in times} == {16}
+
+
+def test_missing_state_is_rebuilt_from_the_store(tmp_path):
+    store = str(tmp_path / 'togo_clean.csv')
+    df = _station()
+    eda = SolarDataEDA(store)
+    eda.ingest(df.iloc[:200], store, state_path=str(tmp_path / 'first.json'))
+    cleaner = eda.ingest(df, store, state_path=str(tmp_path / 'second.json'))
+    assert cleaner.total_rows == 300
+    assert cleaner.means[cleaner.numeric_cols.index('Tamb')] == pytest.approx(df['Tamb'].mean(), rel=1e-6)
+
+
+def test_append_refuses_a_coarser_timestamp_layout(tmp_path):
+    path = str(tmp_path / 'minutes.csv')
+    df = _station(10)
+    append_csv(df, path)
+    with pytest.raises(ValueError):
+        append_csv(_station(10, start='2021-08-10 00:00:30'), path)
+    assert len(pd.read_csv(path)) == 10
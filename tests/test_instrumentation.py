@@ -0,0 +1,34 @@
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+
+from src import instrumentation
+from src.eda import SolarDataEDA
+
+
+def test_importing_does_not_read_the_environment(tmp_path):
+    env = dict(os.environ, SOLAR_METRICS=str(tmp_path / 'metrics.jsonl'))
+    code = ("from src import eda, instrumentation; "
+            "print(instrumentation.is_enabled(), instrumentation.enable_from_env(), instrumentation.is_enabled())")
+    output = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert output.stdout.split() == ['False', 'True', 'True']
+
+
+def test_load_data_records_the_bytes_it_reads(tmp_path):
+    path = tmp_path / 'benin.csv'
+    pd.DataFrame({'Timestamp': pd.date_range('2021-08-09', periods=50, freq='min'),
+                  'GHI': np.linspace(0, 900, 50), 'Tamb': 25.0}).to_csv(path, index=False)
+    metrics = tmp_path / 'metrics.jsonl'
+    instrumentation.enable(path=str(metrics), log=False)
+    try:
+        SolarDataEDA(str(path)).load_data(chunksize=20, validate=False)
+    finally:
+        instrumentation.disable()
+    records = [json.loads(line) for line in metrics.read_text().splitlines()]
+    load = next(record for record in records if record['stage'] == 'eda.load_data')
+    assert load['bytes_read'] == os.path.getsize(path) and load['rows'] == 50
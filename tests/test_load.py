@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+from src.eda import SolarDataEDA
+
+
+def _station_csv(tmp_path, rows=1000):
+    df = pd.DataFrame({
+        'Timestamp': pd.date_range('2021-08-09', periods=rows, freq='min').strftime('%Y-%m-%d %H:%M'),
+        'GHI': np.linspace(0, 900, rows), 'Tamb': 25.0, 'Cleaning': 0,
+        'Comments': pd.Series([np.nan] * rows, dtype=object),
+    })
+    df.loc[rows - 10, 'Comments'] = 'sensor wiped'
+    path = str(tmp_path / 'benin.csv')
+    df.to_csv(path, index=False)
+    return path
+
+
+def test_chunked_load_matches_the_chunks_concatenated(tmp_path):
+    eda = SolarDataEDA(_station_csv(tmp_path))
+    chunked = eda.load_data(chunksize=128, validate=False)
+    expected = pd.concat(list(eda.iter_chunks(128)))
+    pd.testing.assert_frame_equal(chunked, expected, check_freq=False)
+    assert chunked['GHI'].dtype == np.float32 and chunked['Cleaning'].dtype == np.uint8
+    assert chunked['Comments'].iloc[-10] == 'sensor wiped'
+
+
+def test_chunked_load_with_a_date_range(tmp_path):
+    eda = SolarDataEDA(_station_csv(tmp_path))
+    df = eda.load_data(chunksize=100, start='2021-08-09 03:00', end='2021-08-09 05:00', validate=False)
+    assert len(df) == 120
+    assert df.index[0] == pd.Timestamp('2021-08-09 03:00') and df.index[-1] == pd.Timestamp('2021-08-09 04:59')
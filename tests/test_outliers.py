@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.outliers import OutlierDetector, RULE_BITS
+from src.solar_geometry import clear_sky
+
+
+def _diurnal_frame(rows=100_000, seed=0):
+    times = pd.date_range('2022-01-01', periods=rows, freq='min', name='Timestamp')
+    clear = clear_sky(times, 11.87, 3.38, 1)['ghi_clear'].to_numpy()
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'GHI': clear * rng.uniform(0.6, 1.0, rows) + rng.normal(0, 1, rows)}, index=times)
+
+
+@pytest.mark.parametrize('rule', ['mad', 'iqr'])
+def test_robust_rules_follow_the_diurnal_cycle(rule):
+    df = _diurnal_frame()
+    spikes = np.arange(30, len(df), 5_000)
+    df.iloc[spikes, 0] += 600
+    flags = OutlierDetector(['GHI'], [rule]).fit_frame(df).flag_frame(df)
+    flagged = (flags & RULE_BITS[rule]) != 0
+    assert flagged.mean() < 0.02
+    assert flagged[spikes].all()
+
+
+def test_closure_without_location_is_rejected():
+    with pytest.raises(ValueError, match='closure'):
+        OutlierDetector(['GHI', 'DNI', 'DHI'], ['closure'])
@@ -0,0 +1,33 @@
+import os
+
+from benchmarks.synthetic import generate_station_data
+from src import instrumentation
+from src.pipeline import STAGES, run_country
+
+
+def _source(tmp_path, name='benin', rows=2000):
+    path = tmp_path / f'{name}.csv'
+    generate_station_data(rows).to_csv(path, index=False)
+    return str(path)
+
+
+def test_stage_timings_come_from_the_stage_records(tmp_path):
+    assert not instrumentation.is_enabled()
+    result = run_country('benin', _source(tmp_path), str(tmp_path / 'out'))
+    assert result['status'] == 'ok'
+    assert all(result['timings'][name] > 0 for name in STAGES)
+
+
+def test_up_to_date_stages_are_skipped(tmp_path):
+    source, out = _source(tmp_path), str(tmp_path / 'out')
+    run_country('benin', source, out)
+    rerun = run_country('benin', source, out)
+    assert rerun['status'] == 'ok' and all(seconds is None for seconds in rerun['timings'].values())
+
+    os.remove(os.path.join(out, 'reports', 'benin', 'index.html'))
+    report_only = run_country('benin', source, out)
+    assert [name for name in STAGES if report_only['timings'][name] is not None] == ['report']
+
+    later = os.path.getmtime(os.path.join(out, 'data', 'benin_clean.csv')) + 10
+    os.utime(source, (later, later))
+    assert all(seconds is not None for seconds in run_country('benin', source, out)['timings'].values())
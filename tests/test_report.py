@@ -0,0 +1,24 @@
+import pickle
+
+from benchmarks.synthetic import generate_station_data
+from src.eda import SolarDataEDA
+from src.report import render_eda_report
+
+
+def test_workers_reuse_the_derived_data_computed_once(tmp_path):
+    path = str(tmp_path / 'benin.csv')
+    generate_station_data(3000).to_csv(path, index=False)
+    eda = SolarDataEDA(path, location='benin')
+    eda.load_data()
+    eda.clean_data()
+
+    shared = pickle.loads(pickle.dumps(eda.precompute()))
+    worker = SolarDataEDA(path, location='benin').set_frame(eda.df, shared)
+    computed = {key[0] if isinstance(key, tuple) else key: value for key, value in shared.items()}
+    assert worker.streaming_stats() is computed['streaming_stats']
+    assert worker.rollups() is computed['rollups']
+    assert worker.features.daytime() is computed['daytime']
+
+    results = render_eda_report(path, str(tmp_path / 'report'), workers=2, title='benin', eda=eda,
+                                analyses=['daily_solar_patterns', 'generate_histograms'])
+    assert [len(result['files']) for result in results] == [1, 1]
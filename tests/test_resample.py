@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.eda import SolarDataEDA
+from src.resample import regularize, rollups
+
+
+def _station(times, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'GHI': rng.uniform(0, 900, len(times)), 'Tamb': rng.uniform(20, 35, len(times)),
+                         'Cleaning': 0}, index=pd.DatetimeIndex(times, name='Timestamp'))
+
+
+def test_short_gaps_are_interpolated_and_long_ones_reported():
+    times = pd.date_range('2022-01-01', periods=200, freq='min')
+    df = _station(times.delete(list(range(50, 55)) + list(range(100, 160))))
+    regular, report = regularize(df, max_gap='15min')
+    assert len(regular) == 200
+    assert report['inserted_rows'] == 65
+    assert report['gaps']['filled'].tolist() == [True, False]
+    assert regular['GHI'].iloc[50:55].notna().all() and regular['GHI'].iloc[100:160].isna().all()
+    assert regular['Filled'].sum() == 5 and regular['Inserted'].sum() == 65
+    assert (regular['Cleaning'] == 0).all()
+
+
+def test_long_gap_keeps_columns_through_clean_data(tmp_path):
+    times = pd.date_range('2022-01-01', periods=30_000, freq='min')
+    df = _station(times[(times < times[10_000]) | (times >= times[13_000])])
+    path = tmp_path / 'gap.csv'
+    df.to_csv(path)
+
+    for chunksize in (None, 7_000):
+        eda = SolarDataEDA(str(path))
+        eda.load_data()
+        eda.regularize()
+        eda.clean_data(chunksize=chunksize)
+        assert {'GHI', 'Tamb', 'Cleaning'} <= set(eda.df.columns)
+        assert eda.df['GHI'].notna().all()
+
+
+def test_regularize_refreshes_the_validation_report(tmp_path):
+    df = _station(pd.date_range('2022-01-01', periods=100, freq='min'))
+    path = tmp_path / 'repeated.csv'
+    pd.concat([df.iloc[:40], df.iloc[39:]]).sample(frac=1, random_state=0).to_csv(path)
+    eda = SolarDataEDA(str(path))
+    eda.load_data(columns=['GHI'])
+    assert eda.validation.timestamps['out_of_order'] and eda.validation.timestamps['duplicates'] == 1
+    eda.regularize()
+    assert eda.validation.ok
+    assert eda.validation.timestamps['out_of_order'] == eda.validation.timestamps['duplicates'] == 0
+
+
+def test_rollup_means_match_resample():
+    times = pd.date_range('2022-01-01', periods=3 * 1440, freq='min')
+    df = _station(times, seed=1)
+    df.loc[df.index[::7], 'GHI'] = np.nan
+    for level, rollup in rollups(df).items():
+        expected = df[['GHI', 'Tamb']].resample(level).mean()
+        pd.testing.assert_frame_equal(rollup.mean(), expected, check_freq=False, check_names=False,
+                                      rtol=1e-12)
+
+
+def test_rollups_need_a_sorted_index():
+    df = _station(pd.date_range('2022-01-01', periods=40, freq='min')[::-1])
+    with pytest.raises(ValueError):
+        rollups(df)
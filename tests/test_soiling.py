@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.soiling import cleaning_events, event_windows, soiling_rates
+
+
+def _soiled_station(days=20, loss_per_day=0.005):
+    """ModA loses ``loss_per_day`` of its ratio to GHI per day since the last cleaning; ModB stays clean"""
+    times = pd.date_range('2022-01-01', periods=days * 144, freq='10min', name='Timestamp')
+    ghi = np.where((times.hour >= 8) & (times.hour < 16), 800.0, 0.0)
+    cleaning = np.zeros(len(times), dtype=np.uint8)
+    # One cleaning logged over three rows, then a second one a week later
+    flagged = times.get_indexer(pd.date_range('2022-01-08 10:00', periods=3, freq='10min')
+                                .append(pd.DatetimeIndex(['2022-01-15 10:00'])))
+    cleaning[flagged[flagged >= 0]] = 1
+    last_cleaning = pd.Series(np.where(cleaning == 1, times, pd.NaT), index=times).ffill()
+    days_dirty = ((times - last_cleaning.fillna(times[0]).to_numpy()) / pd.Timedelta('1D')).to_numpy()
+    return pd.DataFrame({'GHI': ghi, 'ModA': ghi * (1 - loss_per_day * days_dirty), 'ModB': ghi * 0.9,
+                         'Cleaning': cleaning}, index=times)
+
+
+def test_flagged_rows_of_one_cleaning_are_merged():
+    firsts, lasts = cleaning_events(_soiled_station())
+    assert len(firsts) == 2 and (lasts - firsts).tolist() == [2, 0]
+
+
+def test_event_windows_match_a_per_event_loop():
+    df = _soiled_station()
+    events = event_windows(df, window='1D')
+    bright = df[df['GHI'] >= 200]
+    for event in events.itertuples():
+        before = bright.loc[(bright.index >= event.start - pd.Timedelta('1D')) & (bright.index < event.start)]
+        after = bright.loc[(bright.index > event.end) & (bright.index <= event.end + pd.Timedelta('1D'))]
+        assert event.ModA_before == pytest.approx((before['ModA'] / before['GHI']).mean())
+        assert event.ModA_after == pytest.approx((after['ModA'] / after['GHI']).mean())
+        assert event.ModA_n_before == len(before) and event.ModA_n_after == len(after)
+    assert (events['ModA_recovery'] > 0.025).all()
+    np.testing.assert_allclose(events['ModB_recovery'], 0, atol=1e-12)
+
+
+def test_soiling_rates_recover_the_linear_loss():
+    rates = soiling_rates(_soiled_station(loss_per_day=0.005))
+    assert len(rates) == 3
+    np.testing.assert_allclose(rates['ModA_rate_pct_per_day'], -0.5, rtol=1e-3)
+    np.testing.assert_allclose(rates['ModB_rate_pct_per_day'], 0, atol=1e-9)
+
+
+def test_short_intervals_have_no_rate():
+    df = _soiled_station(days=3)
+    df['Cleaning'] = 0
+    df.loc['2022-01-02 10:00', 'Cleaning'] = 1
+    rates = soiling_rates(df, min_days=2)
+    assert rates['ModA_rate_pct_per_day'].isna().all()
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.solar_geometry import SITES, clear_sky, clear_sky_index, solar_position
+
+
+def test_zenith_is_smallest_at_solar_noon():
+    # A day after the equinox the declination is +0.33°, so the noon zenith is the
+    # latitude minus that; solar noon is offset from clock noon by the UTC offset,
+    # the longitude and the equation of time (-7.4 min)
+    latitude, longitude, utc_offset = SITES['benin']
+    times = pd.date_range('2022-03-21', periods=1440, freq='min')
+    zenith = solar_position(times, latitude, longitude, utc_offset)['zenith']
+    expected_noon = pd.Timestamp('2022-03-21 12:00') + pd.Timedelta(minutes=60 * utc_offset - 4 * longitude + 7.4)
+    assert abs(zenith.idxmin() - expected_noon) <= pd.Timedelta(minutes=2)
+    assert zenith.min() == pytest.approx(latitude - 0.33, abs=0.05)
+    assert zenith.iloc[0] > 90 and zenith.max() > 150
+
+
+def test_interpolated_sun_terms_match_the_exact_ones():
+    latitude, longitude, utc_offset = SITES['togo']
+    times = pd.date_range('2022-06-01', periods=4 * 1440, freq='min')
+    interpolated = solar_position(times, latitude, longitude, utc_offset)
+    sample = times[::97]
+    exact = solar_position(sample, latitude, longitude, utc_offset)
+    np.testing.assert_allclose(interpolated.loc[sample, 'zenith'], exact['zenith'], atol=0.01)
+    np.testing.assert_allclose(interpolated.loc[sample, 'azimuth'], exact['azimuth'], atol=0.01)
+
+
+def test_clear_sky_is_zero_at_night_and_its_index_undefined():
+    times = pd.date_range('2022-03-21', periods=24, freq='h')
+    sky = clear_sky(times, *SITES['sierraleone'])
+    night = sky['zenith'] >= 90
+    assert night.any() and (sky.loc[night, ['ghi_clear', 'dni_clear', 'dhi_clear']] == 0).all().all()
+    assert sky['ghi_clear'].max() < 1361
+    csi = clear_sky_index(sky['ghi_clear'] / 2, sky['ghi_clear'])
+    assert np.isnan(csi[night.to_numpy()]).all()
+    np.testing.assert_allclose(csi[sky['ghi_clear'].to_numpy() >= 10], 0.5)
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from src.streaming_stats import StreamingStats, collect_stats, frame_stats
+
+COLUMNS = ['GHI', 'Tamb', 'RH', 'BP']
+
+
+def _frame(rows=40_000, seed=0):
+    rng = np.random.default_rng(seed)
+    ghi = rng.gamma(2.0, 200.0, rows)
+    df = pd.DataFrame({'GHI': ghi, 'Tamb': 20 + ghi / 100 + rng.normal(0, 2, rows),
+                       'RH': rng.uniform(5, 95, rows), 'BP': 1000 + rng.normal(0, 0.5, rows)})
+    for col, frac in [('GHI', 0.05), ('Tamb', 0.1), ('RH', 0.02)]:
+        df.loc[df.sample(frac=frac, random_state=seed).index, col] = np.nan
+    return df
+
+
+def test_corr_matches_pandas_with_missing_values():
+    df = _frame()
+    stats = frame_stats(df, COLUMNS, chunksize=3_000)
+    np.testing.assert_allclose(stats.corr().to_numpy(), df.corr().to_numpy(), rtol=0, atol=1e-12)
+
+
+def test_merged_stats_match_single_pass():
+    a, b = _frame(seed=1), _frame(seed=2) + 5
+    merged = frame_stats(a, COLUMNS).merge(frame_stats(b, COLUMNS))
+    both = pd.concat([a, b], ignore_index=True)
+    np.testing.assert_allclose(merged.corr().to_numpy(), both.corr().to_numpy(), rtol=0, atol=1e-12)
+    counts, edges = merged.histogram('GHI')
+    values = both['GHI'].dropna().to_numpy()
+    np.testing.assert_array_equal(counts, np.histogram(values, bins=edges)[0])
+    above = int((values > edges[-1]).sum())
+    assert above > 0 and merged.outside['GHI'].tolist() == [int((values < edges[0]).sum()), above]
+    assert merged.outside_note('GHI') == f" (0 below, {above} above range)"
+
+
+def test_files_are_streamed_like_frames(tmp_path):
+    df = _frame()
+    paths = []
+    for i, start in enumerate(range(0, len(df), 15_000)):
+        paths.append(str(tmp_path / f'part{i}.csv'))
+        df.iloc[start:start + 15_000].to_csv(paths[-1], index=False)
+    streamed = collect_stats(paths, COLUMNS, chunksize=5_000, workers=1)
+    assert streamed.count('GHI') == df['GHI'].count()
+    np.testing.assert_allclose(streamed.corr().to_numpy(), df.corr().to_numpy(), rtol=0, atol=1e-12)
+    median = streamed.sketches['RH'].median()
+    rh = df['RH'].dropna()
+    assert abs((rh < median).mean() - 0.5) < 0.01
+
+
+def test_empty_stats_merge_is_a_no_op():
+    stats = StreamingStats(COLUMNS).merge(StreamingStats(COLUMNS))
+    assert stats.count('GHI') == 0 and stats.present() == []
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.eda import SolarDataEDA
+from src.validation import ValidationError, validate_csv, validate_frame
+
+
+def _station(rows=100):
+    return pd.DataFrame({
+        'Timestamp': pd.date_range('2021-08-09', periods=rows, freq='min'),
+        'GHI': np.linspace(0, 900, rows),
+        'Tamb': 25.0,
+    })
+
+
+def test_clean_file_passes(tmp_path):
+    path = tmp_path / 'good.csv'
+    _station().to_csv(path, index=False)
+    report = validate_csv(str(path))
+    assert report.ok
+    assert report.timestamps['duplicates'] == report.timestamps['out_of_order'] == 0
+
+
+def test_missing_and_non_numeric_columns_are_errors():
+    df = _station().drop(columns='GHI')
+    df['Tamb'] = df['Tamb'].astype(object)
+    df.loc[3, 'Tamb'] = 'n/a'
+    report = validate_frame(df)
+    assert report.errors == ['missing required columns: GHI', 'Tamb: 1 non-numeric values']
+    with pytest.raises(ValidationError, match='missing required columns: GHI'):
+        report.raise_for_errors()
+
+
+def test_duplicates_appended_to_an_unsorted_csv_are_all_counted(tmp_path):
+    df = _station()
+    path = tmp_path / 'dup.csv'
+    pd.concat([df, df.iloc[10:15]]).to_csv(path, index=False)
+    report = validate_csv(str(path), chunksize=40)
+    assert report.timestamps['out_of_order'] == 1
+    assert report.timestamps['duplicates'] == 5
+    assert report.ok
+    assert 'Timestamp: 5 duplicate timestamps' in report.warnings
+
+    eda = SolarDataEDA(str(path))
+    eda.load_data()
+    assert eda.validation.warnings == report.warnings
+    assert eda.df.index.is_monotonic_increasing
+
+
+def test_duplicates_pass_through_regularize_and_clean(tmp_path):
+    df = _station()
+    path = tmp_path / 'repeated.csv'
+    pd.concat([df.iloc[:40], df.iloc[39:]]).to_csv(path, index=False)
+    eda = SolarDataEDA(str(path))
+    eda.load_data()
+    assert eda.validation.timestamps['duplicates'] == 1
+    eda.regularize()
+    assert eda.clean_data() is not None
+    assert len(eda.df) == 100 and not eda.df.index.duplicated().any()
+
+
+def test_out_of_order_rows_are_reported_by_load_data(tmp_path):
+    df = _station()
+    path = tmp_path / 'swapped.csv'
+    df.iloc[[*range(50), 60, *range(50, 60), *range(61, 100)]].to_csv(path, index=False)
+    eda = SolarDataEDA(str(path))
+    eda.load_data(chunksize=30, start='2021-08-09 00:10')
+    assert eda.validation.timestamps['out_of_order'] == 1
+    assert eda.validation.timestamps['duplicates'] == 0
+    assert eda.validation.ok and 'Timestamp: 1 rows out of order' in eda.validation.warnings
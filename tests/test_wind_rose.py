@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.wind_rose import WindRose
+
+
+def _wind(rows=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({'WD': rng.uniform(0, 360, rows), 'WS': rng.gamma(2.0, 2.0, rows)})
+    df.loc[df.index[::11], 'WD'] = np.nan
+    df.loc[df.index[::13], 'WS'] = np.nan
+    return df
+
+
+def test_nan_pairs_are_skipped_together():
+    df = _wind()
+    rose = WindRose.from_frame(df)
+    valid = df['WD'].notna() & df['WS'].notna()
+    assert rose.total == valid.sum() and rose.skipped == (~valid).sum()
+
+    expected = WindRose().update(df.loc[valid, 'WD'], df.loc[valid, 'WS'])
+    np.testing.assert_array_equal(rose.counts, expected.counts)
+
+
+def test_sectors_are_centred_on_north():
+    rose = WindRose().update([355.0, 5.0, 11.0, 12.0, 180.0], [1.0, 3.0, 5.0, 20.0, 0.0])
+    table = rose.to_frame()
+    assert table.loc['N'].sum() == 3 and table.loc['NNE', '>10'] == 1 and table.loc['S', '0-0.5'] == 1
+
+
+def test_merged_chunks_match_the_whole_frame():
+    df = _wind()
+    merged = WindRose()
+    for start in range(0, len(df), 700):
+        merged.merge(WindRose.from_frame(df.iloc[start:start + 700]))
+    whole = WindRose.from_frame(df)
+    np.testing.assert_array_equal(merged.counts, whole.counts)
+    assert merged.skipped == whole.skipped
+    assert WindRose.from_dict(merged.to_dict()).to_frame().equals(whole.to_frame())
+
+    with pytest.raises(ValueError):
+        merged.merge(WindRose(sectors=8))